@@ -0,0 +1,485 @@
+"""
+Concurrent load-testing harness for the ASRS Dashboard API.
+Replays realistic dashboard session mixes at a configurable concurrency and
+reports throughput and tail latency (p50/p95/p99) per endpoint.
+
+Run from the backend directory, either against an already running instance:
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --concurrency 32
+
+or let the harness start a local uvicorn instance with N workers:
+
+    python -m benchmarks.loadtest --spawn --workers 4 --concurrency 64 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Relative weights of each dashboard session type
+DEFAULT_MIX = {
+    "landing": 2,
+    "paging": 4,
+    "detail": 3,
+    "trends": 1,
+}
+
+# Endpoint used to estimate server-side queueing (cheap, never touches data)
+PROBE_PATH = "/health"
+
+# Readiness probe polled before a run (green once warm-up has finished)
+READY_PATH = "/ready"
+
+# Prometheus endpoint and gauge sampled for in-flight requests
+METRICS_PATH = "/metrics"
+IN_FLIGHT_METRIC = "asrs_http_requests_in_flight"
+
+
+@dataclass
+class EndpointStats:
+    """Latency samples and outcomes for one endpoint."""
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+
+@dataclass
+class SessionContext:
+    """Shared state discovered during warm-up and while paging."""
+    min_year: int = 2001
+    max_year: int = 2025
+    severity_levels: list[str] = field(default_factory=lambda: ["High", "Medium", "Low"])
+    acn_pool: list[str] = field(default_factory=list)
+    max_pool_size: int = 2000
+
+    def remember_acns(self, acns: list[str]) -> None:
+        """Add ACNs seen in report pages to the pool used by detail sessions."""
+        for acn in acns:
+            if len(self.acn_pool) < self.max_pool_size:
+                self.acn_pool.append(acn)
+            else:
+                self.acn_pool[random.randrange(self.max_pool_size)] = acn
+
+
+class LoadRecorder:
+    """Collects per-endpoint samples for the final report."""
+
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.probe = EndpointStats()
+        self.in_flight: list[float] = []
+        self.sessions: dict[str, int] = defaultdict(int)
+
+    def record(self, label: str, latency: float, status: Optional[int]) -> None:
+        stats = self.endpoints[label]
+        stats.latencies.append(latency)
+        if status is None:
+            stats.errors += 1
+            return
+        stats.status_codes[status] += 1
+        if status >= 400:
+            stats.errors += 1
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def _summarize(stats: EndpointStats, elapsed: float) -> dict:
+    """Summarize latency samples (in milliseconds) for one endpoint."""
+    values = sorted(stats.latencies)
+    return {
+        "requests": len(values),
+        "errors": stats.errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(_percentile(values, 50) * 1000, 1),
+        "p95_ms": round(_percentile(values, 95) * 1000, 1),
+        "p99_ms": round(_percentile(values, 99) * 1000, 1),
+        "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+        "status_codes": dict(stats.status_codes),
+    }
+
+
+# ============== Requests and Sessions ==============
+
+async def _get(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    label: str,
+    path: str,
+    params: Optional[dict] = None,
+) -> Optional[httpx.Response]:
+    """Issue a GET request and record its latency under the endpoint label."""
+    start = time.perf_counter()
+    try:
+        response = await client.get(path, params=params)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, None
+    recorder.record(label, time.perf_counter() - start, status)
+    return response if status == 200 else None
+
+
+def _random_year_range(ctx: SessionContext, rng: random.Random) -> dict:
+    """Pick a sidebar year range, often left at the full range."""
+    if rng.random() < 0.5:
+        return {}
+    start = rng.randint(ctx.min_year, ctx.max_year)
+    end = rng.randint(start, ctx.max_year)
+    return {"start_year": start, "end_year": end}
+
+
+async def landing_session(client, recorder, ctx, rng) -> None:
+    """Landing page plus the dashboard bundle, fetched in parallel like the UI does."""
+    await _get(client, recorder, "/api/summary", "/api/summary")
+    years = _random_year_range(ctx, rng)
+    await asyncio.gather(
+        _get(client, recorder, "/api/filters/options", "/api/filters/options"),
+        _get(client, recorder, "/api/incidents/timeline", "/api/incidents/timeline", years),
+        _get(client, recorder, "/api/incidents/factors", "/api/incidents/factors", years),
+        _get(client, recorder, "/api/incidents", "/api/incidents", {**years, "page": 1, "limit": 20}),
+    )
+
+
+async def paging_session(client, recorder, ctx, rng) -> None:
+    """Report table paging with a random filter combination."""
+    params = _random_year_range(ctx, rng)
+    if rng.random() < 0.3:
+        params["severity"] = rng.choice(ctx.severity_levels)
+    for page in range(1, rng.randint(2, 6)):
+        response = await _get(
+            client, recorder, "/api/incidents", "/api/incidents",
+            {**params, "page": page, "limit": 20},
+        )
+        if response is None:
+            return
+        reports = response.json().get("reports", [])
+        ctx.remember_acns([r["acn"] for r in reports])
+        if not reports:
+            return
+
+
+async def detail_session(client, recorder, ctx, rng) -> None:
+    """Incident detail view, which includes the similar-incident lookup."""
+    if not ctx.acn_pool:
+        await paging_session(client, recorder, ctx, rng)
+        return
+    for _ in range(rng.randint(1, 3)):
+        acn = rng.choice(ctx.acn_pool)
+        await _get(client, recorder, "/api/incidents/{acn}", f"/api/incidents/{acn}")
+
+
+async def trends_session(client, recorder, ctx, rng) -> None:
+    """Trend analysis page while the analyst moves the benchmark split year."""
+    for _ in range(rng.randint(1, 4)):
+        split = rng.randint(min(ctx.min_year + 3, ctx.max_year - 1), ctx.max_year - 1)
+        params = {
+            "baseline_start": max(ctx.min_year, split - 5),
+            "baseline_end": split,
+            "inference_start": split + 1,
+            "inference_end": ctx.max_year,
+        }
+        await asyncio.gather(
+            _get(client, recorder, "/api/trends/kpis", "/api/trends/kpis", params),
+            _get(client, recorder, "/api/trends/comparison", "/api/trends/comparison", params),
+        )
+
+
+SESSIONS = {
+    "landing": landing_session,
+    "paging": paging_session,
+    "detail": detail_session,
+    "trends": trends_session,
+}
+
+
+# ============== Runner ==============
+
+async def _warm_up(client: httpx.AsyncClient, ctx: SessionContext) -> None:
+    """Discover the year range and seed the ACN pool before measuring."""
+    response = await client.get("/api/filters/options")
+    response.raise_for_status()
+    options = response.json()
+    ctx.min_year = options["year_range"]["min"]
+    ctx.max_year = options["year_range"]["max"]
+    ctx.severity_levels = options.get("severity_levels") or ctx.severity_levels
+
+    response = await client.get("/api/incidents", params={"limit": 100})
+    response.raise_for_status()
+    ctx.remember_acns([r["acn"] for r in response.json()["reports"]])
+
+
+async def _virtual_user(
+    client: httpx.AsyncClient,
+    recorder: LoadRecorder,
+    ctx: SessionContext,
+    mix: dict[str, int],
+    deadline: float,
+    think_time: float,
+    seed: int,
+) -> None:
+    """Run weighted random sessions until the deadline."""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights=weights)[0]
+        await SESSIONS[name](client, recorder, ctx, rng)
+        recorder.sessions[name] += 1
+        if think_time > 0:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+
+async def _sample_in_flight(client: httpx.AsyncClient) -> Optional[float]:
+    """Read the server's in-flight request gauge from /metrics, if exposed."""
+    try:
+        response = await client.get(METRICS_PATH)
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    for line in response.text.splitlines():
+        if line.startswith(IN_FLIGHT_METRIC + " "):
+            # Exclude the scrape request itself
+            return max(0.0, float(line.split()[1]) - 1)
+    return None
+
+
+async def _probe_loop(
+    base_url: str,
+    recorder: LoadRecorder,
+    interval: float,
+    stop: asyncio.Event,
+) -> None:
+    """
+    Poll a trivial endpoint on its own connection.
+    Its latency under load approximates time spent queued on the server
+    (accept backlog plus event-loop blocking), independent of handler cost.
+    """
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                response = await client.get(PROBE_PATH)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            recorder.probe.latencies.append(time.perf_counter() - start)
+            if not ok:
+                recorder.probe.errors += 1
+            in_flight = await _sample_in_flight(client)
+            if in_flight is not None:
+                recorder.in_flight.append(in_flight)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def run_load_test(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    mix: dict[str, int],
+    think_time: float = 0.0,
+    probe_interval: float = 0.25,
+    timeout: float = 60.0,
+    seed: int = 0,
+) -> dict:
+    """
+    Run the load test and return the report as a dict.
+
+    Args:
+        base_url: Root URL of the API instance
+        concurrency: Number of concurrent virtual users
+        duration: Measurement duration in seconds
+        mix: Relative session weights keyed by session name
+        think_time: Maximum random pause between sessions (seconds)
+        probe_interval: Interval between queueing probes (seconds)
+        timeout: Per-request timeout (seconds)
+        seed: Base random seed for reproducible session sequences
+
+    Returns:
+        Report with overall and per-endpoint throughput and latency
+    """
+    recorder = LoadRecorder()
+    ctx = SessionContext()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        await _warm_up(client, ctx)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe_loop(base_url, recorder, probe_interval, stop))
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            _virtual_user(client, recorder, ctx, mix, deadline, think_time, seed + i)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    total_requests = sum(len(s.latencies) for s in recorder.endpoints.values())
+    all_latencies = EndpointStats(latencies=[
+        latency for s in recorder.endpoints.values() for latency in s.latencies
+    ])
+    all_latencies.errors = sum(s.errors for s in recorder.endpoints.values())
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "mix": mix,
+        "sessions": dict(recorder.sessions),
+        "total_requests": total_requests,
+        "overall": _summarize(all_latencies, elapsed),
+        "endpoints": {
+            label: _summarize(stats, elapsed)
+            for label, stats in sorted(recorder.endpoints.items())
+        },
+        "server_queueing": {
+            "probe_path": PROBE_PATH,
+            **_summarize(recorder.probe, elapsed),
+            "in_flight_mean": round(sum(recorder.in_flight) / len(recorder.in_flight), 1) if recorder.in_flight else None,
+            "in_flight_max": max(recorder.in_flight) if recorder.in_flight else None,
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    """Print the report as a fixed-width table."""
+    print(
+        f"\n{report['base_url']}  concurrency={report['concurrency']}  "
+        f"duration={report['duration_s']}s  requests={report['total_requests']}"
+    )
+    print(f"sessions: {report['sessions']}\n")
+    header = f"{'endpoint':<32}{'reqs':>8}{'errs':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("ALL", report["overall"])]
+    for label, s in rows:
+        print(
+            f"{label:<32}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>9.1f}"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}"
+        )
+    q = report["server_queueing"]
+    print(
+        f"\nserver queueing ({q['probe_path']} probe): "
+        f"p50={q['p50_ms']}ms p95={q['p95_ms']}ms p99={q['p99_ms']}ms max={q['max_ms']}ms"
+    )
+    if q["in_flight_max"] is not None:
+        print(f"server in-flight requests (sampled worker): mean={q['in_flight_mean']} max={q['in_flight_max']}")
+
+
+# ============== Local Server ==============
+
+@contextmanager
+def spawn_server(port: int, workers: int, env: str):
+    """Start a local uvicorn instance of the API and stop it on exit."""
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(workers),
+        "--log-level", "warning",
+    ]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env={**os.environ, "ENV": env})
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def wait_until_ready(base_url: str, timeout: float = 120.0) -> None:
+    """Poll the readiness endpoint until the instance has finished warming up."""
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=5.0) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get(READY_PATH)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"API at {base_url} did not become ready within {timeout}s")
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    """Parse 'landing=2,paging=4' into session weights."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SESSIONS:
+            raise argparse.ArgumentTypeError(f"Unknown session '{name}', expected one of {sorted(SESSIONS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the ASRS Dashboard API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="API root URL")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measurement duration (seconds)")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="Session weights, e.g. landing=2,paging=4,detail=3,trends=1")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between sessions (seconds)")
+    parser.add_argument("--probe-interval", type=float, default=0.25, help="Queueing probe interval (seconds)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout (seconds)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--spawn", action="store_true", help="Start a local uvicorn instance for the run")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for --spawn")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --spawn")
+    parser.add_argument("--server-env", default="production", help="ENV for --spawn (production caches data)")
+    args = parser.parse_args(argv)
+
+    async def _run(base_url: str) -> dict:
+        await wait_until_ready(base_url)
+        return await run_load_test(
+            base_url,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            mix=args.mix,
+            think_time=args.think_time,
+            probe_interval=args.probe_interval,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+
+    if args.spawn:
+        with spawn_server(args.port, args.workers, args.server_env) as base_url:
+            report = asyncio.run(_run(base_url))
+        report["workers"] = args.workers
+    else:
+        report = asyncio.run(_run(args.base_url))
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
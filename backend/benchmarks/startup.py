@@ -0,0 +1,244 @@
+"""
+Startup-time benchmark for the ASRS Dashboard API.
+Measures, in fresh interpreters, how long `import main` takes and how slow
+the first request to each endpoint is compared to the second, and lists
+the slowest imports. With --spawn it also times a real uvicorn process
+from launch until /health and /ready answer.
+
+Run from the backend directory:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --runs 3 --spawn
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Endpoints whose first-request latency is measured
+DEFAULT_PATHS = (
+    "/health",
+    "/api/summary",
+    "/api/incidents/timeline",
+    "/api/incidents?page=1",
+    "/api/trends/kpis",
+)
+
+# Executed in a fresh interpreter: times `import main`, then issues
+# in-process GETs through the ASGI app (no server, no lifespan)
+_PROBE = r'''
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+import_s = time.perf_counter() - start
+heavy_loaded = {name: name in sys.modules for name in ("pandas", "numpy")}
+
+async def get(target):
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query.encode(), "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "state": {},
+    }
+    status = 500
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+    t = time.perf_counter()
+    await main.app(scope, receive, send)
+    return status, time.perf_counter() - t
+
+async def run(paths):
+    results = {}
+    for target in paths:
+        status, first = await get(target)
+        _, second = await get(target)
+        results[target] = {"status": status, "first_s": first, "second_s": second}
+    return results
+
+requests = asyncio.run(run(json.loads(sys.argv[1])))
+print(json.dumps({"import_s": import_s, "heavy_loaded": heavy_loaded, "requests": requests}))
+'''
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def _stats(values: list[float]) -> dict:
+    """Median, min and max in milliseconds."""
+    return {
+        "median_ms": _ms(statistics.median(values)),
+        "min_ms": _ms(min(values)),
+        "max_ms": _ms(max(values)),
+    }
+
+
+def run_probe(paths: list[str], env: str) -> dict:
+    """Run the import/first-request probe in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(paths)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "ENV": env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int) -> list[dict]:
+    """Modules with the largest cumulative import time (python -X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        modules.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules[:limit]
+
+
+async def time_server_start(port: int, env: str, paths: list[str], timeout: float = 120.0) -> dict:
+    """Launch uvicorn and time /health, /ready and the first request to each path."""
+    import httpx
+    from benchmarks.loadtest import READY_PATH, spawn_server
+
+    timings: dict = {"first_request_ms": {}}
+    start = time.perf_counter()
+    with spawn_server(port, 1, env) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+            for label, path in (("health_ms", "/health"), ("ready_ms", READY_PATH)):
+                deadline = start + timeout
+                while True:
+                    try:
+                        if (await client.get(path)).status_code == 200:
+                            break
+                    except httpx.HTTPError:
+                        pass
+                    if time.perf_counter() > deadline:
+                        raise TimeoutError(f"{path} did not return 200 within {timeout}s")
+                    await asyncio.sleep(0.02)
+                timings[label] = _ms(time.perf_counter() - start)
+            for path in paths:
+                t = time.perf_counter()
+                await client.get(path)
+                timings["first_request_ms"][path] = _ms(time.perf_counter() - t)
+    return timings
+
+
+def run_benchmark(
+    runs: int,
+    paths: list[str],
+    env: str,
+    top_imports: int,
+    spawn: bool = False,
+    port: int = 8766,
+) -> dict:
+    """Collect import, first-request and (optionally) server start timings."""
+    probes = [run_probe(paths, env) for _ in range(runs)]
+    report = {
+        "runs": runs,
+        "env": env,
+        "import": _stats([p["import_s"] for p in probes]),
+        "heavy_modules_loaded_at_import": probes[-1]["heavy_loaded"],
+        "requests": {
+            path: {
+                "status": probes[-1]["requests"][path]["status"],
+                "first": _stats([p["requests"][path]["first_s"] for p in probes]),
+                "second": _stats([p["requests"][path]["second_s"] for p in probes]),
+            }
+            for path in paths
+        },
+        "slowest_imports": slowest_imports(top_imports),
+    }
+    if spawn:
+        starts = [asyncio.run(time_server_start(port, env, paths)) for _ in range(runs)]
+        report["server_start"] = {
+            "health": {"median_ms": round(statistics.median(s["health_ms"] for s in starts), 1)},
+            "ready": {"median_ms": round(statistics.median(s["ready_ms"] for s in starts), 1)},
+            "first_request": {
+                path: {"median_ms": round(statistics.median(s["first_request_ms"][path] for s in starts), 1)}
+                for path in paths
+            },
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    """Print the report as fixed-width tables."""
+    imp = report["import"]
+    print(
+        f"\nimport main ({report['runs']} runs, ENV={report['env']}): "
+        f"median={imp['median_ms']}ms min={imp['min_ms']}ms max={imp['max_ms']}ms"
+    )
+    print(f"heavy modules loaded by import: {report['heavy_modules_loaded_at_import']}\n")
+
+    header = f"{'endpoint':<32}{'status':>8}{'first p50':>12}{'first max':>12}{'second p50':>12}"
+    print(header)
+    print("-" * len(header))
+    for path, r in report["requests"].items():
+        print(
+            f"{path:<32}{r['status']:>8}{r['first']['median_ms']:>12.1f}"
+            f"{r['first']['max_ms']:>12.1f}{r['second']['median_ms']:>12.1f}"
+        )
+
+    print(f"\n{'slowest imports':<48}{'cumulative':>12}{'self':>10}")
+    for m in report["slowest_imports"]:
+        print(f"{m['module']:<48}{m['cumulative_ms']:>12.1f}{m['self_ms']:>10.1f}")
+
+    if "server_start" in report:
+        s = report["server_start"]
+        print(
+            f"\nuvicorn start: /health after {s['health']['median_ms']}ms, "
+            f"/ready after {s['ready']['median_ms']}ms (median)"
+        )
+        for path, r in s["first_request"].items():
+            print(f"  first {path}: {r['median_ms']}ms")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure API import time and first-request latency")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--path", action="append", dest="paths", default=None, help="Endpoint to time (repeatable)")
+    parser.add_argument("--env", default="development", help="ENV for the measured processes")
+    parser.add_argument("--top-imports", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--spawn", action="store_true", help="Also time a uvicorn process until /health and /ready")
+    parser.add_argument("--port", type=int, default=8766, help="Port for --spawn")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        runs=args.runs,
+        paths=args.paths or list(DEFAULT_PATHS),
+        env=args.env,
+        top_imports=args.top_imports,
+        spawn=args.spawn,
+        port=args.port,
+    )
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
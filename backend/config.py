@@ -2,9 +2,11 @@
 Configuration settings for the ASRS Dashboard backend.
 Uses environment variables with sensible defaults for local development.
 """
+import hmac
 import os
 from pathlib import Path
 from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -32,6 +34,12 @@ class Settings(BaseSettings):
     CSV_2001_2017: str = "raw_runway_incursion_data_Jan_2001_to_Dec_2017.csv"
     CSV_2018_2025: str = "raw_runway_incursion_data_Jan_2018_to_May_2025.csv"
     
+    # Bundled airport reference table (FAA identifier, name, state, coordinates)
+    AIRPORTS_CSV: Path = Path(__file__).parent / "data" / "airports.csv"
+    
+    # Drop directory for additional ASRS extracts (ingested incrementally)
+    INGEST_DIR: Path = DATA_DIR / "Incoming"
+    
     # Trend analysis segments (defaults for 2017 benchmark split)
     BASELINE_START: int = 2012
     BASELINE_END: int = 2017
@@ -43,10 +51,81 @@ class Settings(BaseSettings):
     # CORS settings (allow all for local demo)
     CORS_ORIGINS: list[str] = ["*"]
     
+    # Admin endpoints (/admin/*) and the X-Profile header require this token.
+    # When unset, admin access is open in development and disabled in production.
+    ADMIN_TOKEN: Optional[str] = None
+    
+    # Profiling: fraction of requests profiled automatically (0 disables sampling)
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_STORE_SIZE: int = 50
+    
+    # Requests slower than this are recorded in the slow-request log
+    SLOW_REQUEST_THRESHOLD_MS: float = 1000.0
+    SLOW_REQUEST_LOG_SIZE: int = 200
+    
+    # Threads used to read source files and build indexes in parallel
+    LOAD_WORKERS: int = 4
+    
+    # Rendered default-view responses kept per dataset version
+    RESPONSE_CACHE_SIZE: int = 256
+    
+    # Resolved filter selections (row bitmap and mask) kept per dataset version
+    SELECTION_CACHE_SIZE: int = 128
+    
+    # Facet counts kept per dataset version, keyed by filter signature
+    FACET_CACHE_SIZE: int = 1024
+    
+    # Factor shift significance: p-value below which a shift is significant,
+    # and results kept per dataset version (period pair, filters, resamples)
+    SIGNIFICANCE_THRESHOLD: float = 0.05
+    SIGNIFICANCE_CACHE_SIZE: int = 256
+    
+    # Airport hotspot scores kept per dataset version (filters, window, baseline)
+    HOTSPOT_CACHE_SIZE: int = 256
+    
+    # Factor co-occurrence matrices kept per dataset version, keyed by filter signature
+    COOCCURRENCE_CACHE_SIZE: int = 256
+    
+    # Pivot cubes kept per dataset version (filters and dimensions)
+    PIVOT_CACHE_SIZE: int = 256
+    
+    # Engine for filtered aggregations (timeline, factors, trends, pivots):
+    # "pandas" or "duckdb" (needs the optional duckdb package). DuckDB is
+    # 30-40x slower on these index arrays; it is not a speed-up switch
+    QUERY_ENGINE: str = "pandas"
+    
+    # Admission control per cost class (see services/admission.py): requests
+    # handled concurrently and requests allowed to wait for a slot. A full
+    # queue is answered with 429, a wait over the timeout with 503.
+    ADMISSION_CONTROL: bool = True
+    EXPENSIVE_CONCURRENCY: int = 4
+    EXPENSIVE_QUEUE_SIZE: int = 16
+    STANDARD_CONCURRENCY: int = 64
+    STANDARD_QUEUE_SIZE: int = 256
+    ADMISSION_TIMEOUT_SECONDS: float = 5.0
+    RETRY_AFTER_SECONDS: int = 2
+    
+    # Production warm-up (see services/warmup.py): attempts before the worker
+    # reports itself unhealthy, and the first retry delay (doubled each time)
+    WARMUP_ATTEMPTS: int = 5
+    WARMUP_RETRY_SECONDS: float = 2.0
+    
+    # Memory-mapped narrative/synopsis text, shared by workers on one host.
+    # Kept with the data rather than in a shared temp directory: workers
+    # trust the segment files they find here
+    TEXT_STORE_DIR: Path = DATA_DIR / "Text Store"
+    
     @property
     def is_production(self) -> bool:
         return self.ENV.lower() == "production"
     
+    def is_admin(self, token: Optional[str]) -> bool:
+        """Check an X-Admin-Token header value against ADMIN_TOKEN."""
+        if self.ADMIN_TOKEN:
+            # Constant-time comparison so response timing does not leak the token
+            return hmac.compare_digest((token or "").encode(), self.ADMIN_TOKEN.encode())
+        return not self.is_production
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -2,16 +2,27 @@
 FastAPI main application for ASRS Dashboard backend.
 Serves NLP analysis results to the React frontend.
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from config import get_settings
+from services.instrumentation import InstrumentationMiddleware, REGISTRY
+from services.admission import AdmissionMiddleware
+from services.profiling import ProfilingMiddleware
+from services.response_cache import ResponseCacheMiddleware
+from services.warmup import get_warmup_state, run_warmup, skip_warmup
 from routers import incidents
 from routers import topics
 from routers import trends
 from routers import incident_detail
+from routers import admin
+from routers import filters
+from routers import airports
+from routers import pivot
 
 # Configure logging
 logging.basicConfig(
@@ -21,21 +32,38 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _enable_copy_on_write():
+    """
+    Snapshots hand out shallow views of one shared (read-only) frame; with
+    copy-on-write a view can gain columns or be written to without touching
+    the shared data. Always on from pandas 3.
+    """
+    import pandas as pd
+    
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler for startup/shutdown events."""
     settings = get_settings()
     logger.info(f"Starting ASRS Dashboard API in {settings.ENV} mode")
+    _enable_copy_on_write()
     
-    # In production, pre-load data into memory
+    # In production, load data and pre-render default views in the
+    # background; /ready turns green once this completes
+    warmup_task = None
     if settings.is_production:
-        logger.info("Pre-loading data for production mode...")
-        from services.data_loader import load_all_data
-        load_all_data()
-        logger.info("Data pre-loaded successfully")
+        logger.info("Warming up for production mode...")
+        warmup_task = asyncio.create_task(run_warmup(app))
+    else:
+        skip_warmup()
     
     yield
     
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
     logger.info("Shutting down ASRS Dashboard API")
 
 
@@ -47,8 +75,17 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Configure CORS (allow all origins for local demo)
 settings = get_settings()
+
+# Concurrency caps and wait queues per cost class (innermost: rejections
+# still get CORS headers, cached responses never queue)
+app.add_middleware(AdmissionMiddleware)
+
+# Pre-rendered default views, inside CORS so every hit gets headers for its
+# own Origin (cache hits are still measured)
+app.add_middleware(ResponseCacheMiddleware)
+
+# Configure CORS (allow all origins for local demo)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -57,33 +94,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling and slow-request log (needs the stage timings below)
+app.add_middleware(ProfilingMiddleware)
+
+# Request timing, Server-Timing headers and Prometheus metrics (outermost)
+app.add_middleware(InstrumentationMiddleware)
+
 # Include routers
 app.include_router(incidents.router)
 app.include_router(topics.router)
 app.include_router(trends.router)
 app.include_router(incident_detail.router)
+app.include_router(admin.router)
+app.include_router(filters.router)
+app.include_router(airports.router)
+app.include_router(pivot.router)
 
 
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint: 503 once every warm-up attempt has failed."""
+    if get_warmup_state().has_failed:
+        return JSONResponse({"status": "unhealthy", "env": settings.ENV}, status_code=503)
     return {"status": "healthy", "env": settings.ENV}
 
 
+# Readiness probe for load balancers
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the warm-up pipeline has finished."""
+    state = get_warmup_state()
+    return JSONResponse(state.as_dict(), status_code=200 if state.is_ready else 503)
+
+
+# Prometheus metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Expose request, stage, cache and dataset metrics in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 # Summary endpoint for landing page
 @app.get("/api/summary")
 async def get_summary():
     """Get summary statistics for the landing page."""
-    from services.data_loader import load_all_data, get_year_range
+    from services.data_loader import get_snapshot, get_year_range
     from datetime import datetime
     
-    df = load_all_data()
+    snapshot = get_snapshot()
+    df = snapshot.frame
+    indexes = snapshot.indexes
     min_year, max_year = get_year_range(df)
     
-    # Determine primary risk from contributing factors
-    factors = df["contributing_factors"].dropna().str.split("; ").explode()
-    primary_risk = factors.value_counts().index[0] if len(factors) > 0 else "Human Factors"
+    # Determine primary risk from the precomputed factor counts
+    ranked = indexes.top_factors(indexes.cube.factor_totals(), limit=1)
+    primary_risk = ranked[0][0] if ranked else "Human Factors"
     
     return {
         "total_incidents": int(df.shape[0]),
@@ -102,13 +168,13 @@ async def get_summary():
 async def get_filter_options():
     """Get available filter options for the sidebar."""
     from services.data_loader import (
-        load_all_data,
-        get_contributing_factors_list,
+        get_snapshot,
         get_unique_values,
         get_year_range,
     )
     
-    df = load_all_data()
+    snapshot = get_snapshot()
+    df = snapshot.frame
     min_year, max_year = get_year_range(df)
     
     # Get unique states
@@ -119,7 +185,7 @@ async def get_filter_options():
     aircraft = df["aircraft_type"].dropna().value_counts().head(20).index.tolist()
     
     return {
-        "contributing_factors": get_contributing_factors_list(df),
+        "contributing_factors": sorted(snapshot.indexes.factors.vocabulary),
         "aircraft_types": aircraft,
         "states": state_list,
         "incident_types": [
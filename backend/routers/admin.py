@@ -0,0 +1,146 @@
+"""
+Admin router - operational endpoints for profiling, latency debugging and
+dataset ingestion.
+Requires the X-Admin-Token header when ADMIN_TOKEN is configured.
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+
+from config import get_settings
+from services.introspection import column_stats, structure_stats
+from services.profiling import get_profile_store, get_slow_request_log, render_profile
+from schemas.models import (
+    ProfilesResponse,
+    ProfileSummary,
+    SlowRequestsResponse,
+    SlowRequest,
+    DatasetIntrospectionResponse,
+    DatasetColumnInfo,
+    DerivedStructureInfo,
+    DatasetLoadInfo,
+    IngestResponse,
+    ReloadResponse,
+)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without a valid admin token."""
+    if not get_settings().is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls")
+
+
+@router.get("/profiles", response_model=ProfilesResponse)
+async def list_profiles():
+    """List captured request profiles, most recent first."""
+    return ProfilesResponse(
+        profiles=[ProfileSummary(**p) for p in get_profile_store().list()]
+    )
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", description="Sort key: cumulative, tottime, calls or ncalls"),
+    limit: int = Query(50, ge=1, le=500, description="Number of functions to show"),
+):
+    """Get a captured profile rendered as pstats text."""
+    record = get_profile_store().get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    if sort not in PROFILE_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PROFILE_SORT_KEYS)}")
+    
+    header = (
+        f"{record['method']} {record['path']} params={record['params']} "
+        f"status={record['status']} duration={record['duration_ms']}ms "
+        f"dataset={record['dataset_version']} captured={record['captured_at']}\n\n"
+    )
+    return PlainTextResponse(header + render_profile(record, sort=sort, limit=limit))
+
+
+@router.get("/slow-requests", response_model=SlowRequestsResponse)
+async def list_slow_requests(
+    limit: int = Query(50, ge=1, le=1000, description="Number of entries to return"),
+):
+    """Get the most recent slow requests with their stage breakdown."""
+    entries = list(get_slow_request_log())[-limit:]
+    return SlowRequestsResponse(
+        threshold_ms=get_settings().SLOW_REQUEST_THRESHOLD_MS,
+        requests=[SlowRequest(**e) for e in reversed(entries)],
+    )
+
+
+@router.get("/dataset", response_model=DatasetIntrospectionResponse)
+async def get_dataset_introspection():
+    """
+    Report memory usage of the cached frame (per column) and of every
+    registered index, cache and vector store, with dataset version and
+    the stage timings of recent loads. The memory-mapped text store is
+    reported separately since its pages are file-backed.
+    """
+    from services.data_loader import get_snapshot, get_load_history, get_live_versions, is_reloading
+    
+    snapshot = get_snapshot()
+    df = snapshot.frame
+    columns = column_stats(df)
+    structures = structure_stats()
+    frame_memory = sum(c["memory_bytes"] for c in columns) + int(df.index.memory_usage(deep=True))
+    
+    # The cached frame is itself a registered structure; don't count it twice
+    derived_memory = sum(
+        s["memory_bytes"] for s in structures if s["name"] != "dataset_cache"
+    )
+    
+    return DatasetIntrospectionResponse(
+        version=snapshot.version,
+        loaded_at=snapshot.loaded_at.isoformat(),
+        rows=len(df),
+        frame_memory_bytes=frame_memory,
+        columns=[DatasetColumnInfo(**c) for c in columns],
+        structures=[DerivedStructureInfo(**s) for s in structures],
+        total_memory_bytes=frame_memory + derived_memory,
+        text_store_bytes=snapshot.texts.nbytes(),
+        load_history=[DatasetLoadInfo(**h) for h in reversed(get_load_history())],
+        live_versions=get_live_versions(),
+        reloading=is_reloading(),
+    )
+
+
+@router.post("/reload", response_model=ReloadResponse)
+def reload(
+    wait: bool = Query(False, description="Block until the new snapshot is published"),
+):
+    """
+    Re-read the source files and publish a new dataset snapshot.
+    Requests keep being served from the current snapshot while the new one
+    is built; by default the build runs in the background.
+    """
+    from services.data_loader import get_dataset_version, reload_dataset, reload_in_background
+    
+    previous_version = get_dataset_version()
+    if wait:
+        snapshot = reload_dataset()
+        return ReloadResponse(status="completed", version=snapshot.version, previous_version=previous_version)
+    started = reload_in_background()
+    return ReloadResponse(
+        status="started" if started else "already_running",
+        previous_version=previous_version,
+    )
+
+
+@router.post("/ingest", response_model=IngestResponse)
+def ingest_new_extracts():
+    """
+    Ingest new export files from the drop directory (INGEST_DIR).
+    Only rows with ACNs not already loaded are appended; derived indexes
+    are extended incrementally and a new dataset version is published.
+    """
+    from services.ingestion import ingest_drop_dir
+    
+    return IngestResponse(**ingest_drop_dir())
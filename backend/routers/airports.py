@@ -0,0 +1,222 @@
+"""
+Airports router - endpoints for per-airport safety oversight.
+Hotspots are scored from the airport x month incident counts of the
+dataset indexes, narrowed by the sidebar's categorical filters. Airport
+profiles read the per-airport breakdowns materialized at load time.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import TYPE_CHECKING, Optional
+
+from config import get_settings
+from routers.filters import dimension_filter
+from services.filters import IncidentFilter
+from services.instrumentation import record_cache, span
+from schemas.models import (
+    AirportHotspot,
+    AirportProfileResponse,
+    HotspotsResponse,
+    MonthPeriod,
+    ProfileBreakdown,
+    TimelineDataPoint,
+)
+
+# Data services (pandas, numpy) are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import numpy as np
+    from services.data_loader import DatasetSnapshot
+    from services.hotspots import HotspotScores
+
+router = APIRouter(prefix="/api/airports", tags=["airports"])
+
+# Profile response field -> breakdown dimension (see indexes.PROFILE_DIMENSIONS)
+PROFILE_SECTIONS = {
+    "severity": "severity",
+    "incident_types": "incident_type",
+    "aircraft_types": "aircraft_type",
+    "flight_phases": "flight_phase",
+    "light": "light",
+    "flight_conditions": "flight_conditions",
+}
+
+
+def _hotspot_scores(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    window_start: int,
+    window_end: int,
+    baseline_start: int,
+) -> "HotspotScores":
+    """Scores of every airport for a window of month slots, cached per dataset version."""
+    from services.hotspots import get_hotspot_cache, score_airports
+    
+    cache = get_hotspot_cache()
+    key = repr((filters.normalized(), window_start, window_end, baseline_start))
+    scores = cache.get(snapshot.version, key)
+    record_cache("hotspots", hit=scores is not None)
+    if scores is None:
+        indexes = snapshot.indexes
+        if filters.has_dimensions:
+            counts = indexes.airport_months_of(filters.select(snapshot).mask)
+        else:
+            counts = indexes.airport_months
+        scores = score_airports(counts, window_start, window_end, baseline_start)
+        cache.put(snapshot.version, key, scores)
+    return scores
+
+
+@router.get("/hotspots", response_model=HotspotsResponse)
+async def get_hotspots(
+    window: int = Query(12, ge=1, le=120, description="Months in the recent window"),
+    baseline: int = Query(60, ge=0, le=600, description="Months of history before the window (0 = all)"),
+    end: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Last month of the window (YYYY-MM); default the latest month with reports"),
+    min_incidents: int = Query(3, ge=1, description="Minimum incidents in the window to be listed"),
+    limit: int = Query(20, ge=1, le=500, description="Number of airports to return"),
+    filters: IncidentFilter = Depends(dimension_filter),
+):
+    """
+    Get airports whose incident rate in a recent window is above their own
+    history, most anomalous first. Each airport's window is tested against
+    its baseline rate (Poisson rate-ratio test); q-values control the false
+    discovery rate over all airports tested.
+    """
+    from services.airport_geo import locate
+    from services.data_loader import get_snapshot
+    from services.hotspots import rank_hotspots
+    from services.timeline import bucket_label
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    first_month, n_months = indexes.month_span
+    if n_months == 0:
+        raise HTTPException(status_code=400, detail="No dated incidents to score")
+    
+    if end is None:
+        end_slot = n_months - 1
+    else:
+        year, month = (int(part) for part in end.split("-"))
+        end_slot = year * 12 + month - 1 - first_month
+        if not 0 <= end_slot < n_months:
+            raise HTTPException(
+                status_code=400,
+                detail=f"end must be between {bucket_label(first_month, 'month')} and "
+                       f"{bucket_label(first_month + n_months - 1, 'month')}",
+            )
+    window_end = end_slot + 1
+    window_start = window_end - window
+    if window_start < 1:
+        raise HTTPException(status_code=400, detail="No history before the window to compare with")
+    baseline_start = max(0, window_start - baseline) if baseline else 0
+    
+    with span("aggregate"):
+        scores = _hotspot_scores(snapshot, filters, window_start, window_end, baseline_start)
+        ranked = rank_hotspots(scores, min_incidents, limit)
+    
+    with span("serialize"):
+        threshold = get_settings().SIGNIFICANCE_THRESHOLD
+        codes = indexes.airports.codes
+        hotspots = []
+        for i in ranked:
+            location = locate(codes[i])
+            rate_ratio = float(scores.rate_ratios[i])
+            hotspots.append(AirportHotspot(
+                code=codes[i],
+                name=location.name if location else None,
+                state=location.state if location else None,
+                window_incidents=int(scores.window_counts[i]),
+                baseline_incidents=int(scores.baseline_counts[i]),
+                expected_incidents=round(float(scores.expected[i]), 2),
+                rate_ratio=round(rate_ratio, 2) if rate_ratio != float("inf") else None,
+                z_score=round(float(scores.z_scores[i]), 2),
+                p_value=float(f"{scores.p_values[i]:.3g}"),
+                q_value=float(f"{scores.q_values[i]:.3g}"),
+                significant=bool(scores.q_values[i] < threshold),
+            ))
+    
+    return HotspotsResponse(
+        hotspots=hotspots,
+        window=MonthPeriod(
+            start=bucket_label(first_month + window_start, "month"),
+            end=bucket_label(first_month + window_end - 1, "month"),
+            months=scores.window_months,
+        ),
+        baseline=MonthPeriod(
+            start=bucket_label(first_month + baseline_start, "month"),
+            end=bucket_label(first_month + window_start - 1, "month"),
+            months=scores.baseline_months,
+        ),
+        airports_tested=scores.n_tested,
+        filters=filters.as_params(),
+    )
+
+
+def _breakdown(counts: "np.ndarray", national: "np.ndarray", values: list, limit: int) -> list[ProfileBreakdown]:
+    """Values present at the airport, most frequent first, with national shares."""
+    total = max(int(counts.sum()), 1)
+    national_total = max(int(national.sum()), 1)
+    ranked = sorted(counts.nonzero()[0], key=lambda code: (-counts[code], str(values[code])))[:limit]
+    breakdown = []
+    for code in ranked:
+        share = counts[code] / total * 100
+        national_share = national[code] / national_total * 100
+        breakdown.append(ProfileBreakdown(
+            value=values[code],
+            count=int(counts[code]),
+            share=round(float(share), 1),
+            national_share=round(float(national_share), 1),
+            difference=round(float(share - national_share), 1),
+        ))
+    return breakdown
+
+
+@router.get("/{code}", response_model=AirportProfileResponse)
+async def get_airport_profile(
+    code: str,
+    limit: int = Query(10, ge=1, le=100, description="Values listed per breakdown"),
+):
+    """
+    Get one airport's profile: yearly timeline, top factors, severity,
+    incident type, aircraft, flight phase, light and flight condition mix,
+    each next to the national share. Served from per-airport breakdowns
+    materialized when the dataset loads.
+    """
+    from services.airport_geo import locate
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    positions = indexes.airport_positions((code,))
+    if len(positions) == 0:
+        raise HTTPException(status_code=404, detail=f"Airport {code} not found")
+    code = indexes.airports.codes[positions[0]]
+    
+    with span("aggregate"):
+        profiles = indexes.profiles
+        bitmaps = indexes.bitmaps
+        counts = {name: profiles.breakdown(name, positions) for name in profiles.national}
+        total_incidents = int(counts["severity"].sum())
+    
+    with span("serialize"):
+        years = bitmaps.values("year")
+        timeline = [
+            TimelineDataPoint(year=int(years[i]), incidents=int(counts["year"][i]), period=str(years[i]))
+            for i in sorted(counts["year"].nonzero()[0], key=lambda i: years[i])
+        ]
+        sections = {
+            field: _breakdown(counts[name], profiles.national[name], bitmaps.values(name), limit)
+            for field, name in PROFILE_SECTIONS.items()
+        }
+        location = locate(code)
+        return AirportProfileResponse(
+            code=code,
+            name=location.name if location else None,
+            city=location.city if location else None,
+            state=location.state if location else None,
+            latitude=location.latitude if location else None,
+            longitude=location.longitude if location else None,
+            total_incidents=total_incidents,
+            national_incidents=indexes.n_rows,
+            share_of_national=round(total_incidents / max(indexes.n_rows, 1) * 100, 2),
+            timeline=timeline,
+            factors=_breakdown(counts["factor"], profiles.national["factor"], list(indexes.factors.vocabulary), limit),
+            **sections,
+        )
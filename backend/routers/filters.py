@@ -0,0 +1,72 @@
+"""
+Shared filter query parameters, and the sidebar facet counts.
+
+List and aggregation endpoints declare ``filters: IncidentFilter =
+Depends(incident_filter)`` so they all accept the same filter set as the
+sidebar. Repeat a parameter to match any of several values, e.g.
+``?severity=High&severity=Medium``.
+"""
+from dataclasses import replace
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from schemas.models import FacetsResponse, FacetValue
+from services.filters import IncidentFilter
+from services.instrumentation import span
+
+router = APIRouter(prefix="/api/filters", tags=["filters"])
+
+
+def dimension_filter(
+    factor: Optional[list[str]] = Query(None, description="Contributing factor (repeatable)"),
+    factor_match: str = Query("any", pattern="^(any|all)$", description="Match 'any' or 'all' listed factors"),
+    aircraft_type: Optional[list[str]] = Query(None, description="Aircraft make/model (repeatable)"),
+    state: Optional[list[str]] = Query(None, description="State code (repeatable)"),
+    location: Optional[list[str]] = Query(None, description="Airport code (repeatable)"),
+    incident_type: Optional[list[str]] = Query(None, description="Incident type (repeatable)"),
+    severity: Optional[list[str]] = Query(None, description="Severity level (repeatable)"),
+) -> IncidentFilter:
+    """Categorical filters, for endpoints that take their own year ranges."""
+    return IncidentFilter(
+        factors=tuple(factor or ()),
+        factor_match=factor_match,
+        aircraft_types=tuple(aircraft_type or ()),
+        states=tuple(state or ()),
+        locations=tuple(location or ()),
+        incident_types=tuple(incident_type or ()),
+        severities=tuple(severity or ()),
+    )
+
+
+def incident_filter(
+    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
+    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+    dimensions: IncidentFilter = Depends(dimension_filter),
+) -> IncidentFilter:
+    """Year range plus categorical filters."""
+    return replace(dimensions, start_year=start_year, end_year=end_year)
+
+
+@router.get("/facets", response_model=FacetsResponse)
+async def get_facets(filters: IncidentFilter = Depends(incident_filter)):
+    """
+    Get matching incident counts for every value of every sidebar facet.
+    A value's count is the number of incidents matching the other facets'
+    filters and that value, so the sidebar can show what each click adds.
+    """
+    from services import facets as facet_service
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    with span("aggregate"):
+        total, facets = facet_service.get_facets(snapshot, filters)
+    
+    with span("serialize"):
+        return FacetsResponse(
+            total=total,
+            facets={
+                facet: [FacetValue(value=value, count=count) for value, count in values]
+                for facet, values in facets.items()
+            },
+            filters=filters.as_params(),
+        )
@@ -3,10 +3,10 @@ Incident detail router - endpoint for individual incident reports.
 Includes similar incidents based on text matching (FAISS integration pending).
 """
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
-import pandas as pd
+from typing import TYPE_CHECKING, Optional
 
-from services.data_loader import load_all_data
+from services.instrumentation import span
+from services.singleflight import SingleFlight
 from schemas.models import (
     IncidentDetailResponse,
     IncidentDetail,
@@ -17,12 +17,19 @@ from schemas.models import (
     Severity,
 )
 
+# Data services (pandas, numpy) are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import pandas as pd
+    from services.text_store import TextStore
+
 router = APIRouter(prefix="/api/incidents", tags=["incident-detail"])
 
+_similarity_flights = SingleFlight("similar_incidents")
+
 
-def _classify_severity(row: pd.Series) -> Severity:
-    """Classify incident severity based on available fields."""
-    narrative = str(row.get("synopsis", "") or row.get("narrative_1", "")).lower()
+def _classify_severity(text: Optional[str]) -> Severity:
+    """Classify incident severity from its synopsis."""
+    narrative = str(text or "").lower()
     
     high_indicators = ["runway incursion", "near miss", "collision", "go around", "aborted"]
     for indicator in high_indicators:
@@ -53,17 +60,21 @@ def _extract_highlighted_terms(text: str) -> list[str]:
     return found[:10]  # Limit to 10 terms
 
 
-def _find_similar_incidents(df: pd.DataFrame, target_acn: str, limit: int = 4) -> list[dict]:
+def _find_similar_incidents(
+    df: "pd.DataFrame",
+    texts: "TextStore",
+    target_position: int,
+    limit: int = 4,
+) -> list[dict]:
     """
-    Find similar incidents based on simple text matching.
+    Find similar incidents based on simple text matching over synopses.
     TODO: Replace with FAISS vector similarity search.
     """
-    target_row = df[df["acn"] == target_acn]
-    if len(target_row) == 0:
-        return []
+    import numpy as np
+    import pandas as pd
     
-    target_row = target_row.iloc[0]
-    target_text = str(target_row.get("synopsis", "") or target_row.get("narrative_1", "")).lower()
+    target_acn = str(df["acn"].iloc[target_position])
+    target_text = str(texts.get("synopsis", target_position) or "").lower()
     
     # Extract key terms from target
     key_terms = []
@@ -74,26 +85,25 @@ def _find_similar_incidents(df: pd.DataFrame, target_acn: str, limit: int = 4) -
     if not key_terms:
         key_terms = ["runway"]  # Default
     
-    # Score other incidents
-    other_incidents = df[df["acn"] != target_acn].copy()
-    
-    def score_similarity(row):
-        text = str(row.get("synopsis", "") or row.get("narrative_1", "")).lower()
-        score = sum(1 for term in key_terms if term in text)
-        return score
-    
-    other_incidents["_sim_score"] = other_incidents.apply(score_similarity, axis=1)
-    similar = other_incidents[other_incidents["_sim_score"] > 0].nlargest(limit, "_sim_score")
+    # Score other incidents into a side array (the shared frame is read-only),
+    # scanning the mapped synopses without decoding them
+    matches = np.zeros(len(df), dtype=np.int64)
+    for term in key_terms:
+        matches += texts.contains("synopsis", term)
+    is_other = (df["acn"].astype(str) != target_acn).to_numpy()
+    scores = pd.Series(np.where(is_other, matches, 0))
+    top_scores = scores[scores > 0].nlargest(limit)
     
     results = []
-    for _, row in similar.iterrows():
+    for position, sim_score in top_scores.items():
+        row = df.iloc[position]
         # Determine match reason
-        text = str(row.get("synopsis", "") or row.get("narrative_1", "")).lower()
+        text = str(texts.get("synopsis", position) or "").lower()
         matched_terms = [t for t in key_terms if t in text]
         match_reason = f"Similar: {', '.join(matched_terms[:3])}" if matched_terms else "General similarity"
         
         # Calculate pseudo-similarity percentage
-        sim_pct = min(98, 70 + row["_sim_score"] * 7)
+        sim_pct = min(98, 70 + sim_score * 7)
         
         results.append({
             "acn": str(row.get("acn", "")),
@@ -111,18 +121,23 @@ async def get_incident_detail(acn: str):
     Get full details for a specific incident by ACN.
     Includes similar incidents for the right sidebar.
     """
-    df = load_all_data()
+    import pandas as pd
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    df = snapshot.frame
     
-    # Find the incident - ensure ACN column is string for comparison
-    df["acn"] = df["acn"].astype(str)
-    incident_row = df[df["acn"] == acn]
-    if len(incident_row) == 0:
+    # Find the incident via the ACN index
+    with span("filter"):
+        position = snapshot.indexes.position_of(acn)
+    if position is None:
         raise HTTPException(status_code=404, detail=f"Incident {acn} not found")
     
-    row = incident_row.iloc[0]
+    row = df.iloc[position]
     
-    # Get narrative text
-    narrative = str(row.get("synopsis", "") or row.get("narrative_1", "") or "No narrative available.")
+    # Get narrative text (fetched from the text store by row position)
+    synopsis = snapshot.texts.get("synopsis", position)
+    narrative = str(synopsis or "No narrative available.")
     
     # Parse date
     date_str = ""
@@ -159,7 +174,8 @@ async def get_incident_detail(acn: str):
         factors = [f.strip() for f in str(row["contributing_factors"]).split(";") if f.strip()]
     
     # Determine severity
-    severity = _classify_severity(row)
+    with span("classify"):
+        severity = _classify_severity(synopsis)
     
     # Generate title
     airport = location.airport_code or "Unknown"
@@ -181,7 +197,11 @@ async def get_incident_detail(acn: str):
     )
     
     # Find similar incidents
-    similar_data = _find_similar_incidents(df, acn)
+    # Identical concurrent requests (e.g. a shared link) share one scan
+    with span("similarity"):
+        similar_data = await _similarity_flights.run(
+            (snapshot.version, position), _find_similar_incidents, df, snapshot.texts, position,
+        )
     similar_incidents = [SimilarIncident(**s) for s in similar_data]
     
     return IncidentDetailResponse(
@@ -1,27 +1,49 @@
 """
 Incidents router - endpoints for dashboard incident data.
-Supports dynamic year range filtering from the sidebar.
+Every endpoint accepts the sidebar filter set (see routers.filters).
+Year-only requests are answered from the precomputed year cubes; other
+filter combinations select rows through the bitmap index and aggregate
+them with the configured query engine (services.query_engine). Handlers
+that call the engine directly are plain functions, so FastAPI runs them
+in worker threads and the event loop stays free meanwhile.
 """
-from fastapi import APIRouter, Query
-from typing import Optional
-import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import TYPE_CHECKING, Optional
 
-from services.data_loader import load_all_data, filter_by_year_range
+from routers.filters import incident_filter
+from services.filters import IncidentFilter
+from services.instrumentation import span
+from services.profiling import profile_thread
+from services.singleflight import SingleFlight
 from schemas.models import (
     TimelineResponse,
     TimelineDataPoint,
     FactorsResponse,
     ContributingFactor,
+    CooccurrenceResponse,
+    CooccurrenceEdge,
     IncidentsResponse,
     IncidentSummary,
     Pagination,
     Risk,
-    Severity,
     SummaryResponse,
+    MapResponse,
+    AirportGeoData,
 )
 
+# Data services (pandas, numpy) are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from services.data_loader import DatasetSnapshot
+
 router = APIRouter(prefix="/api/incidents", tags=["incidents"])
 
+_factor_flights = SingleFlight("factors")
+
+# Upper bound on the timeline's moving-average window, in buckets
+MAX_ROLLING_WINDOW = 120
+
 
 def _classify_risk(count: int, high_threshold: int = 400, medium_threshold: int = 200) -> Risk:
     """Classify risk level based on count thresholds."""
@@ -32,119 +54,216 @@ def _classify_risk(count: int, high_threshold: int = 400, medium_threshold: int
     return Risk.LOW
 
 
-def _classify_severity(row: pd.Series) -> Severity:
-    """
-    Classify incident severity based on available fields.
-    Uses contributing factors and anomaly type as heuristics.
-    """
-    # Check for high-severity indicators
-    high_indicators = ["runway incursion", "near miss", "collision"]
-    narrative = str(row.get("synopsis", "") or row.get("narrative", "")).lower()
-    anomaly = str(row.get("anomaly", "")).lower()
+def _build_report_rows(
+    page_df: "pd.DataFrame",
+    severities: list[str],
+    incident_types: list[str],
+) -> list[IncidentSummary]:
+    """Convert a page of incidents to report table rows."""
+    import pandas as pd
+    
+    reports = []
+    for (_, row), severity, inc_type in zip(page_df.iterrows(), severities, incident_types):
+        # Format date
+        date_str = ""
+        if pd.notna(row.get("Date_parsed")):
+            date_str = row["Date_parsed"].strftime("%Y-%m-%d")
+        elif pd.notna(row.get("date_raw")):
+            date_str = str(row["date_raw"])
+        
+        reports.append(IncidentSummary(
+            acn=str(row.get("acn", "")),
+            date=date_str,
+            location=str(row.get("airport_code", row.get("airport", ""))),
+            type=inc_type,
+            severity=severity
+        ))
+    return reports
+
+
+def _monthly_counts(snapshot: "DatasetSnapshot", filters: IncidentFilter) -> "np.ndarray":
+    """Rows per month cube slot matching the categorical filters."""
+    from dataclasses import replace
+    from services.query_engine import get_query_engine
     
-    for indicator in high_indicators:
-        if indicator in narrative or indicator in anomaly:
-            return Severity.HIGH
+    indexes = snapshot.indexes
+    dimensions = replace(filters, start_year=None, end_year=None).normalized()
+    if dimensions == IncidentFilter():
+        return indexes.month_cube.incidents
+    if dimensions == IncidentFilter(locations=dimensions.locations):
+        # Airports only: rows of the precomputed airport x month counts
+        return indexes.airport_months[indexes.airport_positions(dimensions.locations)].sum(axis=0)
+    return get_query_engine().month_counts(snapshot, dimensions.select(snapshot).mask)
+
+
+def _timeline_series(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    granularity: str,
+) -> tuple["np.ndarray", "np.ndarray", int]:
+    """Bucket ordinals and counts of the timeline, and the incidents they cover."""
+    from services.query_engine import get_query_engine
+    from services.timeline import bucket_counts
     
-    # Check contributing factors for severity hints
-    factors = str(row.get("contributing_factors", "")).lower()
-    if "human factors" in factors:
-        return Severity.MEDIUM
+    indexes = snapshot.indexes
+    cube = indexes.cube
+    start_year, end_year = filters.start_year, filters.end_year
+    if granularity != "year":
+        # Undated rows fall outside every month bucket; leave them out of the total too
+        first_month, _ = indexes.month_span
+        ordinals, counts = bucket_counts(
+            first_month, _monthly_counts(snapshot, filters), granularity, start_year, end_year,
+        )
+        return ordinals, counts, int(counts.sum())
     
-    return Severity.LOW
+    if filters.has_dimensions:
+        rows = filters.select(snapshot)
+        total_incidents = rows.count
+        ordinals, counts = get_query_engine().year_counts(snapshot, rows.mask)
+    else:
+        # Read yearly counts from the precomputed year cube
+        total_incidents = cube.incident_count(start_year, end_year)
+        slots = cube.slot_mask(start_year, end_year)
+        ordinals = cube.years[slots[:-1]]
+        counts = cube.incidents[:-1][slots[:-1]]
+        present = counts > 0
+        ordinals, counts = ordinals[present], counts[present]
+    return ordinals, counts, total_incidents
 
 
 @router.get("/timeline", response_model=TimelineResponse)
-async def get_timeline(
-    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
-    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
+@profile_thread
+def get_timeline(
+    granularity: str = Query("year", pattern="^(year|quarter|month)$", description="Bucket size"),
+    rolling: int = Query(0, ge=0, le=MAX_ROLLING_WINDOW, description="Trailing moving-average window in buckets (0 = none)"),
+    decompose: bool = Query(False, description="Add a seasonal decomposition (quarter or month granularity)"),
+    filters: IncidentFilter = Depends(incident_filter),
 ):
     """
-    Get incident counts by year for the timeline chart.
-    Supports filtering by year range.
+    Get incident counts by year, quarter or month for the timeline chart.
+    Supports the full sidebar filter set. Quarters and months are summed
+    from precomputed monthly counts.
     """
-    df = load_all_data()
-    df = filter_by_year_range(df, start_year, end_year)
-    
-    # Group by year and count incidents
-    yearly_counts = (
-        df.groupby("Year")
-        .size()
-        .reset_index(name="incidents")
-    )
+    import numpy as np
+    from services.data_loader import get_snapshot
+    from services.timeline import BUCKET_MONTHS, SEASONAL_PERIODS, bucket_label, rolling_mean, seasonal_decompose
     
-    # Convert to response format
-    data = [
-        TimelineDataPoint(year=int(row["Year"]), incidents=int(row["incidents"]))
-        for _, row in yearly_counts.iterrows()
-        if pd.notna(row["Year"])
-    ]
+    if decompose and granularity not in SEASONAL_PERIODS:
+        raise HTTPException(status_code=400, detail="decompose requires quarter or month granularity")
     
-    # Sort by year
-    data.sort(key=lambda x: x.year)
+    snapshot = get_snapshot()
+    with span("aggregate"):
+        ordinals, counts, total_incidents = _timeline_series(snapshot, filters, granularity)
+        if granularity == "year" and len(ordinals) > 0 and (rolling or decompose):
+            # Smooth over calendar years, counting years without incidents
+            dense = np.zeros(ordinals[-1] - ordinals[0] + 1, dtype=np.int64)
+            dense[ordinals - ordinals[0]] = counts
+            ordinals, counts = np.arange(ordinals[0], ordinals[-1] + 1), dense
+        
+        smoothed = rolling_mean(counts, rolling) if rolling else None
+        trend = seasonal = residual = None
+        if decompose:
+            period = SEASONAL_PERIODS[granularity]
+            if len(counts) < 2 * period:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"decompose needs at least {2 * period} {granularity}s of data",
+                )
+            trend, seasonal, residual = seasonal_decompose(counts, period, phase=int(ordinals[0]) % period)
+    
+    def optional(values: Optional["np.ndarray"], i: int) -> Optional[float]:
+        if values is None or np.isnan(values[i]):
+            return None
+        return round(float(values[i]), 2)
+    
+    with span("serialize"):
+        # Convert to response format (buckets are already sorted)
+        years = ordinals * BUCKET_MONTHS[granularity] // 12
+        data = [
+            TimelineDataPoint(
+                year=int(year),
+                incidents=int(count),
+                period=bucket_label(int(ordinal), granularity),
+                rolling_mean=optional(smoothed, i),
+                trend=optional(trend, i),
+                seasonal=optional(seasonal, i),
+                residual=optional(residual, i),
+            )
+            for i, (year, ordinal, count) in enumerate(zip(years, ordinals, counts))
+        ]
     
     return TimelineResponse(
         data=data,
         benchmark_year=2017,
         metadata={
-            "total_incidents": int(df.shape[0]),
+            "total_incidents": total_incidents,
+            "granularity": granularity,
             "date_range": {
-                "start": int(yearly_counts["Year"].min()) if len(yearly_counts) > 0 else None,
-                "end": int(yearly_counts["Year"].max()) if len(yearly_counts) > 0 else None,
+                "start": int(years[0]) if len(years) > 0 else None,
+                "end": int(years[-1]) if len(years) > 0 else None,
             }
         }
     )
 
 
+def _aggregate_factors(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    limit: int,
+) -> tuple[list[tuple[str, int]], int]:
+    """Top factor counts and the number of incidents they were counted over."""
+    from services.query_engine import get_query_engine
+    
+    indexes = snapshot.indexes
+    with span("aggregate"):
+        if filters.has_dimensions:
+            rows = filters.select(snapshot)
+            totals = get_query_engine().factor_totals(snapshot, rows.mask)
+            total_incidents = rows.count
+        else:
+            # Sum precomputed per-year factor counts over the range
+            totals = indexes.cube.factor_totals(filters.start_year, filters.end_year)
+            total_incidents = indexes.cube.incident_count(filters.start_year, filters.end_year)
+        return indexes.top_factors(totals, limit), total_incidents
+
+
 @router.get("/factors", response_model=FactorsResponse)
 async def get_factors(
-    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
-    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
     limit: int = Query(10, description="Maximum number of factors to return"),
+    filters: IncidentFilter = Depends(incident_filter),
 ):
     """
     Get contributing factors with counts for the bar chart.
-    Supports filtering by year range.
+    Supports the full sidebar filter set.
     """
-    df = load_all_data()
-    df = filter_by_year_range(df, start_year, end_year)
-    
-    # Explode multi-valued contributing factors
-    factors_df = df[["contributing_factors"]].copy()
-    factors_df = factors_df.dropna(subset=["contributing_factors"])
-    factors_df["factor"] = factors_df["contributing_factors"].str.split("; ")
-    factors_df = factors_df.explode("factor")
-    factors_df["factor"] = factors_df["factor"].str.strip()
-    factors_df = factors_df[factors_df["factor"] != ""]
-    
-    # Count factors
-    factor_counts = (
-        factors_df["factor"]
-        .value_counts()
-        .head(limit)
-        .reset_index()
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    # Identical concurrent requests share one aggregation
+    factor_counts, total_incidents = await _factor_flights.run(
+        (snapshot.version, filters.normalized(), limit), _aggregate_factors, snapshot, filters, limit,
     )
-    factor_counts.columns = ["factor", "count"]
     
     # Calculate risk thresholds dynamically
-    max_count = factor_counts["count"].max() if len(factor_counts) > 0 else 0
+    max_count = factor_counts[0][1] if factor_counts else 0
     high_threshold = int(max_count * 0.7)
     medium_threshold = int(max_count * 0.4)
     
     # Convert to response format
-    factors = [
-        ContributingFactor(
-            factor=row["factor"],
-            count=int(row["count"]),
-            risk=_classify_risk(row["count"], high_threshold, medium_threshold)
-        )
-        for _, row in factor_counts.iterrows()
-    ]
+    with span("serialize"):
+        factors = [
+            ContributingFactor(
+                factor=factor,
+                count=count,
+                risk=_classify_risk(count, high_threshold, medium_threshold)
+            )
+            for factor, count in factor_counts
+        ]
     
     return FactorsResponse(
         factors=factors,
         metadata={
-            "total_incidents_analyzed": int(df.shape[0]),
+            "total_incidents_analyzed": total_incidents,
             "risk_thresholds": {
                 "high": high_threshold,
                 "medium": medium_threshold
@@ -153,68 +272,187 @@ async def get_factors(
     )
 
 
+@router.get("/factor-cooccurrence", response_model=CooccurrenceResponse)
+async def get_factor_cooccurrence(
+    limit: int = Query(15, ge=1, le=100, description="Number of factors (most cited first)"),
+    min_count: int = Query(1, ge=1, description="Minimum shared incidents for an edge"),
+    filters: IncidentFilter = Depends(incident_filter),
+):
+    """
+    Get the contributing factor co-occurrence matrix and network edges.
+    Each edge carries the incidents citing both factors, with lift and
+    pointwise mutual information against independence. Supports the full
+    sidebar filter set.
+    """
+    import numpy as np
+    from services.cooccurrence import get_cooccurrence
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    
+    with span("aggregate"):
+        cooccurrence = get_cooccurrence(snapshot, filters)
+        ranked = indexes.top_factors(np.diag(cooccurrence.counts), limit)
+        codes = np.array([indexes.factors.code_of(factor) for factor, _ in ranked], dtype=np.int64)
+        counts = cooccurrence.counts[np.ix_(codes, codes)]
+        lift = cooccurrence.lift()[np.ix_(codes, codes)]
+        pmi = cooccurrence.pmi()[np.ix_(codes, codes)]
+        sources, targets = np.triu_indices(len(codes), k=1)
+        linked = counts[sources, targets] >= min_count
+        sources, targets = sources[linked], targets[linked]
+        order = np.lexsort((-lift[sources, targets], -counts[sources, targets]))
+    
+    with span("serialize"):
+        factors = [factor for factor, _ in ranked]
+        edges = [
+            CooccurrenceEdge(
+                source=factors[i],
+                target=factors[j],
+                incidents=int(counts[i, j]),
+                lift=round(float(lift[i, j]), 3),
+                pmi=round(float(pmi[i, j]), 3),
+            )
+            for i, j in zip(sources[order], targets[order])
+        ]
+    
+    return CooccurrenceResponse(
+        factors=factors,
+        matrix=counts.tolist(),
+        edges=edges,
+        metadata={
+            "total_incidents": cooccurrence.total,
+            "filters": filters.as_params(),
+        },
+    )
+
+
+@router.get("/map", response_model=MapResponse)
+async def get_incident_map(
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom level; nearby airports are clustered below zoom 8"),
+    filters: IncidentFilter = Depends(incident_filter),
+):
+    """
+    Get incident counts per airport for the map view.
+    A year range and at most one factor are answered from precomputed
+    airport x year (x factor) groups; other filters select rows through the
+    bitmap index. Airports are joined to the bundled coordinate table and
+    clustered by zoom level.
+    """
+    from dataclasses import replace
+    from services.airport_geo import MapPoint, cell_degrees, cluster_points, locate
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    airports = indexes.airports
+    start_year, end_year = filters.start_year, filters.end_year
+    
+    with span("aggregate"):
+        if len(filters.factors) <= 1 and not replace(filters, factors=()).has_dimensions:
+            factor = filters.factors[0] if filters.factors else None
+            factor_code = indexes.factors.code_of(factor) if factor else None
+            if factor and factor_code is None:
+                # No incident cites an unknown factor
+                totals = airports.totals(start_year, end_year)[:0]
+            else:
+                totals = airports.totals(start_year, end_year, factor_code)
+        else:
+            totals = airports.totals_of(filters.select(snapshot).mask)
+        
+        # Join airports that have incidents to their coordinates
+        points = []
+        unlocated = unlocated_airports = 0
+        for i in totals.nonzero()[0]:
+            code = airports.codes[i]
+            location = locate(code)
+            if location is None:
+                unlocated += int(totals[i])
+                unlocated_airports += 1
+                continue
+            points.append(MapPoint(
+                code=code,
+                name=location.name,
+                state=location.state,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                incidents=int(totals[i]),
+            ))
+        points = cluster_points(points, zoom)
+        located = sum(p.incidents for p in points)
+    
+    # Calculate risk thresholds dynamically
+    max_count = points[0].incidents if points else 0
+    high_threshold = int(max_count * 0.7)
+    medium_threshold = int(max_count * 0.4)
+    
+    with span("serialize"):
+        data = [
+            AirportGeoData(
+                code=p.code,
+                name=p.name,
+                latitude=p.latitude,
+                longitude=p.longitude,
+                incidents=p.incidents,
+                risk=_classify_risk(p.incidents, high_threshold, medium_threshold),
+                state=p.state,
+                cluster_size=p.cluster_size,
+            )
+            for p in points
+        ]
+    
+    return MapResponse(
+        airports=data,
+        risk_thresholds={
+            "high": high_threshold,
+            "medium": medium_threshold
+        },
+        metadata={
+            "located_incidents": located,
+            "unlocated_incidents": unlocated,
+            "unlocated_airports": unlocated_airports,
+            # Share of incidents at a known airport that the map can place
+            "located_share": round(located / (located + unlocated) * 100, 1) if located + unlocated else None,
+            "zoom": zoom,
+            "cell_degrees": cell_degrees(zoom),
+        }
+    )
+
+
 @router.get("", response_model=IncidentsResponse)
 async def get_incidents(
-    start_year: Optional[int] = Query(None, description="Start year (inclusive)"),
-    end_year: Optional[int] = Query(None, description="End year (inclusive)"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    location: Optional[str] = Query(None, description="Airport code filter"),
-    severity: Optional[str] = Query(None, description="Severity filter"),
+    filters: IncidentFilter = Depends(incident_filter),
 ):
     """
     Get paginated list of incidents for the report table.
-    Supports filtering by year range, location, and severity.
+    Supports the full sidebar filter set.
     """
-    df = load_all_data()
-    df = filter_by_year_range(df, start_year, end_year)
+    from services.data_loader import get_snapshot
     
-    # Apply filters
-    if location:
-        df = df[df["airport_code"].str.upper() == location.upper()]
+    snapshot = get_snapshot()
+    df = snapshot.frame
+    indexes = snapshot.indexes
     
-    # Add severity classification
-    df["severity_calc"] = df.apply(_classify_severity, axis=1)
-    
-    if severity:
-        df = df[df["severity_calc"] == severity]
+    # Resolve the filters through the bitmap index
+    with span("filter"):
+        positions = filters.select(snapshot).positions
     
     # Calculate pagination
-    total = len(df)
+    total = len(positions)
     total_pages = (total + limit - 1) // limit
     offset = (page - 1) * limit
     
     # Get page of results
-    page_df = df.iloc[offset:offset + limit]
+    page_positions = positions[offset:offset + limit]
+    page_df = df.iloc[page_positions]
     
     # Convert to response format
-    reports = []
-    for _, row in page_df.iterrows():
-        # Format date
-        date_str = ""
-        if pd.notna(row.get("Date_parsed")):
-            date_str = row["Date_parsed"].strftime("%Y-%m-%d")
-        elif pd.notna(row.get("date_raw")):
-            date_str = str(row["date_raw"])
-        
-        # Determine incident type from anomaly or primary problem
-        inc_type = "Runway Incursion"  # Default
-        if pd.notna(row.get("anomaly")):
-            anomaly = str(row["anomaly"])
-            if "Taxi" in anomaly:
-                inc_type = "Taxi Deviation"
-            elif "Communication" in anomaly:
-                inc_type = "Communication Error"
-            elif "Hold" in anomaly:
-                inc_type = "Hold Short Violation"
-        
-        reports.append(IncidentSummary(
-            acn=str(row.get("acn", "")),
-            date=date_str,
-            location=str(row.get("airport_code", row.get("airport", ""))),
-            type=inc_type,
-            severity=row["severity_calc"]
-        ))
+    with span("serialize"):
+        reports = _build_report_rows(
+            page_df, indexes.severity_of(page_positions), indexes.incident_type_of(page_positions)
+        )
     
     return IncidentsResponse(
         reports=reports,
@@ -228,40 +466,49 @@ async def get_incidents(
 
 
 @router.get("/summary", response_model=SummaryResponse)
-async def get_summary():
+@profile_thread
+def get_summary(filters: IncidentFilter = Depends(incident_filter)):
     """
     Get summary statistics for the landing page.
-    Returns total incidents, date range, and primary risk factor.
+    Returns total incidents, date range, and primary risk factor, over the
+    rows matching the sidebar filters when any are given.
     """
     from datetime import datetime
+    from services.data_loader import get_snapshot
+    from services.query_engine import get_query_engine
     
-    df = load_all_data()
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    cube = indexes.cube
     
-    # Calculate total incidents
-    total_incidents = len(df)
+    with span("aggregate"):
+        if filters.is_empty:
+            total_incidents = indexes.n_rows
+            known_years = cube.years[cube.incidents[:-1] > 0]
+            factor_totals = cube.factor_totals()
+        else:
+            rows = filters.select(snapshot)
+            total_incidents = rows.count
+            engine = get_query_engine()
+            known_years, _ = engine.year_counts(snapshot, rows.mask)
+            factor_totals = engine.factor_totals(snapshot, rows.mask)
     
     # Calculate year range
-    min_year = int(df["Year"].min()) if len(df) > 0 and pd.notna(df["Year"].min()) else 2001
-    max_year = int(df["Year"].max()) if len(df) > 0 and pd.notna(df["Year"].max()) else 2025
-    span = max_year - min_year + 1
+    min_year = int(known_years[0]) if len(known_years) > 0 else 2001
+    max_year = int(known_years[-1]) if len(known_years) > 0 else 2025
+    year_span = max_year - min_year + 1
     
     # Find primary risk factor (most common contributing factor)
-    factors_df = df[["contributing_factors"]].dropna()
-    factors_df["factor"] = factors_df["contributing_factors"].str.split("; ")
-    factors_df = factors_df.explode("factor")
-    factors_df["factor"] = factors_df["factor"].str.strip()
-    factors_df = factors_df[factors_df["factor"] != ""]
-    
-    primary_risk = "Unknown"
-    if len(factors_df) > 0:
-        primary_risk = factors_df["factor"].mode().iloc[0] if len(factors_df["factor"].mode()) > 0 else "Unknown"
+    with span("aggregate"):
+        ranked = indexes.top_factors(factor_totals, limit=1)
+        primary_risk = ranked[0][0] if ranked else "Unknown"
     
     return SummaryResponse(
         total_incidents=total_incidents,
         date_range={
             "start": min_year,
             "end": max_year,
-            "span": span
+            "span": year_span
         },
         primary_risk=primary_risk,
         last_updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
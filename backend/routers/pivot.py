@@ -0,0 +1,83 @@
+"""
+Pivot router - cross-tabs of the categorical report dimensions.
+One generic endpoint instead of a handler per breakdown; accepts the
+sidebar filter set like the incident endpoints. The handler is a plain
+function, so the query engine runs in a worker thread, not on the event loop.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+
+from routers.filters import incident_filter
+from services.filters import IncidentFilter
+from services.instrumentation import span
+from services.profiling import profile_thread
+from schemas.models import PivotCell, PivotResponse
+
+router = APIRouter(prefix="/api/pivot", tags=["pivot"])
+
+
+def _plain(value):
+    """Python scalar for a dimension value (years may be numpy integers)."""
+    return value.item() if hasattr(value, "item") else value
+
+
+@router.get("", response_model=PivotResponse)
+@profile_thread
+def get_pivot(
+    rows: list[str] = Query(..., description="Row dimension (repeatable)"),
+    columns: Optional[list[str]] = Query(None, description="Column dimension (repeatable)"),
+    measure: str = Query("count", pattern="^(count|total_share|row_share|column_share)$", description="Cell counts, or percent of the table, row or column"),
+    filters: IncidentFilter = Depends(incident_filter),
+):
+    """
+    Get counts of the filtered incidents per combination of up to three
+    dimensions (year, state, location, aircraft_type, factor, severity,
+    incident_type, flight_phase, light, flight_conditions, time_of_day).
+    Only non-empty cells are returned. With a factor dimension every factor
+    mention is counted.
+    """
+    from services.data_loader import get_snapshot
+    from services.pivot import MAX_PIVOT_DIMENSIONS, PIVOT_DIMENSIONS, cell_labels, cell_shares, get_pivot as pivot_of
+    
+    columns = columns or []
+    dimensions = tuple(rows) + tuple(columns)
+    unknown = [d for d in dimensions if d not in PIVOT_DIMENSIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown pivot dimension(s) {', '.join(unknown)}; choose from {', '.join(PIVOT_DIMENSIONS)}",
+        )
+    if len(dimensions) > MAX_PIVOT_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"A pivot takes at most {MAX_PIVOT_DIMENSIONS} dimensions")
+    if len(set(dimensions)) < len(dimensions):
+        raise HTTPException(status_code=400, detail="Pivot dimensions must be distinct")
+    
+    snapshot = get_snapshot()
+    with span("aggregate"):
+        cube = pivot_of(snapshot, filters, dimensions)
+        shares = cell_shares(cube, len(rows), measure) if measure != "count" else None
+    
+    with span("serialize"):
+        row_axes, column_axes = range(len(rows)), range(len(rows), len(dimensions))
+        cells = [
+            PivotCell(
+                row=[_plain(v) for v in cell_labels(cube, i, row_axes)],
+                column=[_plain(v) for v in cell_labels(cube, i, column_axes)],
+                count=int(count),
+                share=round(float(shares[i]), 2) if shares is not None else None,
+            )
+            for i, count in enumerate(cube.counts)
+        ]
+    
+    return PivotResponse(
+        rows=list(rows),
+        columns=list(columns),
+        values={
+            dimension: [_plain(v) for v in values]
+            for dimension, values in zip(dimensions, cube.values)
+        },
+        cells=cells,
+        total=cube.total,
+        measure=measure,
+        filters=filters.as_params(),
+    )
@@ -1,6 +1,8 @@
 """
 Topics router - endpoints for topic modeling visualization.
 Provides pre-computed topic model results (LDA and BERTopic).
+The narratives endpoint scans report text and is a plain function, so
+FastAPI runs it in a worker thread.
 """
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional, List
@@ -13,7 +15,9 @@ from schemas.models import (
     TopicNarrativesResponse,
     TopicNarrative,
 )
-from services.data_loader import load_all_data, filter_by_year_range
+from services.filters import IncidentFilter
+from services.instrumentation import span
+from services.profiling import profile_thread
 
 router = APIRouter(prefix="/api/topics", tags=["topics"])
 
@@ -126,10 +130,11 @@ async def get_topics(
         model_name = "LDA"
         num_topics = 10
     
+    from services.data_loader import get_snapshot
+    
     # Get actual document count for metadata
-    df = load_all_data()
-    df = filter_by_year_range(df, start_year, end_year)
-    total_docs = len(df)
+    snapshot = get_snapshot()
+    total_docs = IncidentFilter(start_year=start_year, end_year=end_year).select(snapshot).count
     
     # Convert to response format
     clusters = [
@@ -180,7 +185,8 @@ async def get_topic_keywords(
 
 
 @router.get("/{topic_id}/narratives", response_model=TopicNarrativesResponse)
-async def get_topic_narratives(
+@profile_thread
+def get_topic_narratives(
     topic_id: int,
     limit: int = Query(3, description="Number of narratives to return"),
 ):
@@ -188,7 +194,11 @@ async def get_topic_narratives(
     Get representative narratives for a specific topic.
     Returns actual ASRS reports that best represent the topic.
     """
-    df = load_all_data()
+    from services.data_loader import get_snapshot
+    
+    snapshot = get_snapshot()
+    df = snapshot.frame
+    texts = snapshot.texts
     
     # Get keywords for this topic to find matching narratives
     keywords = [kw["keyword"] for kw in TOPIC_KEYWORDS.get(topic_id, TOPIC_KEYWORDS[1])][:5]
@@ -196,29 +206,20 @@ async def get_topic_narratives(
     # Find narratives that contain topic keywords
     narratives = []
     
-    # Search in synopsis column for matching keywords
-    synopsis_col = "synopsis" if "synopsis" in df.columns else None
-    narrative_col = None
-    for col in df.columns:
-        if "narrative" in col.lower():
-            narrative_col = col
-            break
-    
-    text_col = synopsis_col or narrative_col
+    # Search the synopsis text (or the full narrative) for matching keywords
+    text_col = next((col for col in ("synopsis", "narrative") if col in texts.columns), None)
     
-    if text_col and text_col in df.columns:
-        # Score each row by keyword matches
-        def score_text(text):
-            if not isinstance(text, str):
-                return 0
-            text_lower = text.lower()
-            return sum(1 for kw in keywords if kw in text_lower)
+    if text_col:
+        import numpy as np
+        import pandas as pd
         
-        df["_score"] = df[text_col].apply(score_text)
-        top_matches = df[df["_score"] > 0].nlargest(limit, "_score")
+        # Score each row by keyword matches, scanning the mapped text
+        with span("aggregate"):
+            scores = pd.Series(np.sum([texts.contains(text_col, kw) for kw in keywords], axis=0, dtype=np.int64))
+            top_scores = scores[scores > 0].nlargest(limit)
         
-        for _, row in top_matches.iterrows():
-            text = str(row.get(text_col, ""))
+        for position in top_scores.index:
+            text = str(texts.get(text_col, position))
             # Truncate if too long
             if len(text) > 500:
                 text = text[:497] + "..."
@@ -227,7 +228,7 @@ async def get_topic_narratives(
             matched_keywords = [kw for kw in keywords if kw in text.lower()]
             
             narratives.append(TopicNarrative(
-                acn=f"ACN-{row.get('acn', 'Unknown')}",
+                acn=f"ACN-{df['acn'].iloc[position]}",
                 narrative=text,
                 keywords=matched_keywords[:5]
             ))
@@ -1,13 +1,19 @@
 """
 Trends router - endpoints for trend analysis comparing baseline vs inference periods.
 Default split: Baseline (2012-2017) vs Inference (2018-2025)
+Periods take their own year ranges; the sidebar's categorical filters apply
+to both periods. Aggregations run off the event loop: through SingleFlight
+groups, or in FastAPI's worker threads for the plain-function handlers.
 """
-from fastapi import APIRouter, Query
-from typing import Optional
-import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import TYPE_CHECKING, Optional
 
 from config import get_settings
-from services.data_loader import load_all_data, filter_by_year_range
+from routers.filters import dimension_filter
+from services.filters import IncidentFilter
+from services.instrumentation import record_cache, span
+from services.profiling import profile_thread
+from services.singleflight import SingleFlight
 from schemas.models import (
     KPIsResponse,
     DeltaKPI,
@@ -16,33 +22,116 @@ from schemas.models import (
     EmergingPatternsResponse,
     EmergingPattern,
     TrendDirection,
+    TrendPeriod,
+    SweepPoint,
+    SweepResponse,
+    CohortPeriod,
+    CohortDelta,
+    CohortComparisonResponse,
 )
 
+# Data services (pandas, numpy) are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import numpy as np
+    from services.data_loader import DatasetSnapshot
+    from services.indexes import DatasetIndexes
+    from services.trend_analysis import ShiftSignificance
+
 router = APIRouter(prefix="/api/trends", tags=["trends"])
 
-settings = get_settings()
+# Upper bound on bootstrap resamples per comparison request
+MAX_BOOTSTRAP_RESAMPLES = 10000
 
+# Upper bound on periods per cohort comparison (the delta list grows quadratically)
+MAX_COHORT_PERIODS = 30
 
-def _get_factor_distribution(df: pd.DataFrame) -> dict[str, float]:
-    """Calculate percentage distribution of contributing factors."""
-    if len(df) == 0:
-        return {}
-    
-    # Explode multi-valued factors
-    factors_df = df[["contributing_factors"]].copy()
-    factors_df = factors_df.dropna(subset=["contributing_factors"])
-    factors_df["factor"] = factors_df["contributing_factors"].str.split("; ")
-    factors_df = factors_df.explode("factor")
-    factors_df["factor"] = factors_df["factor"].str.strip()
-    factors_df = factors_df[factors_df["factor"] != ""]
+_kpi_flights = SingleFlight("trend_kpis")
+_comparison_flights = SingleFlight("trend_comparison")
+
+
+def _period_factor_totals(
+    snapshot: "DatasetSnapshot",
+    start_year: int,
+    end_year: int,
+    rows: Optional["np.ndarray"] = None,
+) -> "np.ndarray":
+    """Factor mention counts over a year range, among ``rows`` when given."""
+    from services.query_engine import get_query_engine
     
-    # Calculate percentages
-    total = len(factors_df)
-    if total == 0:
-        return {}
+    indexes = snapshot.indexes
+    if rows is None:
+        # Sum precomputed per-year factor counts
+        return indexes.cube.factor_totals(start_year, end_year)
+    return get_query_engine().factor_totals(snapshot, rows & indexes.year_mask(start_year, end_year))
+
+
+def _get_factor_distribution(
+    snapshot: "DatasetSnapshot",
+    start_year: int,
+    end_year: int,
+    rows: Optional["np.ndarray"] = None,
+) -> dict[str, float]:
+    """
+    Calculate percentage distribution of contributing factors over a year
+    range, among ``rows`` (a boolean row mask) when given.
+    """
+    with span("aggregate"):
+        counts = snapshot.indexes.top_factors(_period_factor_totals(snapshot, start_year, end_year, rows))
+        
+        # Calculate percentages
+        total = sum(count for _, count in counts)
+        if total == 0:
+            return {}
+        
+        return {factor: (count / total) * 100 for factor, count in counts}
+
+
+def _filtered_rows(snapshot: "DatasetSnapshot", filters: IncidentFilter) -> Optional["np.ndarray"]:
+    """Row mask of the categorical filters, or None when there are none."""
+    if not filters.has_dimensions:
+        return None
+    with span("filter"):
+        return filters.select(snapshot).mask
+
+
+def _period_count(indexes: "DatasetIndexes", start_year: int, end_year: int, rows: Optional["np.ndarray"]) -> int:
+    if rows is None:
+        return indexes.cube.incident_count(start_year, end_year)
+    return int((rows & indexes.year_mask(start_year, end_year)).sum())
+
+
+def _shift_significance(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    rows: Optional["np.ndarray"],
+    periods: tuple[int, int, int, int],
+    bootstrap: int = 0,
+) -> "ShiftSignificance":
+    """Per-factor significance of the baseline -> inference shift, cached per dataset version."""
+    from services.trend_analysis import get_significance_cache, shift_significance
     
-    counts = factors_df["factor"].value_counts()
-    return {factor: (count / total) * 100 for factor, count in counts.items()}
+    cache = get_significance_cache()
+    key = repr((filters.normalized(), periods, bootstrap))
+    result = cache.get(snapshot.version, key)
+    record_cache("significance", hit=result is not None)
+    if result is None:
+        b_start, b_end, i_start, i_end = periods
+        with span("statistics"):
+            result = shift_significance(
+                _period_factor_totals(snapshot, b_start, b_end, rows),
+                _period_factor_totals(snapshot, i_start, i_end, rows),
+                bootstrap=bootstrap,
+            )
+        cache.put(snapshot.version, key, result)
+    return result
+
+
+def _round_p(p_value: Optional[float]) -> Optional[float]:
+    return None if p_value is None else float(f"{p_value:.3g}")
+
+
+def _is_significant(p_value: Optional[float]) -> Optional[bool]:
+    return None if p_value is None else p_value < get_settings().SIGNIFICANCE_THRESHOLD
 
 
 def _calculate_variance(baseline: float, inference: float) -> float:
@@ -50,31 +139,21 @@ def _calculate_variance(baseline: float, inference: float) -> float:
     return round(inference - baseline, 1)
 
 
-@router.get("/kpis", response_model=KPIsResponse)
-async def get_trend_kpis(
-    baseline_start: Optional[int] = Query(None, description="Baseline period start year"),
-    baseline_end: Optional[int] = Query(None, description="Baseline period end year"),
-    inference_start: Optional[int] = Query(None, description="Inference period start year"),
-    inference_end: Optional[int] = Query(None, description="Inference period end year"),
-):
-    """
-    Get delta KPIs comparing baseline and inference periods.
-    """
-    # Use defaults from settings if not provided
-    b_start = baseline_start or settings.BASELINE_START
-    b_end = baseline_end or settings.BASELINE_END
-    i_start = inference_start or settings.INFERENCE_START
-    i_end = inference_end or settings.INFERENCE_END
+def _compute_kpis(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    b_start: int,
+    b_end: int,
+    i_start: int,
+    i_end: int,
+) -> KPIsResponse:
+    """Volume change and rising/declining factors between the two periods."""
+    indexes = snapshot.indexes
+    rows = _filtered_rows(snapshot, filters)
     
-    df = load_all_data()
-    
-    # Get data for each period
-    baseline_df = filter_by_year_range(df, b_start, b_end)
-    inference_df = filter_by_year_range(df, i_start, i_end)
-    
-    # Calculate metrics
-    baseline_count = len(baseline_df)
-    inference_count = len(inference_df)
+    # Calculate metrics for each period
+    baseline_count = _period_count(indexes, b_start, b_end, rows)
+    inference_count = _period_count(indexes, i_start, i_end, rows)
     
     # Normalize by years in each period
     baseline_years = b_end - b_start + 1
@@ -87,8 +166,8 @@ async def get_trend_kpis(
     volume_change = ((inference_annual - baseline_annual) / baseline_annual * 100) if baseline_annual > 0 else 0
     
     # Get factor distributions
-    baseline_factors = _get_factor_distribution(baseline_df)
-    inference_factors = _get_factor_distribution(inference_df)
+    baseline_factors = _get_factor_distribution(snapshot, b_start, b_end, rows)
+    inference_factors = _get_factor_distribution(snapshot, i_start, i_end, rows)
     
     # Find rising and declining risks
     all_factors = set(baseline_factors.keys()) | set(inference_factors.keys())
@@ -98,10 +177,18 @@ async def get_trend_kpis(
         i_val = inference_factors.get(factor, 0)
         variances[factor] = i_val - b_val
     
-    # Sort to find biggest changes
-    sorted_by_variance = sorted(variances.items(), key=lambda x: x[1], reverse=True)
-    rising_risk = sorted_by_variance[0] if sorted_by_variance else ("Unknown", 0)
-    declining_risk = sorted_by_variance[-1] if sorted_by_variance else ("Unknown", 0)
+    # Prefer significant shifts, so small factors' noise does not win; fall
+    # back to the largest raw changes when no shift is significant
+    significance = _shift_significance(snapshot, filters, rows, (b_start, b_end, i_start, i_end))
+    threshold = get_settings().SIGNIFICANCE_THRESHOLD
+    p_values = {
+        factor: float(significance.p_values[indexes.factors.code_of(factor)])
+        for factor in variances
+    }
+    rising_pool = {f: v for f, v in variances.items() if v > 0 and p_values[f] < threshold} or variances
+    declining_pool = {f: v for f, v in variances.items() if v < 0 and p_values[f] < threshold} or variances
+    rising_risk = max(rising_pool.items(), key=lambda x: x[1]) if rising_pool else ("Unknown", 0)
+    declining_risk = min(declining_pool.items(), key=lambda x: x[1]) if declining_pool else ("Unknown", 0)
     
     kpis = [
         DeltaKPI(
@@ -116,14 +203,18 @@ async def get_trend_kpis(
             value=f"{rising_risk[1]:+.1f}%",
             description=rising_risk[0][:30] if rising_risk[0] else "N/A",
             trend=TrendDirection.UP,
-            raw_value=round(rising_risk[1], 1)
+            raw_value=round(rising_risk[1], 1),
+            p_value=_round_p(p_values.get(rising_risk[0])),
+            significant=_is_significant(p_values.get(rising_risk[0])),
         ),
         DeltaKPI(
             title="Declining Risk",
             value=f"{declining_risk[1]:+.1f}%",
             description=declining_risk[0][:30] if declining_risk[0] else "N/A",
             trend=TrendDirection.DOWN,
-            raw_value=round(declining_risk[1], 1)
+            raw_value=round(declining_risk[1], 1),
+            p_value=_round_p(p_values.get(declining_risk[0])),
+            significant=_is_significant(p_values.get(declining_risk[0])),
         ),
     ]
     
@@ -136,6 +227,82 @@ async def get_trend_kpis(
     )
 
 
+@router.get("/kpis", response_model=KPIsResponse)
+async def get_trend_kpis(
+    baseline_start: Optional[int] = Query(None, description="Baseline period start year"),
+    baseline_end: Optional[int] = Query(None, description="Baseline period end year"),
+    inference_start: Optional[int] = Query(None, description="Inference period start year"),
+    inference_end: Optional[int] = Query(None, description="Inference period end year"),
+    filters: IncidentFilter = Depends(dimension_filter),
+):
+    """
+    Get delta KPIs comparing baseline and inference periods.
+    """
+    from services.data_loader import get_snapshot
+    
+    # Use defaults from settings if not provided
+    settings = get_settings()
+    b_start = baseline_start or settings.BASELINE_START
+    b_end = baseline_end or settings.BASELINE_END
+    i_start = inference_start or settings.INFERENCE_START
+    i_end = inference_end or settings.INFERENCE_END
+    
+    snapshot = get_snapshot()
+    # Identical concurrent requests share one computation
+    return await _kpi_flights.run(
+        (snapshot.version, filters.normalized(), b_start, b_end, i_start, i_end),
+        _compute_kpis, snapshot, filters, b_start, b_end, i_start, i_end,
+    )
+
+
+def _compare_factors(
+    snapshot: "DatasetSnapshot",
+    filters: IncidentFilter,
+    b_start: int,
+    b_end: int,
+    i_start: int,
+    i_end: int,
+    limit: int,
+    bootstrap: int = 0,
+) -> list[ComparisonDataPoint]:
+    """Factor shares of both periods with shift significance, most present first."""
+    indexes = snapshot.indexes
+    rows = _filtered_rows(snapshot, filters)
+    significance = _shift_significance(snapshot, filters, rows, (b_start, b_end, i_start, i_end), bootstrap)
+    
+    # Calculate factor distributions
+    baseline_factors = _get_factor_distribution(snapshot, b_start, b_end, rows)
+    inference_factors = _get_factor_distribution(snapshot, i_start, i_end, rows)
+    
+    # Combine and get top factors
+    all_factors = set(baseline_factors.keys()) | set(inference_factors.keys())
+    comparison_data = []
+    for factor in all_factors:
+        b_val = baseline_factors.get(factor, 0)
+        i_val = inference_factors.get(factor, 0)
+        # Only include factors with significant presence
+        if b_val > 1 or i_val > 1:
+            code = indexes.factors.code_of(factor)
+            p_value = float(significance.p_values[code])
+            comparison_data.append({
+                "category": factor,
+                "baseline": round(b_val, 1),
+                "inference": round(i_val, 1),
+                "variance": round(i_val - b_val, 1),
+                "z_score": round(float(significance.z_scores[code]), 2),
+                "p_value": _round_p(p_value),
+                "significant": _is_significant(p_value),
+                "ci_low": round(float(significance.ci_low[code]), 1) if significance.ci_low is not None else None,
+                "ci_high": round(float(significance.ci_high[code]), 1) if significance.ci_high is not None else None,
+            })
+    
+    # Sort by total presence and limit
+    comparison_data.sort(key=lambda x: x["baseline"] + x["inference"], reverse=True)
+    comparison_data = comparison_data[:limit]
+    
+    return [ComparisonDataPoint(**item) for item in comparison_data]
+
+
 @router.get("/comparison", response_model=ComparisonResponse)
 async def get_comparison(
     view: str = Query("factors", description="View type: 'factors' or 'topics'"),
@@ -144,19 +311,22 @@ async def get_comparison(
     inference_start: Optional[int] = Query(None),
     inference_end: Optional[int] = Query(None),
     limit: int = Query(7, description="Number of categories to return"),
+    bootstrap: int = Query(0, ge=0, le=MAX_BOOTSTRAP_RESAMPLES, description="Bootstrap resamples for shift confidence intervals (0 = none)"),
+    filters: IncidentFilter = Depends(dimension_filter),
 ):
     """
     Get comparison data for bar chart showing baseline vs inference period.
+    Each factor carries a two-proportion z-test of its share shift and,
+    with ``bootstrap``, a 95% bootstrap confidence interval.
     """
+    from services.data_loader import get_snapshot
+    
+    settings = get_settings()
     b_start = baseline_start or settings.BASELINE_START
     b_end = baseline_end or settings.BASELINE_END
     i_start = inference_start or settings.INFERENCE_START
     i_end = inference_end or settings.INFERENCE_END
     
-    df = load_all_data()
-    baseline_df = filter_by_year_range(df, b_start, b_end)
-    inference_df = filter_by_year_range(df, i_start, i_end)
-    
     if view == "topics":
         # For topics, we'd use topic assignments - for now use mock data
         # This will be replaced when topic models are integrated
@@ -169,30 +339,11 @@ async def get_comparison(
             ComparisonDataPoint(category="Equipment", baseline=8.6, inference=11.9, variance=3.3),
         ]
     else:
-        # Calculate factor distributions
-        baseline_factors = _get_factor_distribution(baseline_df)
-        inference_factors = _get_factor_distribution(inference_df)
-        
-        # Combine and get top factors
-        all_factors = set(baseline_factors.keys()) | set(inference_factors.keys())
-        comparison_data = []
-        for factor in all_factors:
-            b_val = baseline_factors.get(factor, 0)
-            i_val = inference_factors.get(factor, 0)
-            # Only include factors with significant presence
-            if b_val > 1 or i_val > 1:
-                comparison_data.append({
-                    "category": factor,
-                    "baseline": round(b_val, 1),
-                    "inference": round(i_val, 1),
-                    "variance": round(i_val - b_val, 1)
-                })
-        
-        # Sort by total presence and limit
-        comparison_data.sort(key=lambda x: x["baseline"] + x["inference"], reverse=True)
-        comparison_data = comparison_data[:limit]
-        
-        data = [ComparisonDataPoint(**item) for item in comparison_data]
+        snapshot = get_snapshot()
+        data = await _comparison_flights.run(
+            (snapshot.version, filters.normalized(), b_start, b_end, i_start, i_end, limit, bootstrap),
+            _compare_factors, snapshot, filters, b_start, b_end, i_start, i_end, limit, bootstrap,
+        )
     
     # Find greatest change
     if data:
@@ -215,6 +366,179 @@ async def get_comparison(
     )
 
 
+@router.get("/sweep", response_model=SweepResponse)
+@profile_thread
+def get_split_sweep(
+    window: Optional[list[int]] = Query(None, description="Years per period (repeatable); 0 compares all years before and after the split"),
+    start_split: Optional[int] = Query(None, description="Earliest split year (first inference year)"),
+    end_split: Optional[int] = Query(None, description="Latest split year"),
+    limit: int = Query(10, ge=1, description="Number of factor columns in the shift matrix"),
+    filters: IncidentFilter = Depends(dimension_filter),
+):
+    """
+    Get volume change and factor share shifts for every candidate split year.
+    Each point compares the ``window`` years before the split year with the
+    ``window`` years from it, within the longitudinal range, so the UI can
+    chart how sensitive the KPIs are to the choice of benchmark year.
+    """
+    import numpy as np
+    from services.data_loader import get_snapshot
+    from services.query_engine import get_query_engine
+    from services.trend_analysis import YearlyCounts, sweep_splits
+    
+    settings = get_settings()
+    windows = sorted(set(window)) if window else [3, 5, 0]
+    if windows[0] < 0:
+        raise HTTPException(status_code=400, detail="window must be 0 or a positive number of years")
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    rows = _filtered_rows(snapshot, filters)
+    
+    with span("aggregate"):
+        cube = indexes.cube if rows is None else get_query_engine().year_cube(snapshot, rows)
+        known = cube.years[cube.incidents[:-1] > 0]
+        first_year = max(settings.LONGITUDINAL_START, int(known[0])) if len(known) else settings.LONGITUDINAL_START
+        last_year = min(settings.LONGITUDINAL_END, int(known[-1])) if len(known) else settings.LONGITUDINAL_END
+        counts = YearlyCounts.from_cube(cube, first_year, last_year)
+        sweep = sweep_splits(counts, windows, start_split, end_split)
+        
+        # Columns: most mentioned factors over the analysis years
+        columns = [indexes.factors.code_of(name) for name, _ in indexes.top_factors(counts.factor_counts[-1], limit)]
+        
+        rising, declining = sweep.rising_and_declining()
+    
+    with span("serialize"):
+        vocabulary = indexes.factors.vocabulary
+        shifts = np.round(sweep.shifts[:, columns], 1).tolist() if columns else [[] for _ in sweep.split_years]
+        points = [
+            SweepPoint(
+                window=int(sweep.windows[i]),
+                split_year=int(sweep.split_years[i]),
+                baseline=TrendPeriod(
+                    start=int(sweep.baseline[i, 0]), end=int(sweep.baseline[i, 1]), count=int(sweep.baseline_counts[i]),
+                ),
+                inference=TrendPeriod(
+                    start=int(sweep.inference[i, 0]), end=int(sweep.inference[i, 1]), count=int(sweep.inference_counts[i]),
+                ),
+                volume_change=round(float(sweep.volume_change[i]), 1),
+                rising_risk=vocabulary[rising[i]] if rising[i] >= 0 else None,
+                declining_risk=vocabulary[declining[i]] if declining[i] >= 0 else None,
+                factor_shifts=shifts[i],
+            )
+            for i in range(len(sweep.split_years))
+        ]
+    
+    return SweepResponse(
+        factors=[vocabulary[code] for code in columns],
+        points=points,
+        metadata={
+            "windows": windows,
+            "year_range": {"start": first_year, "end": last_year},
+            "filters": filters.as_params(),
+        },
+    )
+
+
+def _parse_period(value: str) -> tuple[int, int]:
+    """Parse "2001-2005" or "2010" into an inclusive year range."""
+    start, _, end = value.strip().partition("-")
+    try:
+        first, last = int(start), int(end or start)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid period '{value}'; use YYYY or YYYY-YYYY")
+    if last < first:
+        raise HTTPException(status_code=400, detail=f"Invalid period '{value}'; end year before start year")
+    return first, last
+
+
+@router.get("/cohorts", response_model=CohortComparisonResponse)
+@profile_thread
+def get_cohort_comparison(
+    period: Optional[list[str]] = Query(None, description="Period as YYYY-YYYY or YYYY (repeatable, in display order)"),
+    cohort_years: int = Query(5, ge=1, description="Cohort length when no periods are given"),
+    limit: int = Query(10, ge=1, description="Number of factor columns"),
+    filters: IncidentFilter = Depends(dimension_filter),
+):
+    """
+    Compare factor distributions across any number of periods.
+    Without explicit periods the longitudinal range is cut into
+    ``cohort_years`` cohorts (the last one may be shorter). Returns the
+    period x factor share matrix and the deltas between every pair of
+    periods, all from one grouped pass over the year cube.
+    """
+    from services.data_loader import get_snapshot
+    from services.query_engine import get_query_engine
+    from services.trend_analysis import YearlyCounts, compare_periods
+    
+    settings = get_settings()
+    if period and len(period) > MAX_COHORT_PERIODS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COHORT_PERIODS} periods can be compared")
+    if period:
+        ranges = [_parse_period(p) for p in period]
+    else:
+        ranges = [
+            (start, min(start + cohort_years - 1, settings.LONGITUDINAL_END))
+            for start in range(settings.LONGITUDINAL_START, settings.LONGITUDINAL_END + 1, cohort_years)
+        ]
+    if len(ranges) > MAX_COHORT_PERIODS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COHORT_PERIODS} periods can be compared")
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    labels = [f"{start}-{end}" if end != start else str(start) for start, end in ranges]
+    
+    snapshot = get_snapshot()
+    indexes = snapshot.indexes
+    rows = _filtered_rows(snapshot, filters)
+    
+    with span("aggregate"):
+        cube = indexes.cube if rows is None else get_query_engine().year_cube(snapshot, rows)
+        # Prefix sums over the years with data only; period totals clip to them
+        first_year, last_year = min(starts), max(ends)
+        if len(cube.years):
+            first_year = max(first_year, int(cube.years[0]))
+            last_year = min(last_year, int(cube.years[-1]))
+        counts = YearlyCounts.from_cube(cube, first_year, last_year)
+        comparison = compare_periods(counts, starts, ends)
+        # Columns: most mentioned factors over all periods
+        columns = [
+            indexes.factors.code_of(name)
+            for name, _ in indexes.top_factors(comparison.factors.sum(axis=0), limit)
+        ]
+    
+    with span("serialize"):
+        shares = comparison.shares[:, columns].round(1)
+        deltas = comparison.deltas[:, :, columns].round(1)
+        annual_rates = comparison.annual_rates
+        n = len(ranges)
+        response = CohortComparisonResponse(
+            periods=[
+                CohortPeriod(
+                    label=labels[i],
+                    start=starts[i],
+                    end=ends[i],
+                    count=int(comparison.counts[i]),
+                    annual_rate=round(float(annual_rates[i]), 1),
+                )
+                for i in range(n)
+            ],
+            factors=[indexes.factors.vocabulary[code] for code in columns],
+            shares=shares.tolist(),
+            deltas=[
+                CohortDelta(
+                    from_period=labels[i],
+                    to_period=labels[j],
+                    volume_change=round(float(comparison.volume_change[i, j]), 1),
+                    factor_deltas=deltas[i, j].tolist(),
+                )
+                for i in range(n)
+                for j in range(i + 1, n)
+            ],
+            metadata={"filters": filters.as_params()},
+        )
+    return response
+
+
 @router.get("/emerging-patterns", response_model=EmergingPatternsResponse)
 async def get_emerging_patterns(
     inference_start: Optional[int] = Query(None),
@@ -3,7 +3,7 @@ Pydantic models for API request/response schemas.
 These match the TypeScript interfaces expected by the React frontend.
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Union
 from enum import Enum
 
 
@@ -40,6 +40,11 @@ class TimelineDataPoint(BaseModel):
     """Single point on the incidents timeline chart."""
     year: int
     incidents: int
+    period: Optional[str] = None         # '2019', '2019-Q3' or '2019-07'
+    rolling_mean: Optional[float] = None
+    trend: Optional[float] = None
+    seasonal: Optional[float] = None
+    residual: Optional[float] = None
 
 
 class ContributingFactor(BaseModel):
@@ -58,6 +63,8 @@ class AirportGeoData(BaseModel):
     incidents: int
     risk: Risk
     state: Optional[str] = None
+    # Airports merged into this point at low zoom levels (1 = a single airport)
+    cluster_size: int = 1
 
 
 class IncidentSummary(BaseModel):
@@ -83,6 +90,24 @@ class IncidentsResponse(BaseModel):
     pagination: Pagination
 
 
+class CooccurrenceEdge(BaseModel):
+    """Two factors cited in the same incidents."""
+    source: str
+    target: str
+    incidents: int
+    lift: float  # observed / expected under independence
+    pmi: float   # log2(lift)
+
+
+class CooccurrenceResponse(BaseModel):
+    """Factor x factor co-occurrence for the factor network view."""
+    factors: list[str]
+    # matrix[i][j]: incidents citing factors i and j; diagonal: incidents citing i
+    matrix: list[list[int]]
+    edges: list[CooccurrenceEdge]
+    metadata: dict
+
+
 class TimelineResponse(BaseModel):
     """Timeline chart response."""
     data: list[TimelineDataPoint]
@@ -100,6 +125,7 @@ class MapResponse(BaseModel):
     """Map view response."""
     airports: list[AirportGeoData]
     risk_thresholds: dict
+    metadata: dict = {}
 
 
 # ============== Topic Modeling Models ==============
@@ -181,6 +207,8 @@ class DeltaKPI(BaseModel):
     description: str
     trend: TrendDirection
     raw_value: Optional[float] = None
+    p_value: Optional[float] = None
+    significant: Optional[bool] = None
 
 
 class ComparisonDataPoint(BaseModel):
@@ -189,6 +217,11 @@ class ComparisonDataPoint(BaseModel):
     baseline: float
     inference: float
     variance: float
+    z_score: Optional[float] = None
+    p_value: Optional[float] = None
+    significant: Optional[bool] = None
+    ci_low: Optional[float] = None
+    ci_high: Optional[float] = None
 
 
 class EmergingPattern(BaseModel):
@@ -222,6 +255,55 @@ class EmergingPatternsResponse(BaseModel):
     significance_threshold: float = 0.05
 
 
+class TrendPeriod(BaseModel):
+    """Inclusive year range with its incident count."""
+    start: int
+    end: int
+    count: int
+
+
+class SweepPoint(BaseModel):
+    """Baseline vs inference comparison at one split year and window."""
+    window: int
+    split_year: int
+    baseline: TrendPeriod
+    inference: TrendPeriod
+    volume_change: float
+    rising_risk: Optional[str] = None
+    declining_risk: Optional[str] = None
+    factor_shifts: list[float]
+
+
+class CohortPeriod(TrendPeriod):
+    """One period of a multi-period comparison."""
+    label: str
+    annual_rate: float
+
+
+class CohortDelta(BaseModel):
+    """Change between two periods; factor_deltas align with factors."""
+    from_period: str
+    to_period: str
+    volume_change: float
+    factor_deltas: list[float]
+
+
+class CohortComparisonResponse(BaseModel):
+    """Period x factor share matrix (percent of mentions) with pairwise deltas."""
+    periods: list[CohortPeriod]
+    factors: list[str]
+    shares: list[list[float]]
+    deltas: list[CohortDelta]
+    metadata: dict = {}
+
+
+class SweepResponse(BaseModel):
+    """Split-year sensitivity matrix; factor_shifts align with factors."""
+    factors: list[str]
+    points: list[SweepPoint]
+    metadata: dict = {}
+
+
 # ============== Incident Detail Models ==============
 
 class SimilarIncident(BaseModel):
@@ -286,6 +368,69 @@ class IncidentDetailResponse(BaseModel):
     similar_incidents: list[SimilarIncident]
 
 
+# ============== Airport Models ==============
+
+class MonthPeriod(BaseModel):
+    """Inclusive range of months ('2024-01' to '2024-12')."""
+    start: str
+    end: str
+    months: int
+
+
+class AirportHotspot(BaseModel):
+    """An airport whose recent incident rate is above its own history."""
+    code: str
+    name: Optional[str] = None
+    state: Optional[str] = None
+    window_incidents: int
+    baseline_incidents: int
+    expected_incidents: float
+    rate_ratio: Optional[float] = None  # None when the baseline has no incidents
+    z_score: float
+    p_value: float
+    q_value: float
+    significant: bool
+
+
+class ProfileBreakdown(BaseModel):
+    """One value of an airport breakdown next to its national share."""
+    value: Union[int, str]
+    count: int
+    share: float           # percent of the airport's incidents (of mentions for factors)
+    national_share: float  # same over all incidents
+    difference: float      # share - national_share, percentage points
+
+
+class AirportProfileResponse(BaseModel):
+    """Everything reported at one airport, compared with the national picture."""
+    code: str
+    name: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    total_incidents: int
+    national_incidents: int
+    share_of_national: float
+    timeline: list[TimelineDataPoint]
+    factors: list[ProfileBreakdown]
+    severity: list[ProfileBreakdown]
+    incident_types: list[ProfileBreakdown]
+    aircraft_types: list[ProfileBreakdown]
+    flight_phases: list[ProfileBreakdown]
+    light: list[ProfileBreakdown]
+    flight_conditions: list[ProfileBreakdown]
+
+
+class HotspotsResponse(BaseModel):
+    """Airports ranked by how anomalous their recent incident rate is."""
+    hotspots: list[AirportHotspot]
+    window: MonthPeriod
+    baseline: MonthPeriod
+    airports_tested: int
+    filters: dict = {}
+
+
 # ============== Utility Models ==============
 
 class FilterOptions(BaseModel):
@@ -298,9 +443,144 @@ class FilterOptions(BaseModel):
     year_range: dict
 
 
+class FacetValue(BaseModel):
+    """One value of a sidebar facet with its matching incident count."""
+    value: Union[int, str]
+    count: int
+
+
+class FacetsResponse(BaseModel):
+    """Per-value counts of every sidebar facet under the current filters."""
+    total: int
+    facets: dict[str, list[FacetValue]]
+    filters: dict = {}
+
+
+class PivotCell(BaseModel):
+    """One non-empty cell of a pivot table."""
+    row: list[Union[int, str]]
+    column: list[Union[int, str]] = []
+    count: int
+    share: Optional[float] = None
+
+
+class PivotResponse(BaseModel):
+    """Cross-tab of up to three categorical dimensions."""
+    rows: list[str]
+    columns: list[str]
+    values: dict[str, list[Union[int, str]]]
+    cells: list[PivotCell]
+    total: int
+    measure: str
+    filters: dict = {}
+
+
 class SummaryResponse(BaseModel):
     """Landing page summary statistics."""
     total_incidents: int
     date_range: dict
     primary_risk: str
     last_updated: str
+
+
+# ============== Admin Models ==============
+
+class ProfileSummary(BaseModel):
+    """Metadata of a captured request profile."""
+    id: str
+    captured_at: str
+    method: str
+    route: str
+    path: str
+    params: dict
+    status: int
+    duration_ms: float
+    dataset_version: Optional[str] = None
+
+
+class ProfilesResponse(BaseModel):
+    """Captured profiles, most recent first."""
+    profiles: list[ProfileSummary]
+
+
+class SlowRequest(BaseModel):
+    """Slow-request log entry."""
+    timestamp: str
+    method: str
+    route: str
+    params: dict
+    status: int
+    duration_ms: float
+    stages_ms: dict[str, float]
+    dataset_version: Optional[str] = None
+
+
+class SlowRequestsResponse(BaseModel):
+    """Slow-request log, most recent first."""
+    threshold_ms: float
+    requests: list[SlowRequest]
+
+
+class DatasetColumnInfo(BaseModel):
+    """Memory and cardinality of one dataset column."""
+    name: str
+    dtype: str
+    memory_bytes: int
+    cardinality: int
+    null_count: int
+
+
+class DerivedStructureInfo(BaseModel):
+    """Memory held by an index, cache or vector store."""
+    name: str
+    kind: str
+    built: bool
+    memory_bytes: int
+    entries: Optional[int] = None
+
+
+class DatasetLoadInfo(BaseModel):
+    """Version, size and stage timings of one dataset load."""
+    version: str
+    loaded_at: str
+    rows: int
+    memory_bytes: int
+    # Memory-mapped narrative/synopsis text (on disk, paged in on demand)
+    text_store_bytes: int = 0
+    duration_ms: float
+    stages_ms: dict[str, float]
+
+
+class DatasetIntrospectionResponse(BaseModel):
+    """Memory and index introspection of the loaded dataset."""
+    version: Optional[str] = None
+    loaded_at: Optional[str] = None
+    rows: int
+    frame_memory_bytes: int
+    columns: list[DatasetColumnInfo]
+    structures: list[DerivedStructureInfo]
+    total_memory_bytes: int
+    text_store_bytes: int = 0
+    load_history: list[DatasetLoadInfo]
+    live_versions: list[str] = []
+    reloading: bool = False
+
+
+class IngestResponse(BaseModel):
+    """Result of ingesting new extracts from the drop directory."""
+    files: list[str]
+    rows_read: int
+    rows_added: int
+    duplicates_skipped: int
+    previous_version: Optional[str] = None
+    version: Optional[str] = None
+    total_rows: int
+    duration_ms: float
+    stages_ms: dict[str, float]
+
+
+class ReloadResponse(BaseModel):
+    """Result of a dataset reload request."""
+    status: str  # "completed", "started" or "already_running"
+    version: Optional[str] = None
+    previous_version: Optional[str] = None
@@ -1,9 +1,35 @@
-"""Services package."""
-from .data_loader import (
-    load_all_data,
-    filter_by_year_range,
-    get_year_range,
-    get_unique_values,
-    get_contributing_factors_list,
-    get_cached_data,
+"""
+Services package.
+
+Data-loader functions are re-exported lazily: importing a light submodule
+such as services.instrumentation must not pull in pandas at startup.
+"""
+_DATA_LOADER_EXPORTS = (
+    "load_all_data",
+    "filter_by_year_range",
+    "get_year_range",
+    "get_unique_values",
+    "get_contributing_factors_list",
+    "get_cached_data",
+    "get_dataset_version",
+    "get_dataset_loaded_at",
+    "get_load_history",
+    "get_snapshot",
+    "get_indexes",
+    "reload_dataset",
+    "reload_in_background",
+    "is_reloading",
+    "get_live_versions",
+    "get_source_files",
+    "read_extract",
+    "append_incidents",
 )
+
+__all__ = list(_DATA_LOADER_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _DATA_LOADER_EXPORTS:
+        from . import data_loader
+        return getattr(data_loader, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
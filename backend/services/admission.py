@@ -0,0 +1,162 @@
+"""
+Admission control for API requests.
+
+Requests are sorted into cost classes by path. Each class admits a fixed
+number of concurrent requests and queues a bounded number more; a request
+arriving to a full queue is rejected at once with 429, and one that waits
+longer than ADMISSION_TIMEOUT_SECONDS gets 503. Both carry Retry-After, so
+under peak load clients back off instead of every request timing out.
+
+Similar-incident lookup (incident detail), topic narratives and the
+unfiltered report listing are "expensive" and cannot starve the "standard"
+class used by the other /api endpoints. Health, readiness, metrics and
+admin requests are never queued, and responses served from the response
+cache (an outer middleware) never reach admission.
+"""
+import asyncio
+import re
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.responses import JSONResponse
+
+from config import get_settings
+from services.instrumentation import record_admission
+
+EXPENSIVE = "expensive"
+STANDARD = "standard"
+
+# Paths of the expensive class (the report listing only without filters)
+EXPENSIVE_PATHS = (
+    re.compile(r"^/api/incidents/\d+$"),
+    re.compile(r"^/api/topics/[^/]+/narratives$"),
+)
+LISTING_PATH = "/api/incidents"
+
+# Query parameters that do not narrow the report listing
+_PAGING_PARAMS = {"page", "limit"}
+
+
+def cost_class(scope: dict) -> Optional[str]:
+    """Cost class of a request, or None when it bypasses admission."""
+    path = scope["path"]
+    if not path.startswith("/api/"):
+        return None
+    if any(pattern.match(path) for pattern in EXPENSIVE_PATHS):
+        return EXPENSIVE
+    if path == LISTING_PATH:
+        params = parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+        if all(name in _PAGING_PARAMS for name, _ in params):
+            return EXPENSIVE
+    return STANDARD
+
+
+@dataclass
+class Rejection:
+    status: int
+    detail: str
+
+
+class AdmissionLane:
+    """Concurrency cap plus bounded FIFO wait queue of one cost class."""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, timeout: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[Rejection]:
+        """Take a slot, waiting in the queue if needed; a Rejection when refused."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            record_admission(self.name, "admitted")
+            return None
+        if len(self._waiters) >= self.queue_size:
+            record_admission(self.name, "rejected_queue_full")
+            return Rejection(429, f"Too many {self.name} requests in progress; retry later")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # A slot is handed over by release(), which leaves active unchanged
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            record_admission(self.name, "rejected_timeout")
+            return Rejection(503, f"Server busy; {self.name} request not admitted within {self.timeout:g}s")
+        except asyncio.CancelledError:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the client went away; pass the slot on
+                self.release()
+            raise
+        record_admission(self.name, "queued")
+        return None
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+@lru_cache()
+def get_admission_lanes() -> dict[str, AdmissionLane]:
+    """Get the process-wide lanes, sized from settings."""
+    settings = get_settings()
+    timeout = settings.ADMISSION_TIMEOUT_SECONDS
+    return {
+        EXPENSIVE: AdmissionLane(EXPENSIVE, settings.EXPENSIVE_CONCURRENCY, settings.EXPENSIVE_QUEUE_SIZE, timeout),
+        STANDARD: AdmissionLane(STANDARD, settings.STANDARD_CONCURRENCY, settings.STANDARD_QUEUE_SIZE, timeout),
+    }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware holding a slot of the request's cost class while the
+    application handles it. Runs inside the response cache, so cache hits
+    are answered without queueing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        settings = get_settings()
+        name = cost_class(scope) if scope["type"] == "http" and settings.ADMISSION_CONTROL else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        lane = get_admission_lanes()[name]
+        rejection = await lane.acquire()
+        if rejection is not None:
+            response = JSONResponse(
+                {"detail": rejection.detail},
+                status_code=rejection.status,
+                headers={"Retry-After": str(settings.RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
@@ -0,0 +1,155 @@
+"""
+Airport reference data for the incident map.
+
+Coordinates come from a table (AIRPORTS_CSV) keyed by FAA location
+identifier, the code ASRS reports use in "Locale Reference". The bundled
+table lists major airports only; point AIRPORTS_CSV at an OurAirports
+airports.csv export to place every public-use airport. Points are
+clustered on a latitude/longitude grid whose cells halve with every zoom
+level, so zoomed-out views stay small however many airports have reports.
+"""
+import csv
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from config import get_settings
+
+# Grid cell edge in degrees at zoom 0; halves with every zoom level
+CLUSTER_CELL_DEGREES = 40.0
+
+# From this zoom level on every airport is returned on its own
+MAX_CLUSTER_ZOOM = 8
+
+
+@dataclass(frozen=True)
+class AirportLocation:
+    """One row of the bundled airport table."""
+    code: str
+    name: str
+    city: str
+    state: str
+    latitude: float
+    longitude: float
+
+
+@dataclass(frozen=True)
+class MapPoint:
+    """An airport, or a cluster of nearby airports, with its incident count."""
+    code: str
+    name: Optional[str]
+    state: Optional[str]
+    latitude: float
+    longitude: float
+    incidents: int
+    cluster_size: int = 1
+
+
+def _ourairports_rows(rows) -> dict[str, AirportLocation]:
+    """US airports of an OurAirports airports.csv, keyed by FAA identifier (local_code)."""
+    table = {}
+    for row in rows:
+        code = row.get("local_code") or ""
+        if row.get("iso_country") != "US" or not code:
+            continue
+        table[code] = AirportLocation(
+            code=code,
+            name=row["name"],
+            city=row.get("municipality") or "",
+            state=(row.get("iso_region") or "").removeprefix("US-"),
+            latitude=float(row["latitude_deg"]),
+            longitude=float(row["longitude_deg"]),
+        )
+    return table
+
+
+@lru_cache(maxsize=1)
+def load_airport_table() -> dict[str, AirportLocation]:
+    """
+    Read the airport table, keyed by FAA identifier. AIRPORTS_CSV is either
+    the bundled table (major airports only) or a full OurAirports
+    airports.csv export.
+    """
+    with open(get_settings().AIRPORTS_CSV, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if "latitude_deg" in (reader.fieldnames or ()):
+            return _ourairports_rows(reader)
+        return {
+            row["code"]: AirportLocation(
+                code=row["code"],
+                name=row["name"],
+                city=row["city"],
+                state=row["state"],
+                latitude=float(row["latitude"]),
+                longitude=float(row["longitude"]),
+            )
+            for row in reader
+        }
+
+
+def locate(code: str) -> Optional[AirportLocation]:
+    """Look up an airport by FAA identifier (or K-prefixed ICAO code)."""
+    table = load_airport_table()
+    location = table.get(code)
+    if location is None and len(code) == 4 and code.startswith("K"):
+        location = table.get(code[1:])
+    return location
+
+
+def cell_degrees(zoom: Optional[int]) -> Optional[float]:
+    """Grid cell edge used at a zoom level (None when points are not clustered)."""
+    if zoom is None or zoom >= MAX_CLUSTER_ZOOM:
+        return None
+    return CLUSTER_CELL_DEGREES / 2 ** zoom
+
+
+def cluster_points(points: list[MapPoint], zoom: Optional[int]) -> list[MapPoint]:
+    """
+    Merge points falling into the same grid cell. A cluster is placed at the
+    incident-weighted centroid of its airports and labelled with the busiest
+    one. Returned busiest first.
+    """
+    cell = cell_degrees(zoom)
+    if cell is None or len(points) < 2:
+        return sorted(points, key=lambda p: (-p.incidents, p.code))
+
+    lat = np.array([p.latitude for p in points])
+    lon = np.array([p.longitude for p in points])
+    counts = np.array([p.incidents for p in points], dtype=float)
+    keys = np.stack([np.floor(lat / cell), np.floor(lon / cell)], axis=1)
+    _, cells = np.unique(keys, axis=0, return_inverse=True)
+    cells = cells.ravel()
+
+    totals = np.bincount(cells, weights=counts)
+    sizes = np.bincount(cells)
+    centroid_lat = np.bincount(cells, weights=lat * counts) / totals
+    centroid_lon = np.bincount(cells, weights=lon * counts) / totals
+
+    # Busiest airport of each cell
+    order = np.lexsort((-counts, cells))
+    first = order[np.r_[0, np.flatnonzero(np.diff(cells[order])) + 1]]
+
+    states: dict[int, set] = {}
+    for cell_id, point in zip(cells.tolist(), points):
+        states.setdefault(cell_id, set()).add(point.state)
+
+    clusters = []
+    for cell_id, lead in enumerate(first.tolist()):
+        leader = points[lead]
+        size = int(sizes[cell_id])
+        if size == 1:
+            clusters.append(leader)
+            continue
+        cell_states = states[cell_id]
+        clusters.append(MapPoint(
+            code=leader.code,
+            name=f"{leader.name or leader.code} and {size - 1} nearby",
+            state=leader.state if len(cell_states) == 1 else None,
+            latitude=round(float(centroid_lat[cell_id]), 4),
+            longitude=round(float(centroid_lon[cell_id]), 4),
+            incidents=int(totals[cell_id]),
+            cluster_size=size,
+        ))
+    return sorted(clusters, key=lambda p: (-p.incidents, p.code))
@@ -0,0 +1,306 @@
+"""
+Bitmap indexes over the categorical dimensions of the incident dataset.
+
+Every value of every filterable dimension (contributing factor, aircraft
+type, state, airport, incident type, severity, year) owns a Bitmap of the
+rows carrying it. Like roaring bitmaps, a value with few rows keeps its
+sorted row positions and a frequent value keeps packed 64-bit words, so a
+rare aircraft type costs a few bytes and a common factor costs n_rows / 8.
+Filter combinations are answered with bitwise AND/OR and popcounts.
+
+Single-valued dimensions also keep a per-row value code, so the counts of
+every value among a selection take one bincount instead of one popcount
+per value.
+"""
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# A value stores positions (4 bytes each) while that is smaller than a
+# bitset of the whole dataset (n_rows / 8 bytes)
+SPARSE_RATIO = 32
+
+_WORD_BITS = 64
+
+
+def _n_words(n_rows: int) -> int:
+    return (n_rows + _WORD_BITS - 1) // _WORD_BITS
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean row mask into little-endian 64-bit words."""
+    padded = np.zeros(_n_words(len(mask)) * _WORD_BITS, dtype=bool)
+    padded[:len(mask)] = mask
+    return np.packbits(padded, bitorder="little").view("<u8")
+
+
+def _fit(words: np.ndarray, n_words: int) -> np.ndarray:
+    """Truncate or zero-pad words to n_words (missing words are empty)."""
+    if len(words) >= n_words:
+        return words[:n_words]
+    return np.concatenate([words, np.zeros(n_words - len(words), dtype="<u8")])
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_BYTE_COUNTS[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class Bitmap:
+    """
+    An immutable set of row positions: sorted uint32 positions when sparse,
+    packed uint64 words when dense. Dense words may be shorter than the
+    dataset; rows past the end are not in the set.
+    """
+    __slots__ = ("positions", "words")
+
+    def __init__(self, positions: Optional[np.ndarray] = None, words: Optional[np.ndarray] = None):
+        self.positions = positions
+        self.words = words
+        # Shared across requests like every other index array
+        for array in (positions, words):
+            if array is not None:
+                array.flags.writeable = False
+
+    @classmethod
+    def from_positions(cls, positions: np.ndarray, n_rows: int) -> "Bitmap":
+        """Choose the smaller representation for sorted, distinct positions."""
+        if len(positions) * SPARSE_RATIO < n_rows:
+            return cls(positions=np.asarray(positions, dtype=np.uint32))
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[positions] = True
+        return cls(words=_pack(mask))
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "Bitmap":
+        return cls.from_positions(np.flatnonzero(mask), len(mask))
+
+    @classmethod
+    def empty(cls) -> "Bitmap":
+        return cls(positions=np.zeros(0, dtype=np.uint32))
+
+    @classmethod
+    def full(cls, n_rows: int) -> "Bitmap":
+        return cls(words=_pack(np.ones(n_rows, dtype=bool)))
+
+    @property
+    def is_dense(self) -> bool:
+        return self.words is not None
+
+    def __len__(self) -> int:
+        return _popcount(self.words) if self.is_dense else len(self.positions)
+
+    def to_words(self, n_rows: int) -> np.ndarray:
+        if self.is_dense:
+            return _fit(self.words, _n_words(n_rows))
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[self.positions] = True
+        return _pack(mask)
+
+    def to_mask(self, n_rows: int) -> np.ndarray:
+        if not self.is_dense:
+            mask = np.zeros(n_rows, dtype=bool)
+            mask[self.positions] = True
+            return mask
+        bits = np.unpackbits(_fit(self.words, _n_words(n_rows)).view(np.uint8), bitorder="little")
+        return bits[:n_rows].astype(bool)
+
+    def to_positions(self, n_rows: int) -> np.ndarray:
+        """Sorted row positions (int64)."""
+        if not self.is_dense:
+            return self.positions.astype(np.int64)
+        return np.flatnonzero(self.to_mask(n_rows))
+
+    def _contains(self, positions: np.ndarray) -> np.ndarray:
+        """Membership test for positions against dense words."""
+        word_index = positions >> 6
+        inside = word_index < len(self.words)
+        hit = np.zeros(len(positions), dtype=bool)
+        words = self.words[word_index[inside]]
+        hit[inside] = ((words >> (positions[inside] & 63).astype("<u8")) & 1).astype(bool)
+        return hit
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        if not self.is_dense and not other.is_dense:
+            return Bitmap(positions=np.intersect1d(self.positions, other.positions, assume_unique=True))
+        if not self.is_dense:
+            return Bitmap(positions=self.positions[other._contains(self.positions.astype(np.int64))])
+        if not other.is_dense:
+            return other & self
+        n_words = min(len(self.words), len(other.words))
+        return Bitmap(words=self.words[:n_words] & other.words[:n_words])
+
+    def _span(self) -> int:
+        """Number of rows covered by the representation."""
+        if self.is_dense:
+            return len(self.words) * _WORD_BITS
+        return int(self.positions[-1]) + 1 if len(self.positions) else 0
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        if not self.is_dense and not other.is_dense:
+            return Bitmap(positions=np.union1d(self.positions, other.positions).astype(np.uint32))
+        n_rows = max(self._span(), other._span())
+        return Bitmap(words=self.to_words(n_rows) | other.to_words(n_rows))
+
+    def extend(self, positions: np.ndarray, n_rows: int) -> "Bitmap":
+        """Add positions of appended rows (all past the current rows)."""
+        if len(positions) == 0:
+            return self
+        if not self.is_dense:
+            return Bitmap.from_positions(np.concatenate([self.positions, positions]), n_rows)
+        words = _fit(self.words, _n_words(n_rows)).copy()
+        np.bitwise_or.at(words, positions >> 6, np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64)))
+        return Bitmap(words=words)
+
+    def nbytes(self) -> int:
+        return int(self.words.nbytes if self.is_dense else self.positions.nbytes)
+
+
+def union(bitmaps: list[Bitmap]) -> Bitmap:
+    """OR of several bitmaps (empty for none)."""
+    if not bitmaps:
+        return Bitmap.empty()
+    sparse = [b.positions for b in bitmaps if not b.is_dense]
+    dense = [b for b in bitmaps if b.is_dense]
+    result = Bitmap(positions=np.unique(np.concatenate(sparse)).astype(np.uint32)) if sparse else None
+    for bitmap in dense:
+        result = bitmap if result is None else result | bitmap
+    return result
+
+
+def intersection(bitmaps: list[Bitmap]) -> Bitmap:
+    """AND of several bitmaps, sparse ones first so the result stays sparse."""
+    bitmaps = sorted(bitmaps, key=lambda b: (b.is_dense, 0 if b.is_dense else len(b)))
+    result = bitmaps[0]
+    for bitmap in bitmaps[1:]:
+        result = result & bitmap
+    return result
+
+
+@dataclass(frozen=True)
+class BitmapIndex:
+    """
+    Bitmap per value of each filterable dimension. Values are kept as they
+    appear in the data (airport and state codes upper-cased); a value
+    missing from a dimension matches no rows.
+    """
+    n_rows: int
+    dimensions: dict[str, dict[Hashable, Bitmap]]
+    # Single-valued dimensions only: int32 per row, the position of the
+    # row's value in dimensions[name] (-1 when missing)
+    row_codes: dict[str, np.ndarray]
+
+    def __post_init__(self):
+        for codes in self.row_codes.values():
+            codes.flags.writeable = False
+
+    def get(self, dimension: str, value: Hashable) -> Bitmap:
+        bitmap = self.dimensions.get(dimension, {}).get(value)
+        return bitmap if bitmap is not None else Bitmap.empty()
+
+    def values(self, dimension: str) -> list:
+        return list(self.dimensions.get(dimension, {}))
+
+    def value_counts(self, dimension: str, mask: np.ndarray) -> dict[Hashable, int]:
+        """Rows per value of a single-valued dimension among the rows selected by a boolean mask."""
+        values = self.values(dimension)
+        codes = self.row_codes[dimension][mask]
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        return dict(zip(values, counts.tolist()))
+
+    def nbytes(self) -> int:
+        return (
+            sum(b.nbytes() for values in self.dimensions.values() for b in values.values())
+            + sum(codes.nbytes for codes in self.row_codes.values())
+        )
+
+
+def _group_positions(keys: np.ndarray, positions: np.ndarray) -> dict[Hashable, np.ndarray]:
+    """Sorted row positions of every distinct key (keys parallel to positions)."""
+    if len(keys) == 0:
+        return {}
+    codes, uniques = pd.factorize(keys, sort=False)
+    valid = codes >= 0
+    if not valid.any():
+        return {}
+    codes, positions = codes[valid], positions[valid]
+    order = np.lexsort((positions, codes))
+    codes, positions = codes[order], positions[order]
+    starts = np.r_[0, np.flatnonzero(np.diff(codes)) + 1]
+    uniques = uniques.tolist()
+    return {
+        uniques[codes[start]]: group
+        for start, group in zip(starts, np.split(positions, starts[1:]))
+    }
+
+
+def _row_codes(
+    values: dict[Hashable, Bitmap],
+    keys: np.ndarray,
+    positions: np.ndarray,
+    n_rows: int,
+    previous: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Per-row codes into values, carrying over the codes of earlier rows."""
+    codes = np.full(n_rows, -1, dtype=np.int32)
+    if previous is not None:
+        codes[:len(previous)] = previous
+    if len(keys):
+        codes[positions] = pd.Index(list(values), dtype=object).get_indexer(keys)
+    return codes
+
+
+def build_bitmap_index(
+    dimensions: dict[str, tuple[np.ndarray, np.ndarray]],
+    n_rows: int,
+    multi_valued: tuple[str, ...] = (),
+) -> BitmapIndex:
+    """
+    Build bitmaps from (keys, positions) pairs per dimension; multi-valued
+    dimensions pass one pair per mention and get no row codes.
+    """
+    built = {
+        name: {
+            key: Bitmap.from_positions(group, n_rows)
+            for key, group in _group_positions(keys, positions).items()
+        }
+        for name, (keys, positions) in dimensions.items()
+    }
+    return BitmapIndex(
+        n_rows=n_rows,
+        dimensions=built,
+        row_codes={
+            name: _row_codes(built[name], keys, positions, n_rows)
+            for name, (keys, positions) in dimensions.items()
+            if name not in multi_valued
+        },
+    )
+
+
+def extend_bitmap_index(
+    index: BitmapIndex,
+    dimensions: dict[str, tuple[np.ndarray, np.ndarray]],
+    n_rows: int,
+) -> BitmapIndex:
+    """
+    Add appended rows (positions already offset past index.n_rows). Values
+    the new rows do not carry keep their bitmap object unchanged.
+    """
+    extended = {}
+    row_codes = {}
+    for name, (keys, positions) in dimensions.items():
+        values = dict(index.dimensions.get(name, {}))
+        # New values are appended, so codes of earlier rows stay valid
+        for key, group in _group_positions(keys, positions).items():
+            values[key] = values.get(key, Bitmap.empty()).extend(group, n_rows)
+        extended[name] = values
+        if name in index.row_codes:
+            row_codes[name] = _row_codes(values, keys, positions, n_rows, index.row_codes[name])
+    return BitmapIndex(n_rows=n_rows, dimensions=extended, row_codes=row_codes)
@@ -0,0 +1,70 @@
+"""
+Contributing-factor co-occurrence for the factor network view.
+
+The co-occurrence matrix of a filter set is the product X^T X of the
+incidence matrix X (selected rows x factors), computed on the CSR factor
+index (DatasetIndexes.factor_cooccurrence_of). Lift and pointwise mutual
+information compare how often two factors are cited together with how
+often they would be if they were independent. Matrices are cached per
+dataset version by normalized filter signature.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from config import get_settings
+from services.filters import IncidentFilter
+from services.instrumentation import record_cache
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from services.data_loader import DatasetSnapshot
+
+
+@dataclass(frozen=True)
+class Cooccurrence:
+    """Factor pair counts over the incidents matching a filter set."""
+    total: int           # incidents matching the filters
+    counts: np.ndarray   # (n_factors, n_factors) incidents citing both; diagonal: each factor
+
+    def lift(self) -> np.ndarray:
+        """P(a and b) / (P(a) P(b)); 0 where either factor is never cited."""
+        cited = np.diag(self.counts).astype(float)
+        expected = np.outer(cited, cited) / max(self.total, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(expected > 0, self.counts / expected, 0.0)
+
+    def pmi(self) -> np.ndarray:
+        """log2 of lift; -inf for pairs never cited together."""
+        with np.errstate(divide="ignore"):
+            return np.log2(self.lift())
+
+
+@lru_cache()
+def get_cooccurrence_cache() -> ResponseCache:
+    """Get the process-wide co-occurrence matrix cache."""
+    return ResponseCache(get_settings().COOCCURRENCE_CACHE_SIZE)
+
+
+register_structure("cooccurrence_cache", "cache", lambda: get_cooccurrence_cache()._entries)
+
+
+def get_cooccurrence(snapshot: "DatasetSnapshot", filters: IncidentFilter) -> Cooccurrence:
+    """Co-occurrence among the incidents matching filters, served from the cache when possible."""
+    filters = filters.normalized()
+    cache = get_cooccurrence_cache()
+    key = repr(filters)
+    entry = cache.get(snapshot.version, key)
+    record_cache("cooccurrence", hit=entry is not None)
+    if entry is None:
+        selection = filters.select(snapshot)
+        entry = Cooccurrence(
+            total=selection.count,
+            counts=snapshot.indexes.factor_cooccurrence_of(selection.mask),
+        )
+        entry.counts.flags.writeable = False
+        cache.put(snapshot.version, key, entry)
+    return entry
@@ -1,19 +1,95 @@
 """
 Data loader service for ASRS incident data.
 Handles CSV loading with caching based on environment settings.
+
+The loaded dataset and its derived indexes are published together as an
+immutable DatasetSnapshot. Reloads and ingestion build a new snapshot off
+to the side and swap a single reference; requests that already hold a
+snapshot keep using it, and old versions are freed once unreferenced.
+
+Narrative and synopsis text is not part of the frame; it lives in a
+memory-mapped TextStore on the snapshot, addressed by row position.
 """
+import numpy as np
 import pandas as pd
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
 from functools import lru_cache
 from typing import Optional
+import hashlib
 import logging
+import threading
+import time
+import weakref
+from datetime import datetime
 
 from config import get_settings
+from services.instrumentation import (
+    span,
+    record_cache,
+    DATASET_RELOAD_DURATION,
+    DATASET_ROWS,
+    DATASET_INGESTED_ROWS,
+    DATASET_SNAPSHOTS_LIVE,
+)
+from services.indexes import DatasetIndexes, build_indexes, extend_indexes
+from services.introspection import register_structure
+from services.text_store import TEXT_COLUMNS, TextStore, prune_segments
 
 logger = logging.getLogger(__name__)
 
-# Global cache for production mode
-_data_cache: Optional[pd.DataFrame] = None
+@dataclass(frozen=True, eq=False)
+class DatasetSnapshot:
+    """One immutable version of the dataset and everything derived from it."""
+    version: str
+    loaded_at: datetime
+    # Shared by every request; read it through ``frame``
+    _frame: pd.DataFrame
+    indexes: DatasetIndexes
+    # Free text by row position (the frame holds structured columns only)
+    texts: TextStore
+    source_files: tuple[Path, ...]
+    # Names, sizes and mtimes of source_files when they were read
+    signature: tuple
+    
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        A copy-on-write view of the dataset. Cheap (no data is copied), and
+        anything a handler does to it stays local to that handler.
+        """
+        return self._frame.copy(deep=False)
+
+
+# The current snapshot; replaced atomically, never mutated
+_snapshot: Optional[DatasetSnapshot] = None
+
+# Serializes snapshot builds (full loads and incremental ingestion)
+_lock = threading.RLock()
+
+# Background reload thread, if one is running
+_reload_thread: Optional[threading.Thread] = None
+_reload_guard = threading.Lock()
+
+# Snapshots still referenced anywhere, for introspection
+_live_snapshots: "weakref.WeakSet[DatasetSnapshot]" = weakref.WeakSet()
+
+# Stage durations and memory footprint of recent loads (most recent last)
+_load_history: deque = deque(maxlen=10)
+
+register_structure("dataset_cache", "cache", lambda: _snapshot and _snapshot._frame)
+register_structure("factor_index", "index", lambda: _snapshot and _snapshot.indexes.factors)
+register_structure("year_factor_cube", "index", lambda: _snapshot and _snapshot.indexes.cube)
+register_structure("acn_index", "index", lambda: _snapshot and _snapshot.indexes.acn_positions)
+register_structure("severity_column", "index", lambda: _snapshot and _snapshot.indexes.severity)
+register_structure("bitmap_index", "index", lambda: _snapshot and _snapshot.indexes.bitmaps)
+register_structure("airport_index", "index", lambda: _snapshot and _snapshot.indexes.airports)
+register_structure("month_column", "index", lambda: _snapshot and _snapshot.indexes.months)
+register_structure("airport_profiles", "index", lambda: _snapshot and _snapshot.indexes.profiles)
+register_structure("text_store", "text_store", lambda: _snapshot and _snapshot.texts)
 
 
 def _load_csv(filepath: Path) -> pd.DataFrame:
@@ -27,6 +103,13 @@ def _load_csv(filepath: Path) -> pd.DataFrame:
     return df
 
 
+def read_extract(filepath: Path) -> pd.DataFrame:
+    """Load one raw ASRS export file, tagging rows with their source file."""
+    df = _load_csv(filepath)
+    df["source_file"] = filepath.name
+    return df
+
+
 def _parse_date_column(df: pd.DataFrame) -> pd.DataFrame:
     """Parse the Date column (YYYYMM format) to datetime and extract year."""
     df = df.copy()
@@ -69,60 +152,384 @@ def _standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def get_snapshot() -> DatasetSnapshot:
+    """
+    Get the current dataset snapshot, loading it on first use.
+    
+    Handlers should take one snapshot per request and read both the frame
+    and the indexes from it, so a reload published mid-request cannot mix
+    versions. In production the snapshot is replaced only by an explicit
+    reload or ingestion; in development mode it is rebuilt whenever a loaded
+    source file changes on disk. New files in INGEST_DIR are picked up by
+    ingestion (or the next full load).
+    """
+    snapshot = _snapshot
+    if snapshot is not None:
+        if get_settings().is_production or snapshot.signature == _file_signature(list(snapshot.source_files)):
+            record_cache("dataset", hit=True)
+            return snapshot
+    
+    record_cache("dataset", hit=False)
+    with span("load"), _lock:
+        # Another request may have finished loading while we waited
+        if _snapshot is not None and _snapshot is not snapshot:
+            return _snapshot
+        return _build_snapshot()
+
+
 def load_all_data(force_reload: bool = False) -> pd.DataFrame:
     """
     Load all incident data from CSV files.
     
-    In production mode, data is cached in memory.
-    In development mode, data is loaded fresh each call (unless cached).
-    
     Args:
-        force_reload: Force reload even if cached
+        force_reload: Build and publish a new snapshot even if one is cached
         
     Returns:
         Combined DataFrame with all incidents
     """
-    global _data_cache
-    settings = get_settings()
-    
-    # Return cached data if available and in production
-    if _data_cache is not None and not force_reload:
-        if settings.is_production:
-            logger.debug("Returning cached data (production mode)")
-            return _data_cache
+    if force_reload:
+        with span("load"):
+            return reload_dataset().frame
+    return get_snapshot().frame
+
+
+def get_indexes() -> DatasetIndexes:
+    """Get the derived indexes of the current dataset, loading it if needed."""
+    return get_snapshot().indexes
+
+
+def get_source_files() -> list[Path]:
+    """Get the CSV files the current dataset was built from."""
+    return list(_snapshot.source_files) if _snapshot is not None else []
+
+
+def reload_dataset() -> DatasetSnapshot:
+    """
+    Re-read the source files and publish a new snapshot.
+    Runs in the calling thread; other requests keep being served from the
+    current snapshot until the new one is swapped in.
+    """
+    with _lock:
+        return _build_snapshot()
+
+
+def reload_in_background() -> bool:
+    """
+    Start a reload in a background thread.
     
-    # Load both CSV files
-    csv_files = [
+    Returns:
+        False if a background reload is already running
+    """
+    global _reload_thread
+    with _reload_guard:
+        if _reload_thread is not None and _reload_thread.is_alive():
+            return False
+        _reload_thread = threading.Thread(target=_background_reload, name="dataset-reload", daemon=True)
+        _reload_thread.start()
+        return True
+
+
+def _background_reload() -> None:
+    try:
+        reload_dataset()
+    except Exception:
+        logger.exception(f"Background reload failed; still serving version {get_dataset_version()}")
+
+
+def is_reloading() -> bool:
+    """Whether a background reload is in progress."""
+    return _reload_thread is not None and _reload_thread.is_alive()
+
+
+def get_live_versions() -> list[str]:
+    """Versions of all snapshots still referenced, one entry per snapshot (current one included)."""
+    return sorted(snapshot.version for snapshot in list(_live_snapshots))
+
+
+def _build_snapshot() -> DatasetSnapshot:
+    """Read the dataset, build its indexes and publish it. Caller holds _lock."""
+    settings = get_settings()
+    with ThreadPoolExecutor(max_workers=max(1, settings.LOAD_WORKERS), thread_name_prefix="dataset-load") as pool:
+        combined, files, stages, duration = _read_dataset(settings, pool)
+        # Severity reads the text, so indexes are built before it is moved out
+        with _load_stage(stages, "build_indexes"):
+            indexes = build_indexes(combined, pool)
+    version = _compute_version(files, len(combined))
+    with _load_stage(stages, "text_store"):
+        texts = TextStore.build(combined, settings.TEXT_STORE_DIR, version)
+    snapshot = _publish(combined, indexes, texts, version, files, stages, duration)
+    logger.info(f"Published dataset version {snapshot.version}")
+    return snapshot
+
+
+def _csv_sources(settings) -> tuple[list[Path], list[Path]]:
+    """Base CSV files and extracts waiting in the ingest drop directory."""
+    base_files = [
         settings.RAW_DATA_DIR / settings.CSV_2001_2017,
         settings.RAW_DATA_DIR / settings.CSV_2018_2025,
     ]
+    drop_files = []
+    if settings.INGEST_DIR.is_dir():
+        base_names = {p.name for p in base_files}
+        drop_files = sorted(
+            p for p in settings.INGEST_DIR.glob("*.csv") if p.name not in base_names
+        )
+    return base_files, drop_files
+
+
+def _file_signature(files: list[Path]) -> tuple:
+    """Names, sizes and mtimes of source files, to detect changes on disk."""
+    signature = []
+    for path in files:
+        if path.exists():
+            stat = path.stat()
+            signature.append((path.name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def _compute_version(csv_files: list[Path], row_count: int) -> str:
+    """Derive a short dataset version from source file names, sizes and mtimes."""
+    digest = hashlib.sha1()
+    for name, size, mtime in _file_signature(csv_files):
+        digest.update(f"{name}:{size}:{mtime};".encode())
+    digest.update(str(row_count).encode())
+    return digest.hexdigest()[:12]
+
+
+def get_dataset_version() -> Optional[str]:
+    """Get the version of the current snapshot (None before first load)."""
+    snapshot = _snapshot
+    return snapshot.version if snapshot is not None else None
+
+
+def get_dataset_loaded_at() -> Optional[datetime]:
+    """Get when the current snapshot was published."""
+    snapshot = _snapshot
+    return snapshot.loaded_at if snapshot is not None else None
+
+
+def get_load_history() -> list[dict]:
+    """Get version, row count, memory and stage timings of recent loads."""
+    return list(_load_history)
+
+
+@contextmanager
+def _load_stage(stages: dict[str, float], name: str):
+    """Record the wall time of one load stage in milliseconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _read_dataset(
+    settings,
+    pool: ThreadPoolExecutor,
+) -> tuple[pd.DataFrame, list[Path], dict[str, float], float]:
+    """
+    Read and combine the source CSV files into one processed DataFrame.
+    Files are read in parallel on ``pool``. Extracts previously dropped into
+    INGEST_DIR are included, keeping only ACNs not already present in
+    earlier files.
+    """
+    start = time.perf_counter()
+    stages: dict[str, float] = {}
+    base_files, drop_files = _csv_sources(settings)
     
-    dfs = []
-    for csv_path in csv_files:
+    loaded_files = []
+    for csv_path in base_files + drop_files:
         if csv_path.exists():
-            df = _load_csv(csv_path)
-            df["source_file"] = csv_path.name
-            dfs.append(df)
-            logger.info(f"Loaded {len(df)} rows from {csv_path.name}")
+            loaded_files.append(csv_path)
         else:
             logger.warning(f"CSV file not found: {csv_path}")
     
+    def timed_read(csv_path: Path) -> pd.DataFrame:
+        file_stages: dict[str, float] = {}
+        with _load_stage(file_stages, f"read_csv:{csv_path.name}"):
+            df = read_extract(csv_path)
+        stages.update(file_stages)
+        logger.info(f"Loaded {len(df)} rows from {csv_path.name}")
+        return df
+    
+    with _load_stage(stages, "read"):
+        dfs = list(pool.map(timed_read, loaded_files))
+    
     if not dfs:
         raise FileNotFoundError("No CSV files found in data directory")
     
     # Combine and process
-    combined = pd.concat(dfs, ignore_index=True)
-    combined = _parse_date_column(combined)
-    combined = _standardize_columns(combined)
+    with _load_stage(stages, "concat"):
+        combined = pd.concat(dfs, ignore_index=True)
+    with _load_stage(stages, "parse_dates"):
+        combined = _parse_date_column(combined)
+    with _load_stage(stages, "standardize"):
+        combined = _standardize_columns(combined)
+    
+    if drop_files:
+        with _load_stage(stages, "dedupe"):
+            from_drop_dir = combined["source_file"].isin({p.name for p in drop_files})
+            duplicate = combined["acn"].astype(str).duplicated(keep="first") & from_drop_dir
+            combined = combined[~duplicate].reset_index(drop=True)
     
     logger.info(f"Total rows loaded: {len(combined)}")
+    return combined, loaded_files, stages, time.perf_counter() - start
+
+
+def _read_only_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rebuild a frame so every column's storage is non-writeable; in-place
+    writes to the shared frame then fail instead of leaking across requests.
+    Numeric and object columns are frozen numpy arrays. Extension arrays
+    backed by numpy (python-backed strings, datetimes) have their backing
+    array frozen; Arrow-backed arrays are immutable already.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=True)
+            values.flags.writeable = False
+        else:
+            values = series.array.copy()
+            # pandas keeps no public handle on the storage of these arrays
+            backing = getattr(values, "_ndarray", None)
+            if backing is not None:
+                backing.flags.writeable = False
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _publish(
+    combined: pd.DataFrame,
+    indexes: DatasetIndexes,
+    texts: TextStore,
+    version: str,
+    files: list[Path],
+    stages: dict[str, float],
+    duration: float,
+) -> DatasetSnapshot:
+    """
+    Swap in a new snapshot of a dataset, its indexes and text store and
+    record the load. Text columns are dropped from the published frame.
+    """
+    from services.query_engine import get_query_engine
+    
+    global _snapshot
+    
+    files = list(files)
+    combined = _read_only_frame(combined.drop(columns=list(TEXT_COLUMNS), errors="ignore"))
+    snapshot = DatasetSnapshot(
+        version=version,
+        loaded_at=datetime.now(),
+        _frame=combined,
+        indexes=indexes,
+        texts=texts,
+        source_files=tuple(files),
+        signature=_file_signature(files),
+    )
+    _live_snapshots.add(snapshot)
+    weakref.finalize(snapshot, _on_snapshot_released, snapshot.version)
+    _snapshot = snapshot
+    
+    DATASET_RELOAD_DURATION.observe(duration)
+    DATASET_ROWS.set(len(combined))
+    DATASET_SNAPSHOTS_LIVE.set(len(_live_snapshots))
+    prune_segments(texts.directory, texts)
+    get_query_engine().release(snapshot)
+    _load_history.append({
+        "version": snapshot.version,
+        "loaded_at": snapshot.loaded_at.isoformat(),
+        "rows": len(combined),
+        "memory_bytes": int(combined.memory_usage(deep=True).sum()),
+        "text_store_bytes": texts.nbytes(),
+        "duration_ms": round(duration * 1000, 1),
+        "stages_ms": stages,
+    })
+    return snapshot
+
+
+def _on_snapshot_released(version: str) -> None:
+    logger.debug(f"Released dataset version {version}")
+    DATASET_SNAPSHOTS_LIVE.set(len(_live_snapshots))
+
+
+def append_incidents(raw: pd.DataFrame, files: list[Path]) -> dict:
+    """
+    Append newly exported incidents to the current dataset.
+    
+    Rows are parsed and standardized like a full load, deduplicated by ACN
+    against the current dataset, appended, and the derived indexes are
+    extended with the new rows only. A new dataset version is published.
     
-    # Cache in production mode
-    if settings.is_production:
-        _data_cache = combined
-        logger.info("Data cached for production mode")
+    Args:
+        raw: Raw rows as read by _load_csv, with a 'source_file' column
+        files: CSV files the rows came from
+        
+    Returns:
+        Summary with rows read/added, duplicates skipped and versions
+    """
+    global _snapshot
+    start = time.perf_counter()
+    stages: dict[str, float] = {}
     
-    return combined
+    with _lock:
+        snapshot = get_snapshot()
+        current = snapshot.frame
+        indexes = snapshot.indexes
+        
+        with _load_stage(stages, "parse"):
+            new_rows = _standardize_columns(_parse_date_column(raw))
+        
+        with _load_stage(stages, "dedupe"):
+            acns = new_rows["acn"].astype(str)
+            known = np.fromiter(
+                (indexes.position_of(acn) is not None for acn in acns),
+                dtype=bool,
+                count=len(acns),
+            )
+            keep = ~known & ~acns.duplicated(keep="first").to_numpy()
+            new_rows = new_rows[keep]
+            new_rows.index = pd.RangeIndex(len(current), len(current) + len(new_rows))
+        
+        if len(new_rows) > 0:
+            with _load_stage(stages, "append"):
+                combined = pd.concat([current, new_rows.drop(columns=list(TEXT_COLUMNS), errors="ignore")])
+            with _load_stage(stages, "extend_indexes"):
+                new_indexes = extend_indexes(indexes, new_rows)
+            source_files = list(snapshot.source_files) + files
+            version = _compute_version(source_files, len(combined))
+            # Only the new rows' text is written
+            with _load_stage(stages, "extend_text_store"):
+                texts = snapshot.texts.extend(new_rows, version)
+            published = _publish(
+                combined, new_indexes, texts, version, source_files, stages,
+                time.perf_counter() - start,
+            )
+            DATASET_INGESTED_ROWS.inc(len(new_rows))
+        else:
+            # Nothing new; same data, but remember the files so they are not offered again
+            source_files = snapshot.source_files + tuple(files)
+            published = replace(snapshot, source_files=source_files, signature=_file_signature(list(source_files)))
+            _live_snapshots.add(published)
+            weakref.finalize(published, _on_snapshot_released, published.version)
+            _snapshot = published
+        
+        logger.info(
+            f"Ingested {len(new_rows)} new rows from {len(files)} file(s), "
+            f"skipped {int((~keep).sum())} duplicates"
+        )
+        return {
+            "files": [p.name for p in files],
+            "rows_read": len(raw),
+            "rows_added": len(new_rows),
+            "duplicates_skipped": int((~keep).sum()),
+            "previous_version": snapshot.version,
+            "version": published.version,
+            "total_rows": len(published.frame),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "stages_ms": stages,
+        }
 
 
 def filter_by_year_range(
@@ -141,15 +548,17 @@ def filter_by_year_range(
     Returns:
         Filtered DataFrame
     """
-    filtered = df.copy()
-    
-    if start_year is not None:
-        filtered = filtered[filtered["Year"] >= start_year]
-    
-    if end_year is not None:
-        filtered = filtered[filtered["Year"] <= end_year]
+    with span("filter"):
+        if start_year is None and end_year is None:
+            return df
+        
+        mask = pd.Series(True, index=df.index)
+        if start_year is not None:
+            mask &= df["Year"] >= start_year
+        if end_year is not None:
+            mask &= df["Year"] <= end_year
     
-    return filtered
+    return df[mask]
 
 
 def get_year_range(df: pd.DataFrame) -> tuple[int, int]:
@@ -0,0 +1,97 @@
+"""
+Faceted counts for the filter sidebar.
+
+For every facet the sidebar shows (year, state, aircraft type, contributing
+factor, severity, incident type) each value is counted among the rows
+matching all *other* filters, so the count is the number of incidents the
+selection would gain by adding the value (values of one facet are OR'ed).
+Factors matched with "all" narrow the selection instead, so that facet is
+counted against the full filter set.
+
+Selections come from the shared selection cache (IncidentFilter.select)
+and each facet is one bincount over its per-row value codes. Results are
+cached per dataset version by normalized filter signature.
+"""
+from dataclasses import replace
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable
+
+from config import get_settings
+from services.filters import IncidentFilter
+from services.instrumentation import record_cache
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from services.data_loader import DatasetSnapshot
+
+# Facet -> filter fields cleared when counting it
+FACET_FIELDS = {
+    "year": {"start_year": None, "end_year": None},
+    "state": {"states": ()},
+    "aircraft_type": {"aircraft_types": ()},
+    "factor": {"factors": ()},
+    "severity": {"severities": ()},
+    "incident_type": {"incident_types": ()},
+}
+
+
+@lru_cache()
+def get_facet_cache() -> ResponseCache:
+    """Get the process-wide facet cache."""
+    return ResponseCache(get_settings().FACET_CACHE_SIZE)
+
+
+register_structure("facet_cache", "cache", lambda: get_facet_cache()._entries)
+
+
+def _relaxed(filters: IncidentFilter, facet: str) -> IncidentFilter:
+    """The filter a facet's values are counted against."""
+    if facet == "factor" and filters.factor_match == "all":
+        return filters
+    return replace(filters, **FACET_FIELDS[facet])
+
+
+def _ranked(counts: dict[Hashable, int], facet: str) -> list[tuple[Hashable, int]]:
+    """Years in order, other facets most frequent first (ties by value)."""
+    if facet == "year":
+        return sorted(counts.items())
+    return sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+
+
+def compute_facets(snapshot: "DatasetSnapshot", filters: IncidentFilter) -> tuple[int, dict[str, list[tuple[Hashable, int]]]]:
+    """
+    Count every value of every facet under a filter set.
+
+    Args:
+        snapshot: Snapshot being served
+        filters: Normalized filter set
+
+    Returns:
+        Rows matching all filters, and (value, count) pairs per facet
+        including values with no matching rows
+    """
+    indexes = snapshot.indexes
+    facets = {}
+    for facet in FACET_FIELDS:
+        # Facets with no filter of their own share the full selection
+        mask = _relaxed(filters, facet).select(snapshot).mask
+        if facet == "factor":
+            counts = dict(zip(indexes.factors.vocabulary, indexes.factor_totals_of(mask).tolist()))
+        else:
+            counts = indexes.bitmaps.value_counts(facet, mask)
+        facets[facet] = _ranked(counts, facet)
+    return filters.select(snapshot).count, facets
+
+
+def get_facets(snapshot: "DatasetSnapshot", filters: IncidentFilter) -> tuple[int, dict[str, list[tuple[Hashable, int]]]]:
+    """compute_facets for a snapshot, served from the facet cache when possible."""
+    filters = filters.normalized()
+    cache = get_facet_cache()
+    key = repr(filters)
+    entry = cache.get(snapshot.version, key)
+    record_cache("facets", hit=entry is not None)
+    if entry is None:
+        entry = compute_facets(snapshot, filters)
+        cache.put(snapshot.version, key, entry)
+    return entry
@@ -0,0 +1,173 @@
+"""
+The incident filter set shared by list and aggregation endpoints.
+
+Values listed for one dimension are OR'ed and dimensions are AND'ed;
+contributing factors can instead require every listed factor. Filters are
+resolved against the bitmap index of the snapshot being served, so any
+combination costs a few bitwise operations rather than a scan of the frame.
+
+Endpoints call ``filters.select(snapshot)``: the resulting RowSelection is
+cached per dataset version under the normalized filter, so a dashboard load
+sending the same filters to several endpoints resolves them once.
+"""
+from dataclasses import dataclass, fields, replace
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from config import get_settings
+from services.instrumentation import record_cache
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+
+# Imported at startup by the routers; numpy is only needed to resolve a filter
+if TYPE_CHECKING:
+    import numpy as np
+    from services.bitmaps import Bitmap
+    from services.data_loader import DatasetSnapshot
+    from services.indexes import DatasetIndexes
+
+FACTOR_MATCH_MODES = ("any", "all")
+
+# Filter field -> bitmap dimension
+_DIMENSIONS = {
+    "factors": "factor",
+    "aircraft_types": "aircraft_type",
+    "states": "state",
+    "locations": "location",
+    "incident_types": "incident_type",
+    "severities": "severity",
+}
+
+# Dimensions whose values are matched case-insensitively (stored upper-case)
+_UPPER_CASE = {"states", "locations"}
+
+
+@dataclass(frozen=True)
+class IncidentFilter:
+    """Year range plus categorical filters; empty tuples mean no constraint."""
+    start_year: Optional[int] = None
+    end_year: Optional[int] = None
+    factors: tuple[str, ...] = ()
+    factor_match: str = "any"
+    aircraft_types: tuple[str, ...] = ()
+    states: tuple[str, ...] = ()
+    locations: tuple[str, ...] = ()
+    incident_types: tuple[str, ...] = ()
+    severities: tuple[str, ...] = ()
+
+    @property
+    def has_dimensions(self) -> bool:
+        """Whether any categorical (non-year) filter is set."""
+        return any(getattr(self, name) for name in _DIMENSIONS)
+
+    @property
+    def is_empty(self) -> bool:
+        return self.start_year is None and self.end_year is None and not self.has_dimensions
+
+    def as_params(self) -> dict:
+        """Non-empty fields, for echoing the applied filters in responses."""
+        params = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name == "factor_match":
+                if len(self.factors) > 1:
+                    params[f.name] = value
+            elif value not in (None, ()):
+                params[f.name] = list(value) if isinstance(value, tuple) else value
+        return params
+
+    def normalized(self) -> "IncidentFilter":
+        """
+        Equivalent filter with values upper-cased where matching ignores
+        case, de-duplicated and sorted, so it can serve as a cache key.
+        """
+        changes = {}
+        for name in _DIMENSIONS:
+            values = getattr(self, name)
+            if name in _UPPER_CASE:
+                values = (v.upper() for v in values)
+            changes[name] = tuple(sorted(set(values)))
+        if len(changes["factors"]) < 2:
+            # Any and all agree on zero or one factor
+            changes["factor_match"] = "any"
+        return replace(self, **changes)
+
+    def matches(self, indexes: "DatasetIndexes") -> "Bitmap":
+        """Rows of a snapshot matching every filter."""
+        from services.bitmaps import Bitmap, intersection, union
+
+        bitmaps = indexes.bitmaps
+        selected = []
+        if self.start_year is not None or self.end_year is not None:
+            # Like filter_by_year_range: a bound excludes rows without a year
+            years = [
+                year for year in bitmaps.values("year")
+                if (self.start_year is None or year >= self.start_year)
+                and (self.end_year is None or year <= self.end_year)
+            ]
+            selected.append(union([bitmaps.get("year", year) for year in years]))
+        for name, dimension in _DIMENSIONS.items():
+            values = getattr(self, name)
+            if not values:
+                continue
+            if name in _UPPER_CASE:
+                values = tuple(v.upper() for v in values)
+            value_bitmaps = [bitmaps.get(dimension, v) for v in values]
+            if name == "factors" and self.factor_match == "all":
+                selected.append(intersection(value_bitmaps))
+            else:
+                selected.append(union(value_bitmaps))
+        if not selected:
+            return Bitmap.full(indexes.n_rows)
+        return intersection(selected)
+
+    def select(self, snapshot: "DatasetSnapshot") -> "RowSelection":
+        """Rows of a snapshot matching every filter, shared through the selection cache."""
+        spec = self.normalized()
+        key = repr(spec)
+        cache = get_selection_cache()
+        selection = cache.get(snapshot.version, key)
+        record_cache("selection", hit=selection is not None)
+        if selection is None:
+            selection = RowSelection(n_rows=snapshot.indexes.n_rows, bitmap=spec.matches(snapshot.indexes))
+            cache.put(snapshot.version, key, selection)
+        return selection
+
+
+@dataclass(frozen=True)
+class RowSelection:
+    """
+    Rows selected by a filter set, in the forms endpoints consume. The mask
+    is materialized on first use and shared by later requests.
+    """
+    n_rows: int
+    bitmap: "Bitmap"
+
+    @cached_property
+    def count(self) -> int:
+        return len(self.bitmap)
+
+    @cached_property
+    def mask(self) -> "np.ndarray":
+        """Boolean row mask (read-only)."""
+        mask = self.bitmap.to_mask(self.n_rows)
+        mask.flags.writeable = False
+        return mask
+
+    @property
+    def positions(self) -> "np.ndarray":
+        """Sorted row positions (int64)."""
+        if self.bitmap.is_dense:
+            import numpy as np
+            
+            return np.flatnonzero(self.mask)
+        return self.bitmap.to_positions(self.n_rows)
+
+
+@lru_cache()
+def get_selection_cache() -> ResponseCache:
+    """Get the process-wide row selection cache."""
+    return ResponseCache(get_settings().SELECTION_CACHE_SIZE)
+
+
+register_structure("selection_cache", "cache", lambda: get_selection_cache()._entries)
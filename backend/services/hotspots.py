@@ -0,0 +1,120 @@
+"""
+Airport hotspot detection.
+
+Every airport's incidents in a recent window of months are compared with
+its own rate over the baseline months before the window. The test is the
+conditional Poisson rate-ratio test: if an airport's monthly rate has not
+changed, its window share of the n = window + baseline incidents is
+binomial with p0 = window months / (window + baseline months). A normal
+approximation with continuity correction scores all airports at once on
+the airport x month count matrix (DatasetIndexes.airport_months), and
+p-values are adjusted for the number of airports tested with the
+Benjamini-Hochberg procedure.
+
+Scores are cached per dataset version by filters, window and baseline.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from config import get_settings
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+from services.statistics import normal_sf
+
+
+@dataclass(frozen=True)
+class HotspotScores:
+    """Rate-ratio test of every airport's window against its baseline."""
+    window_months: int
+    baseline_months: int
+    window_counts: np.ndarray    # (n_airports,) incidents in the window
+    baseline_counts: np.ndarray  # (n_airports,) incidents in the baseline
+    expected: np.ndarray         # (n_airports,) window incidents at the baseline rate
+    rate_ratios: np.ndarray      # (n_airports,) window / baseline rate, inf without baseline incidents
+    z_scores: np.ndarray         # (n_airports,)
+    p_values: np.ndarray         # (n_airports,) one-sided, rate increased
+    q_values: np.ndarray         # (n_airports,) Benjamini-Hochberg adjusted
+
+    @property
+    def n_tested(self) -> int:
+        """Airports with an incident in the window or the baseline."""
+        return int(((self.window_counts + self.baseline_counts) > 0).sum())
+
+
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """False-discovery-rate adjusted p-values (q-values) of independent tests."""
+    n = len(p_values)
+    if n == 0:
+        return np.zeros(0)
+    order = np.argsort(p_values)
+    scaled = p_values[order] * n / np.arange(1, n + 1)
+    # Running minimum from the largest p-value down keeps q monotone
+    adjusted = np.minimum.accumulate(scaled[::-1])[::-1]
+    q_values = np.empty(n)
+    q_values[order] = np.minimum(adjusted, 1.0)
+    return q_values
+
+
+def score_airports(counts: np.ndarray, window_start: int, window_end: int, baseline_start: int) -> HotspotScores:
+    """
+    Test every airport for an increased incident rate.
+
+    Args:
+        counts: Incidents per airport and month slot
+        window_start: First month slot of the window
+        window_end: Month slot after the window
+        baseline_start: First month slot of the baseline, which ends where
+            the window starts
+
+    Returns:
+        Per-airport counts, rate ratios and test statistics; airports
+        without incidents in either period get z = 0 and p = q = 1
+    """
+    window_months = window_end - window_start
+    baseline_months = window_start - baseline_start
+    window = counts[:, window_start:window_end].sum(axis=1)
+    baseline = counts[:, baseline_start:window_start].sum(axis=1)
+
+    n = (window + baseline).astype(float)
+    p0 = window_months / (window_months + baseline_months)
+    expected = baseline * window_months / baseline_months
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate_ratios = np.where(baseline > 0, window / np.maximum(expected, 1e-12), np.inf)
+        z = np.where(n > 0, (window - n * p0 - 0.5) / np.sqrt(n * p0 * (1 - p0)), 0.0)
+    p_values = normal_sf(z)
+
+    tested = n > 0
+    q_values = np.ones(len(n))
+    q_values[tested] = benjamini_hochberg(p_values[tested])
+    return HotspotScores(
+        window_months=window_months,
+        baseline_months=baseline_months,
+        window_counts=window,
+        baseline_counts=baseline,
+        expected=expected,
+        rate_ratios=rate_ratios,
+        z_scores=z,
+        p_values=np.where(tested, p_values, 1.0),
+        q_values=q_values,
+    )
+
+
+def rank_hotspots(scores: HotspotScores, min_incidents: int, limit: int) -> np.ndarray:
+    """
+    Airports with at least ``min_incidents`` in the window, most anomalous
+    first (lowest p-value, then highest z-score).
+    """
+    candidates = np.flatnonzero(scores.window_counts >= min_incidents)
+    order = np.lexsort((-scores.z_scores[candidates], scores.p_values[candidates]))
+    return candidates[order][:limit]
+
+
+@lru_cache()
+def get_hotspot_cache() -> ResponseCache:
+    """Get the process-wide cache of airport scores."""
+    return ResponseCache(get_settings().HOTSPOT_CACHE_SIZE)
+
+
+register_structure("hotspot_cache", "cache", lambda: get_hotspot_cache()._entries)
@@ -0,0 +1,785 @@
+"""
+Derived indexes over the incident dataset.
+Built once when the dataset is loaded and extended incrementally when new
+rows are appended, so ingesting a monthly extract costs time proportional
+to the new rows rather than the whole history.
+"""
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from services.bitmaps import BitmapIndex, build_bitmap_index, extend_bitmap_index
+
+FACTOR_SEPARATOR = "; "
+
+# Severity levels in code order (codes index into this tuple)
+SEVERITY_LEVELS = ("High", "Medium", "Low")
+SEVERITY_CODES = {level: code for code, level in enumerate(SEVERITY_LEVELS)}
+
+# Report table incident types in code order, derived from the anomaly text;
+# the first keyword found wins and rows without one are runway incursions
+INCIDENT_TYPES = ("Runway Incursion", "Taxi Deviation", "Communication Error", "Hold Short Violation")
+INCIDENT_TYPE_KEYWORDS = (("Taxi", 1), ("Communication", 2), ("Hold", 3))
+
+# Group year of rows whose date could not be parsed
+UNKNOWN_YEAR = 0
+
+# Month ordinal (year * 12 + month - 1) of rows whose date could not be parsed
+UNKNOWN_MONTH = -1
+
+# Bitmap dimensions a row can carry several values of
+MULTI_VALUED_DIMENSIONS = ("factor",)
+
+# Bitmap dimensions broken down per airport in airport profiles (plus factors)
+PROFILE_DIMENSIONS = (
+    "year", "severity", "incident_type", "aircraft_type", "flight_phase", "light", "flight_conditions",
+)
+
+# Report table severity heuristics
+HIGH_SEVERITY_INDICATORS = ("runway incursion", "near miss", "collision")
+MEDIUM_SEVERITY_FACTOR = "human factors"
+
+
+def _read_only(*arrays: np.ndarray) -> None:
+    """Mark index arrays non-writeable; indexes are shared across requests."""
+    for array in arrays:
+        array.flags.writeable = False
+
+
+@dataclass(frozen=True)
+class FactorIndex:
+    """
+    Multi-valued contributing factors in CSR form.
+    Row i mentions factors ``codes[offsets[i]:offsets[i + 1]]``; codes index
+    into ``vocabulary``, which is append-only so codes stay stable across
+    incremental updates.
+    """
+    vocabulary: tuple[str, ...]
+    offsets: np.ndarray  # int64, n_rows + 1
+    codes: np.ndarray    # int32, one entry per factor mention
+
+    def __post_init__(self):
+        _read_only(self.offsets, self.codes)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_factors(self) -> int:
+        return len(self.vocabulary)
+
+    def row_ids(self) -> np.ndarray:
+        """Row position of every factor mention (parallel to ``codes``)."""
+        return np.repeat(np.arange(self.n_rows), np.diff(self.offsets))
+
+    @cached_property
+    def mention_rows(self) -> np.ndarray:
+        """``row_ids()`` computed once, for filtered aggregations."""
+        rows = self.row_ids()
+        _read_only(rows)
+        return rows
+
+    def factors_of(self, row: int) -> list[str]:
+        """Factor names mentioned by one row."""
+        return [self.vocabulary[c] for c in self.codes[self.offsets[row]:self.offsets[row + 1]]]
+
+    def code_of(self, factor: str) -> Optional[int]:
+        """Code of a factor name, or None if no row mentions it."""
+        try:
+            return self.vocabulary.index(factor)
+        except ValueError:
+            return None
+
+
+@dataclass(frozen=True)
+class YearFactorCube:
+    """
+    Incident and factor-mention counts per year.
+    Slot ``len(years)`` holds rows whose year could not be parsed.
+    """
+    years: np.ndarray          # sorted distinct years
+    incidents: np.ndarray      # (n_years + 1,) rows per year slot
+    factor_counts: np.ndarray  # (n_years + 1, n_factors) mentions per year slot
+
+    def __post_init__(self):
+        _read_only(self.years, self.incidents, self.factor_counts)
+
+    def slot_mask(self, start_year: Optional[int] = None, end_year: Optional[int] = None) -> np.ndarray:
+        """
+        Select year slots like ``filter_by_year_range``: rows with an unknown
+        year are only included when no bound is given.
+        """
+        known = np.ones(len(self.years), dtype=bool)
+        if start_year is not None:
+            known &= self.years >= start_year
+        if end_year is not None:
+            known &= self.years <= end_year
+        include_unknown = start_year is None and end_year is None
+        return np.append(known, include_unknown)
+
+    def incident_count(self, start_year: Optional[int] = None, end_year: Optional[int] = None) -> int:
+        return int(self.incidents[self.slot_mask(start_year, end_year)].sum())
+
+    def factor_totals(self, start_year: Optional[int] = None, end_year: Optional[int] = None) -> np.ndarray:
+        """Factor mention counts over a year range (indexed by factor code)."""
+        return self.factor_counts[self.slot_mask(start_year, end_year)].sum(axis=0)
+
+
+@dataclass(frozen=True)
+class MonthFactorCube:
+    """
+    Incident and factor-mention counts per calendar month, dense from
+    ``first_month`` (a month ordinal). Rows without a date are not counted.
+    """
+    first_month: int
+    incidents: np.ndarray      # (n_months,) rows per month
+    factor_counts: np.ndarray  # (n_months, n_factors) mentions per month
+
+    def __post_init__(self):
+        _read_only(self.incidents, self.factor_counts)
+
+    @property
+    def n_months(self) -> int:
+        return len(self.incidents)
+
+
+def _year_selector(years: np.ndarray, start_year: Optional[int], end_year: Optional[int]) -> np.ndarray:
+    """Select group years (0 = unknown) with the same rules as ``YearFactorCube.slot_mask``."""
+    if start_year is None and end_year is None:
+        return np.ones(len(years), dtype=bool)
+    selected = years != UNKNOWN_YEAR
+    if start_year is not None:
+        selected &= years >= start_year
+    if end_year is not None:
+        selected &= years <= end_year
+    return selected
+
+
+@dataclass(frozen=True)
+class AirportIndex:
+    """
+    Incident counts per airport and year, overall and per contributing
+    factor, stored as (airport, year[, factor]) groups with a count so a
+    year range or factor filter is a weighted bincount over the groups
+    instead of a groupby over rows. Airport codes are append-only like the
+    factor vocabulary; after incremental updates a group may appear more
+    than once, which the bincount sums.
+    """
+    codes: tuple[str, ...]
+    row_airports: np.ndarray     # int32 per row, -1 when the row has no airport code
+    airports: np.ndarray         # int32 per group
+    years: np.ndarray            # int32 per group, UNKNOWN_YEAR when unparseable
+    counts: np.ndarray           # int64 incidents per group
+    factor_airports: np.ndarray  # int32 per factor group
+    factor_years: np.ndarray     # int32 per factor group
+    factor_codes: np.ndarray     # int32 per factor group
+    factor_counts: np.ndarray    # int64 mentions per factor group
+
+    def __post_init__(self):
+        _read_only(
+            self.row_airports, self.airports, self.years, self.counts,
+            self.factor_airports, self.factor_years, self.factor_codes, self.factor_counts,
+        )
+
+    def totals(
+        self,
+        start_year: Optional[int] = None,
+        end_year: Optional[int] = None,
+        factor_code: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Incidents per airport (indexed like ``codes``) over a year range,
+        counting only incidents that mention ``factor_code`` when given.
+        """
+        if factor_code is None:
+            airports, years, counts = self.airports, self.years, self.counts
+        else:
+            selected = self.factor_codes == factor_code
+            airports = self.factor_airports[selected]
+            years = self.factor_years[selected]
+            counts = self.factor_counts[selected]
+        selected = _year_selector(years, start_year, end_year)
+        return np.bincount(
+            airports[selected], weights=counts[selected], minlength=len(self.codes)
+        ).astype(np.int64)
+
+    def totals_of(self, mask: np.ndarray) -> np.ndarray:
+        """Incidents per airport among the rows selected by a boolean mask."""
+        airports = self.row_airports[mask]
+        return np.bincount(airports[airports >= 0], minlength=len(self.codes)).astype(np.int64)
+
+
+@dataclass(frozen=True)
+class AirportProfiles:
+    """
+    Per-airport breakdowns of report columns, materialized when the dataset
+    loads. Like AirportIndex each dimension is stored as (airport, value)
+    groups with a count; values are the dimension's bitmap value codes, or
+    factor codes for "factor" (counting mentions). After incremental
+    updates a group may appear more than once, which ``breakdown`` sums.
+    """
+    airports: dict[str, np.ndarray]  # dimension -> int32 airport per group
+    values: dict[str, np.ndarray]    # dimension -> int32 value code per group
+    counts: dict[str, np.ndarray]    # dimension -> int64 incidents per group
+    national: dict[str, np.ndarray]  # dimension -> int64 incidents per value code over all rows
+
+    def __post_init__(self):
+        for arrays in (self.airports, self.values, self.counts, self.national):
+            _read_only(*arrays.values())
+
+    def breakdown(self, dimension: str, airports: np.ndarray) -> np.ndarray:
+        """Incidents per value code (indexed like ``national``) at any of the given airports."""
+        selected = np.isin(self.airports[dimension], airports)
+        return np.bincount(
+            self.values[dimension][selected],
+            weights=self.counts[dimension][selected],
+            minlength=len(self.national[dimension]),
+        ).astype(np.int64)
+
+
+@dataclass(frozen=True)
+class DatasetIndexes:
+    """All derived structures for one version of the dataset."""
+    n_rows: int
+    years: np.ndarray     # float year per row, NaN when unparseable
+    factors: FactorIndex
+    cube: YearFactorCube
+    acn_positions: dict[str, int]
+    severity: np.ndarray  # int8 codes into SEVERITY_LEVELS
+    airports: AirportIndex
+    incident_types: np.ndarray  # int8 codes into INCIDENT_TYPES
+    bitmaps: BitmapIndex
+    months: np.ndarray    # int32 month ordinal per row, UNKNOWN_MONTH when unparseable
+    profiles: AirportProfiles
+
+    def __post_init__(self):
+        _read_only(self.years, self.severity, self.incident_types, self.months)
+
+    def position_of(self, acn: str) -> Optional[int]:
+        """Row position of an ACN, or None if it is not in this version."""
+        return self.acn_positions.get(acn)
+
+    def severity_of(self, positions: np.ndarray) -> list[str]:
+        return [SEVERITY_LEVELS[c] for c in self.severity[positions]]
+
+    def incident_type_of(self, positions: np.ndarray) -> list[str]:
+        return [INCIDENT_TYPES[c] for c in self.incident_types[positions]]
+
+    def year_mask(self, start_year: Optional[int] = None, end_year: Optional[int] = None) -> np.ndarray:
+        """Boolean row mask equivalent to ``filter_by_year_range``."""
+        mask = np.ones(self.n_rows, dtype=bool)
+        if start_year is not None:
+            mask &= self.years >= start_year
+        if end_year is not None:
+            mask &= self.years <= end_year
+        return mask
+
+    def factor_totals_of(self, mask: np.ndarray) -> np.ndarray:
+        """Factor mention counts among the rows selected by a boolean mask."""
+        codes = self.factors.codes[mask[self.factors.mention_rows]]
+        return np.bincount(codes, minlength=self.factors.n_factors)
+
+    def factor_cooccurrence_of(self, mask: np.ndarray) -> np.ndarray:
+        """
+        Incidents citing each pair of factors among the rows selected by a
+        boolean mask: X^T X of the rows x factors incidence matrix, so the
+        diagonal counts incidents citing each factor. Every factor of a row
+        is paired with every factor of the same row, which costs the sum of
+        squared factors per row.
+        """
+        n_factors = self.factors.n_factors
+        selected = mask[self.factors.mention_rows]
+        # One entry per (row, factor), sorted by row: the CSR incidence matrix
+        entries = np.unique(self.factors.mention_rows[selected] * n_factors + self.factors.codes[selected])
+        rows, codes = entries // n_factors, entries % n_factors
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+        lengths = np.diff(np.r_[starts, len(rows)])
+
+        # Entry i of a row of length k pairs with the k entries of its row
+        pairs_per_entry = np.repeat(lengths, lengths)
+        left = np.repeat(np.arange(len(codes)), pairs_per_entry)
+        first_pair = np.cumsum(pairs_per_entry) - pairs_per_entry
+        partner = np.arange(len(left)) - np.repeat(first_pair, pairs_per_entry)
+        right = np.repeat(np.repeat(starts, lengths), pairs_per_entry) + partner
+        return np.bincount(
+            codes[left] * n_factors + codes[right], minlength=n_factors * n_factors,
+        ).reshape(n_factors, n_factors)
+
+    @cached_property
+    def year_slots(self) -> np.ndarray:
+        """Cube year slot of every row (``len(cube.years)`` when the year is unknown)."""
+        years = self.cube.years
+        slots = np.full(self.n_rows, len(years), dtype=np.int64)
+        known = ~np.isnan(self.years)
+        slots[known] = np.searchsorted(years, self.years[known].astype(int))
+        _read_only(slots)
+        return slots
+
+    def cube_of(self, mask: np.ndarray) -> YearFactorCube:
+        """Year cube over the rows selected by a boolean mask (same year slots as ``cube``)."""
+        n_slots = len(self.cube.years) + 1
+        n_factors = self.factors.n_factors
+        selected = mask[self.factors.mention_rows]
+        mention_slots = self.year_slots[self.factors.mention_rows[selected]]
+        factor_counts = np.bincount(
+            mention_slots * n_factors + self.factors.codes[selected],
+            minlength=n_slots * n_factors,
+        ).reshape(n_slots, n_factors)
+        return YearFactorCube(
+            years=self.cube.years,
+            incidents=np.bincount(self.year_slots[mask], minlength=n_slots),
+            factor_counts=factor_counts,
+        )
+
+    @cached_property
+    def month_span(self) -> tuple[int, int]:
+        """First month ordinal and number of months covered by dated rows."""
+        known = self.months[self.months != UNKNOWN_MONTH]
+        if len(known) == 0:
+            return 0, 0
+        first = int(known.min())
+        return first, int(known.max()) - first + 1
+
+    @cached_property
+    def month_slots(self) -> np.ndarray:
+        """Month cube slot of every row (-1 when the date is unknown)."""
+        first, _ = self.month_span
+        slots = np.where(self.months != UNKNOWN_MONTH, self.months.astype(np.int64) - first, -1)
+        _read_only(slots)
+        return slots
+
+    @cached_property
+    def month_cube(self) -> MonthFactorCube:
+        """Monthly counts over all rows, built on first use."""
+        return self.month_cube_of(np.ones(self.n_rows, dtype=bool))
+
+    def month_cube_of(self, mask: np.ndarray) -> MonthFactorCube:
+        """Monthly counts over the rows selected by a boolean mask (same slots as ``month_cube``)."""
+        first, n_months = self.month_span
+        n_factors = self.factors.n_factors
+        slots = self.month_slots[self.factors.mention_rows]
+        selected = mask[self.factors.mention_rows] & (slots >= 0)
+        factor_counts = np.bincount(
+            slots[selected] * n_factors + self.factors.codes[selected],
+            minlength=n_months * n_factors,
+        ).reshape(n_months, n_factors)
+        return MonthFactorCube(
+            first_month=first,
+            incidents=self.month_counts_of(mask),
+            factor_counts=factor_counts,
+        )
+
+    def month_counts_of(self, mask: np.ndarray) -> np.ndarray:
+        """Rows per month cube slot among the rows selected by a boolean mask."""
+        slots = self.month_slots[mask]
+        return np.bincount(slots[slots >= 0], minlength=self.month_span[1])
+
+    @cached_property
+    def airport_months(self) -> np.ndarray:
+        """Incidents per airport (rows, indexed like ``airports.codes``) and month cube slot."""
+        counts = self.airport_months_of(np.ones(self.n_rows, dtype=bool))
+        _read_only(counts)
+        return counts
+
+    def airport_months_of(self, mask: np.ndarray) -> np.ndarray:
+        """``airport_months`` among the rows selected by a boolean mask."""
+        n_airports = len(self.airports.codes)
+        n_months = self.month_span[1]
+        located = mask & (self.airports.row_airports >= 0) & (self.month_slots >= 0)
+        return np.bincount(
+            self.airports.row_airports[located].astype(np.int64) * n_months + self.month_slots[located],
+            minlength=n_airports * n_months,
+        ).reshape(n_airports, n_months)
+
+    def airport_positions(self, codes: tuple[str, ...]) -> np.ndarray:
+        """Positions in ``airports.codes`` of airports matching codes case-insensitively."""
+        wanted = {code.upper() for code in codes}
+        return np.array(
+            [i for i, code in enumerate(self.airports.codes) if str(code).upper() in wanted],
+            dtype=np.int64,
+        )
+
+    def year_counts_of(self, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct known years among the selected rows, with row counts."""
+        years = self.years[mask]
+        return np.unique(years[~np.isnan(years)].astype(int), return_counts=True)
+
+    def top_factors(self, counts: np.ndarray, limit: Optional[int] = None) -> list[tuple[str, int]]:
+        """Factors with non-zero counts, most frequent first (ties by name)."""
+        ranked = sorted(
+            ((self.factors.vocabulary[code], int(count)) for code, count in enumerate(counts) if count > 0),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return ranked[:limit] if limit is not None else ranked
+
+
+# ============== Builders ==============
+
+def _positional_years(df: pd.DataFrame) -> np.ndarray:
+    return df["Year"].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _positional_months(df: pd.DataFrame) -> np.ndarray:
+    """Month ordinal (year * 12 + month - 1) per row from ``Date_parsed``."""
+    if "Date_parsed" not in df.columns:
+        return np.full(len(df), UNKNOWN_MONTH, dtype=np.int32)
+    dates = df["Date_parsed"]
+    months = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(dtype=float, na_value=np.nan)
+    return np.where(np.isnan(months), UNKNOWN_MONTH, months).astype(np.int32)
+
+
+def _build_factor_index(values: pd.Series, vocabulary: tuple[str, ...] = ()) -> FactorIndex:
+    """Split 'A; B; C' factor strings into CSR codes, extending ``vocabulary``."""
+    values = values.reset_index(drop=True)
+    exploded = values.dropna().str.split(FACTOR_SEPARATOR).explode().str.strip()
+    exploded = exploded[exploded.notna() & (exploded != "")]
+
+    lookup = {factor: code for code, factor in enumerate(vocabulary)}
+    new_factors = [f for f in pd.unique(exploded.to_numpy()) if f not in lookup]
+    vocabulary = tuple(vocabulary) + tuple(new_factors)
+    lookup.update({factor: len(lookup) + i for i, factor in enumerate(new_factors)})
+
+    codes = exploded.map(lookup).to_numpy(dtype=np.int32)
+    per_row = np.bincount(exploded.index.to_numpy(dtype=np.int64), minlength=len(values))
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(per_row, out=offsets[1:])
+    return FactorIndex(vocabulary=vocabulary, offsets=offsets, codes=codes)
+
+
+def _build_cube(years: np.ndarray, factors: FactorIndex) -> YearFactorCube:
+    """Count rows and factor mentions per year slot."""
+    slot_years = np.unique(years[~np.isnan(years)]).astype(int)
+    n_slots = len(slot_years) + 1
+    slots = np.full(len(years), len(slot_years), dtype=np.int64)
+    known = ~np.isnan(years)
+    slots[known] = np.searchsorted(slot_years, years[known].astype(int))
+
+    incidents = np.bincount(slots, minlength=n_slots)
+    mention_slots = slots[factors.row_ids()]
+    factor_counts = np.bincount(
+        mention_slots * factors.n_factors + factors.codes,
+        minlength=n_slots * factors.n_factors,
+    ).reshape(n_slots, factors.n_factors)
+    return YearFactorCube(years=slot_years, incidents=incidents, factor_counts=factor_counts)
+
+
+def _group_counts(*keys: np.ndarray) -> tuple[list[np.ndarray], np.ndarray]:
+    """Distinct combinations of the key arrays and how often each occurs."""
+    if len(keys[0]) == 0:
+        return [np.zeros(0, dtype=np.int32) for _ in keys], np.zeros(0, dtype=np.int64)
+    groups, counts = np.unique(np.stack(keys, axis=1), axis=0, return_counts=True)
+    return [groups[:, i].astype(np.int32) for i in range(len(keys))], counts.astype(np.int64)
+
+
+def _build_airport_index(
+    values: pd.Series,
+    years: np.ndarray,
+    factors: FactorIndex,
+    codes: tuple[str, ...] = (),
+) -> AirportIndex:
+    """Group rows and factor mentions by airport and year, extending ``codes``."""
+    values = values.reset_index(drop=True)
+    lookup = {code: i for i, code in enumerate(codes)}
+    new_codes = [c for c in pd.unique(values.dropna().to_numpy()) if c not in lookup]
+    codes = tuple(codes) + tuple(new_codes)
+    lookup.update({code: len(lookup) + i for i, code in enumerate(new_codes)})
+
+    row_airports = values.map(lookup).to_numpy(dtype=float, na_value=np.nan)
+    row_airports = np.where(np.isnan(row_airports), -1, row_airports).astype(np.int32)
+    row_years = np.where(np.isnan(years), UNKNOWN_YEAR, years).astype(np.int32)
+
+    located = row_airports >= 0
+    (airports, group_years), counts = _group_counts(row_airports[located], row_years[located])
+
+    mention_rows = factors.row_ids()
+    mention_airports = row_airports[mention_rows]
+    located = mention_airports >= 0
+    (factor_airports, factor_years, factor_codes), factor_counts = _group_counts(
+        mention_airports[located], row_years[mention_rows][located], factors.codes[located],
+    )
+    return AirportIndex(
+        codes=codes,
+        row_airports=row_airports,
+        airports=airports,
+        years=group_years,
+        counts=counts,
+        factor_airports=factor_airports,
+        factor_years=factor_years,
+        factor_codes=factor_codes,
+        factor_counts=factor_counts,
+    )
+
+
+def _merge_airport_indexes(old: AirportIndex, new: AirportIndex) -> AirportIndex:
+    """Append the groups of new rows (whose codes extend ``old.codes``)."""
+    return AirportIndex(
+        codes=new.codes,
+        row_airports=np.concatenate([old.row_airports, new.row_airports]),
+        airports=np.concatenate([old.airports, new.airports]),
+        years=np.concatenate([old.years, new.years]),
+        counts=np.concatenate([old.counts, new.counts]),
+        factor_airports=np.concatenate([old.factor_airports, new.factor_airports]),
+        factor_years=np.concatenate([old.factor_years, new.factor_years]),
+        factor_codes=np.concatenate([old.factor_codes, new.factor_codes]),
+        factor_counts=np.concatenate([old.factor_counts, new.factor_counts]),
+    )
+
+
+def _build_airport_profiles(
+    row_airports: np.ndarray,
+    row_codes: dict[str, np.ndarray],
+    n_values: dict[str, int],
+    factors: FactorIndex,
+) -> AirportProfiles:
+    """
+    Group rows by airport and value of every profile dimension.
+
+    Args:
+        row_airports: Airport code per row (-1 without one)
+        row_codes: Bitmap value code per row of each dimension (-1 when missing)
+        n_values: Number of value codes of each dimension, factors included
+        factors: Factor mentions of the same rows
+
+    Returns:
+        Profiles of these rows only
+    """
+    mention_rows = factors.row_ids()
+    codes_by_dimension = {**row_codes, "factor": factors.codes}
+    airports_by_dimension = {**{name: row_airports for name in row_codes}, "factor": row_airports[mention_rows]}
+    airports, values, counts, national = {}, {}, {}, {}
+    for name, codes in codes_by_dimension.items():
+        row_airport = airports_by_dimension[name]
+        known = codes >= 0
+        national[name] = np.bincount(codes[known], minlength=n_values[name]).astype(np.int64)
+        located = known & (row_airport >= 0)
+        (airports[name], values[name]), counts[name] = _group_counts(row_airport[located], codes[located])
+    return AirportProfiles(airports=airports, values=values, counts=counts, national=national)
+
+
+def _merge_airport_profiles(old: AirportProfiles, new: AirportProfiles) -> AirportProfiles:
+    """Append the groups of new rows and add their national counts (value codes only grow)."""
+    national = {}
+    for name, counts in new.national.items():
+        merged = counts.copy()
+        merged[:len(old.national[name])] += old.national[name]
+        national[name] = merged
+    return AirportProfiles(
+        airports={name: np.concatenate([old.airports[name], new.airports[name]]) for name in new.airports},
+        values={name: np.concatenate([old.values[name], new.values[name]]) for name in new.values},
+        counts={name: np.concatenate([old.counts[name], new.counts[name]]) for name in new.counts},
+        national=national,
+    )
+
+
+def _profile_inputs(bitmaps: BitmapIndex, factors: FactorIndex, start: int) -> tuple[dict[str, np.ndarray], dict[str, int]]:
+    """Row codes of the profile dimensions from row ``start`` on, and value counts."""
+    row_codes = {name: bitmaps.row_codes[name][start:] for name in PROFILE_DIMENSIONS}
+    n_values = {name: len(bitmaps.values(name)) for name in PROFILE_DIMENSIONS}
+    n_values["factor"] = factors.n_factors
+    return row_codes, n_values
+
+
+def _airport_codes(df: pd.DataFrame) -> pd.Series:
+    if "airport_code" in df.columns:
+        return df["airport_code"]
+    return pd.Series([None] * len(df), dtype=object)
+
+
+def _merge_cubes(old: YearFactorCube, new: YearFactorCube) -> YearFactorCube:
+    """Add two cubes whose factor columns share codes (new may have more)."""
+    years = np.union1d(old.years, new.years).astype(int)
+    n_factors = new.factor_counts.shape[1]
+    incidents = np.zeros(len(years) + 1, dtype=np.int64)
+    factor_counts = np.zeros((len(years) + 1, n_factors), dtype=np.int64)
+    for cube in (old, new):
+        slots = np.append(np.searchsorted(years, cube.years), len(years))
+        incidents[slots] += cube.incidents
+        factor_counts[slots, :cube.factor_counts.shape[1]] += cube.factor_counts
+    return YearFactorCube(years=years, incidents=incidents, factor_counts=factor_counts)
+
+
+def _classify_severity(df: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized report-table severity: High when the synopsis (or narrative)
+    or anomaly mentions a high-severity indicator, Medium when human factors
+    contributed, Low otherwise.
+    """
+    text_col = "synopsis" if "synopsis" in df.columns else "narrative"
+    text = df[text_col].str.lower() if text_col in df.columns else pd.Series("", index=df.index)
+    anomaly = df["anomaly"].str.lower() if "anomaly" in df.columns else pd.Series("", index=df.index)
+    pattern = "|".join(HIGH_SEVERITY_INDICATORS)
+    high = (
+        text.str.contains(pattern, regex=True, na=False)
+        | anomaly.str.contains(pattern, regex=True, na=False)
+    ).to_numpy(dtype=bool)
+
+    if "contributing_factors" in df.columns:
+        medium = df["contributing_factors"].str.lower().str.contains(
+            MEDIUM_SEVERITY_FACTOR, regex=False, na=False
+        ).to_numpy(dtype=bool)
+    else:
+        medium = np.zeros(len(df), dtype=bool)
+
+    codes = np.full(len(df), SEVERITY_CODES["Low"], dtype=np.int8)
+    codes[medium] = SEVERITY_CODES["Medium"]
+    codes[high] = SEVERITY_CODES["High"]
+    return codes
+
+
+def _classify_incident_type(df: pd.DataFrame) -> np.ndarray:
+    """Vectorized report-table incident type from the anomaly text."""
+    codes = np.zeros(len(df), dtype=np.int8)
+    if "anomaly" in df.columns:
+        # Apply in reverse so the first keyword in INCIDENT_TYPE_KEYWORDS wins
+        for keyword, code in reversed(INCIDENT_TYPE_KEYWORDS):
+            codes[df["anomaly"].str.contains(keyword, regex=False, na=False).to_numpy(dtype=bool)] = code
+    return codes
+
+
+def _column_keys(df: pd.DataFrame, column: str, upper: bool = False) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), None, dtype=object)
+    values = df[column].str.upper() if upper else df[column]
+    return values.to_numpy(dtype=object, na_value=None)
+
+
+def _bitmap_dimensions(
+    df: pd.DataFrame,
+    start: int,
+    years: np.ndarray,
+    factors: FactorIndex,
+    severity: np.ndarray,
+    incident_types: np.ndarray,
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """(keys, row positions) per filter dimension for rows starting at ``start``."""
+    rows = np.arange(start, start + len(df))
+    known = ~np.isnan(years)
+    return {
+        "year": (years[known].astype(int), rows[known]),
+        "factor": (np.array(factors.vocabulary, dtype=object)[factors.codes], factors.row_ids() + start),
+        "aircraft_type": (_column_keys(df, "aircraft_type"), rows),
+        "state": (_column_keys(df, "state", upper=True), rows),
+        "location": (_column_keys(df, "airport_code", upper=True), rows),
+        "incident_type": (np.array(INCIDENT_TYPES, dtype=object)[incident_types], rows),
+        "severity": (np.array(SEVERITY_LEVELS, dtype=object)[severity], rows),
+        "flight_phase": (_column_keys(df, "flight_phase"), rows),
+        "light": (_column_keys(df, "light"), rows),
+        "flight_conditions": (_column_keys(df, "flight_conditions"), rows),
+        "time_of_day": (_column_keys(df, "time_of_day"), rows),
+    }
+
+
+def _acn_keys(df: pd.DataFrame) -> pd.Series:
+    return df["acn"].astype(str)
+
+
+def _build_acn_positions(df: pd.DataFrame) -> dict[str, int]:
+    acn_positions: dict[str, int] = {}
+    for position, acn in enumerate(_acn_keys(df)):
+        acn_positions.setdefault(acn, position)
+    return acn_positions
+
+
+def build_indexes(df: pd.DataFrame, executor: Optional[Executor] = None) -> DatasetIndexes:
+    """
+    Build all derived indexes for a freshly loaded dataset.
+    With an executor the independent structures are built concurrently.
+    """
+    def build_factors():
+        factors = _build_factor_index(df["contributing_factors"] if "contributing_factors" in df.columns
+                                      else pd.Series([None] * len(df), dtype=object))
+        return factors, _build_cube(_positional_years(df), factors)
+    
+    if executor is None:
+        (factors, cube), severity, acn_positions = build_factors(), _classify_severity(df), _build_acn_positions(df)
+    else:
+        factors_future = executor.submit(build_factors)
+        severity_future = executor.submit(_classify_severity, df)
+        acn_future = executor.submit(_build_acn_positions, df)
+        factors, cube = factors_future.result()
+        severity, acn_positions = severity_future.result(), acn_future.result()
+    
+    years = _positional_years(df)
+    incident_types = _classify_incident_type(df)
+    airports = _build_airport_index(_airport_codes(df), years, factors)
+    bitmaps = build_bitmap_index(
+        _bitmap_dimensions(df, 0, years, factors, severity, incident_types), len(df),
+        multi_valued=MULTI_VALUED_DIMENSIONS,
+    )
+    return DatasetIndexes(
+        n_rows=len(df),
+        years=years,
+        factors=factors,
+        cube=cube,
+        acn_positions=acn_positions,
+        severity=severity,
+        airports=airports,
+        incident_types=incident_types,
+        bitmaps=bitmaps,
+        months=_positional_months(df),
+        profiles=_build_airport_profiles(airports.row_airports, *_profile_inputs(bitmaps, factors, 0), factors),
+    )
+
+
+def extend_indexes(indexes: DatasetIndexes, new_rows: pd.DataFrame) -> DatasetIndexes:
+    """
+    Extend indexes with rows appended after the existing ones.
+    Only the new rows are split, classified and counted; existing counts
+    are merged rather than recomputed.
+    """
+    old = indexes.factors
+    delta = _build_factor_index(
+        new_rows["contributing_factors"] if "contributing_factors" in new_rows.columns
+        else pd.Series([None] * len(new_rows), dtype=object),
+        vocabulary=old.vocabulary,
+    )
+    factors = FactorIndex(
+        vocabulary=delta.vocabulary,
+        offsets=np.concatenate([old.offsets, delta.offsets[1:] + old.offsets[-1]]),
+        codes=np.concatenate([old.codes, delta.codes]),
+    )
+    new_years = _positional_years(new_rows)
+    cube = _merge_cubes(indexes.cube, _build_cube(new_years, delta))
+    airports = _merge_airport_indexes(
+        indexes.airports,
+        _build_airport_index(_airport_codes(new_rows), new_years, delta, indexes.airports.codes),
+    )
+
+    # A new map: the previous version's stays untouched if anything below fails
+    acn_positions = dict(indexes.acn_positions)
+    for offset, acn in enumerate(_acn_keys(new_rows)):
+        acn_positions.setdefault(acn, indexes.n_rows + offset)
+
+    new_severity = _classify_severity(new_rows)
+    new_incident_types = _classify_incident_type(new_rows)
+    n_rows = indexes.n_rows + len(new_rows)
+    bitmaps = extend_bitmap_index(
+        indexes.bitmaps,
+        _bitmap_dimensions(new_rows, indexes.n_rows, new_years, delta, new_severity, new_incident_types),
+        n_rows,
+    )
+    profiles = _merge_airport_profiles(
+        indexes.profiles,
+        _build_airport_profiles(
+            airports.row_airports[indexes.n_rows:], *_profile_inputs(bitmaps, delta, indexes.n_rows), delta,
+        ),
+    )
+
+    return DatasetIndexes(
+        n_rows=n_rows,
+        years=np.concatenate([indexes.years, new_years]),
+        factors=factors,
+        cube=cube,
+        acn_positions=acn_positions,
+        severity=np.concatenate([indexes.severity, new_severity]),
+        airports=airports,
+        incident_types=np.concatenate([indexes.incident_types, new_incident_types]),
+        bitmaps=bitmaps,
+        months=np.concatenate([indexes.months, _positional_months(new_rows)]),
+        profiles=profiles,
+    )
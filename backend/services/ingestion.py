@@ -0,0 +1,116 @@
+"""
+Incremental ingestion of new ASRS extracts.
+
+New export files are dropped into INGEST_DIR. Ingestion reads only files the
+current dataset was not built from, deduplicates their rows by ACN and
+appends the new incidents (see data_loader.append_incidents). Because full
+loads also read INGEST_DIR, ingested rows survive restarts; only INGEST_DIR
+is ingested, since files elsewhere would be dropped by the next full load.
+
+Ingestion runs in the server that holds the dataset (POST /admin/ingest).
+The command line triggers it there, or only validates the drop directory:
+
+    python -m services.ingestion --token $ADMIN_TOKEN                 # http://localhost:API_PORT
+    python -m services.ingestion --url http://host:8000 --token $ADMIN_TOKEN
+    python -m services.ingestion --check                              # parse the extracts, apply nothing
+
+Each worker process holds its own copy of the dataset, so with several
+workers either call the endpoint per worker or restart them.
+"""
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from config import get_settings
+from services.data_loader import (
+    append_incidents,
+    get_dataset_version,
+    get_source_files,
+    load_all_data,
+    read_extract,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def find_new_files(drop_dir: Path) -> list[Path]:
+    """CSV files in the drop directory that the current dataset does not include."""
+    if not drop_dir.is_dir():
+        return []
+    known = {p.name for p in get_source_files()}
+    return sorted(p for p in drop_dir.glob("*.csv") if p.name not in known)
+
+
+def ingest_drop_dir() -> dict:
+    """
+    Ingest all new extracts from INGEST_DIR into this process's dataset.
+
+    Returns:
+        Ingestion summary (see data_loader.append_incidents)
+    """
+    drop_dir = get_settings().INGEST_DIR
+    current = load_all_data()
+    files = find_new_files(drop_dir)
+    if not files:
+        logger.info(f"No new files in {drop_dir}")
+        version = get_dataset_version()
+        return {
+            "files": [],
+            "rows_read": 0,
+            "rows_added": 0,
+            "duplicates_skipped": 0,
+            "previous_version": version,
+            "version": version,
+            "total_rows": len(current),
+            "duration_ms": 0.0,
+            "stages_ms": {},
+        }
+
+    raw = pd.concat([read_extract(path) for path in files], ignore_index=True)
+    return append_incidents(raw, files)
+
+
+def check_drop_dir() -> dict:
+    """
+    Parse every extract in INGEST_DIR without loading the dataset or
+    applying anything, so a bad file is caught before a server ingests it.
+    Cost scales with the drop directory, not with the dataset.
+    """
+    drop_dir = get_settings().INGEST_DIR
+    files = sorted(drop_dir.glob("*.csv")) if drop_dir.is_dir() else []
+    rows = {path.name: len(read_extract(path)) for path in files}
+    return {"drop_dir": str(drop_dir), "files": list(rows), "rows_read": sum(rows.values()), "rows_per_file": rows}
+
+
+def _ingest_remote(url: str, token: Optional[str]) -> dict:
+    """Ask a running instance to ingest via its admin endpoint."""
+    import httpx
+
+    headers = {"X-Admin-Token": token} if token else {}
+    response = httpx.post(f"{url.rstrip('/')}/admin/ingest", headers=headers, timeout=600.0)
+    response.raise_for_status()
+    return response.json()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Ingest new ASRS extracts from INGEST_DIR into a running instance")
+    parser.add_argument("--url", default=f"http://localhost:{settings.API_PORT}", help="Instance to ingest into")
+    parser.add_argument("--token", default=None, help="Admin token")
+    parser.add_argument("--check", action="store_true", help="Only parse the extracts in INGEST_DIR; apply nothing")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.check:
+        result = check_drop_dir()
+    else:
+        result = _ingest_remote(args.url, args.token)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
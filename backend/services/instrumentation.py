@@ -0,0 +1,334 @@
+"""
+Request instrumentation for the ASRS Dashboard backend.
+Provides a lightweight span API for marking request stages, a middleware that
+emits stage durations in the Server-Timing header, and an in-process metrics
+registry rendered in Prometheus text format on /metrics.
+
+Metrics are kept per worker process; Prometheus should scrape each worker
+(or aggregate them) when running uvicorn with several workers.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Dataset loads take seconds rather than milliseconds
+RELOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+# ============== Metrics Registry ==============
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], le: Optional[str] = None) -> str:
+    """Render a Prometheus label set, e.g. {route="/api/x",stage="load"}."""
+    pairs = list(zip(labelnames, values))
+    if le is not None:
+        pairs.append(("le", le))
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, str(bound))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, '+Inf')} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "asrs_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "asrs_http_requests_in_flight",
+    "HTTP requests currently being processed.",
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "asrs_stage_duration_seconds",
+    "Time spent in each request stage by route.",
+    ("route", "stage"),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "asrs_cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss).",
+    ("cache", "result"),
+)
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "asrs_single_flight_calls_total",
+    "Coalesced computations by group and result (computed, or joined an identical call in flight).",
+    ("group", "result"),
+)
+ADMISSION_DECISIONS = REGISTRY.counter(
+    "asrs_admission_decisions_total",
+    "Admission decisions by cost class (admitted, queued, rejected_queue_full, rejected_timeout).",
+    ("cost_class", "result"),
+)
+DATASET_RELOAD_DURATION = REGISTRY.histogram(
+    "asrs_dataset_reload_duration_seconds",
+    "Time spent loading the incident dataset from disk.",
+    buckets=RELOAD_BUCKETS,
+)
+DATASET_ROWS = REGISTRY.gauge(
+    "asrs_dataset_rows",
+    "Number of incident rows in the most recently loaded dataset.",
+)
+DATASET_INGESTED_ROWS = REGISTRY.counter(
+    "asrs_dataset_ingested_rows_total",
+    "New incident rows appended by incremental ingestion.",
+)
+DATASET_SNAPSHOTS_LIVE = REGISTRY.gauge(
+    "asrs_dataset_snapshots_live",
+    "Dataset snapshots still referenced (current version plus any held by in-flight requests).",
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_admission(cost_class: str, result: str) -> None:
+    """Count an admission decision."""
+    ADMISSION_DECISIONS.inc(cost_class=cost_class, result=result)
+
+
+def record_flight(group: str, joined: bool) -> None:
+    """Count a single-flight call."""
+    SINGLE_FLIGHT_CALLS.inc(group=group, result="joined" if joined else "computed")
+
+
+# ============== Spans ==============
+
+@dataclass
+class RequestTimings:
+    """Stage durations (seconds) collected while handling one request."""
+    stages: dict[str, float] = field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Get the timings of the request being handled, if any."""
+    return _current_timings.get()
+
+
+@contextmanager
+def span(stage: str):
+    """
+    Mark a stage of the current request, e.g. ``with span("filter"): ...``.
+
+    Durations of spans with the same name are summed. Outside a request
+    (startup, background reloads) the span is a no-op. Spans should not be
+    nested, since the outer stage would then include the inner one.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - start)
+
+
+def server_timing_header(stages: dict[str, float], total: float) -> str:
+    """Format stage durations as a Server-Timing header value (milliseconds)."""
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def route_label(scope: dict) -> str:
+    """Route template for metric labels, keeping label cardinality bounded."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+# ============== Middleware ==============
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware that times each request, exposes its stage breakdown in
+    the Server-Timing header and records request and stage metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+        REQUESTS_IN_FLIGHT.inc()
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    server_timing_header(timings.stages, time.perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            route = route_label(scope)
+            REQUEST_DURATION.observe(elapsed, method=scope["method"], route=route, status=status_code)
+            for stage, seconds in timings.stages.items():
+                STAGE_DURATION.observe(seconds, route=route, stage=stage)
+            _current_timings.reset(token)
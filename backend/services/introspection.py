@@ -0,0 +1,114 @@
+"""
+Memory introspection for the cached dataset and its derived structures.
+Modules that build indexes, caches or vector stores register a reporter
+here so /admin/dataset can show how much memory each of them holds.
+"""
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+# Registering is done at import time by many modules; pandas and numpy are
+# only needed once sizes are measured
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Kinds of derived structures reported by /admin/dataset
+STRUCTURE_KINDS = ("index", "cache", "vector_store", "text_store")
+
+# name -> (kind, callable returning the object(s) to measure)
+_structures: dict[str, tuple[str, Callable[[], Any]]] = {}
+_lock = threading.Lock()
+
+
+def register_structure(name: str, kind: str, getter: Callable[[], Any]) -> None:
+    """
+    Register a derived structure for memory reporting.
+
+    Args:
+        name: Unique structure name, e.g. "acn_index"
+        kind: One of STRUCTURE_KINDS
+        getter: Returns the current object to measure (None if not built)
+    """
+    if kind not in STRUCTURE_KINDS:
+        raise ValueError(f"Unknown structure kind '{kind}'")
+    with _lock:
+        _structures[name] = (kind, getter)
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Estimate the memory held by an object in bytes.
+    Understands pandas and numpy objects and recurses into containers;
+    shared objects are only counted once.
+    """
+    import numpy as np
+    import pandas as pd
+    
+    if _seen is None:
+        _seen = set()
+    if obj is None or id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.memmap):
+        # File-backed pages are not private to this process
+        return 0
+    if isinstance(obj, np.ndarray):
+        # Views share their base buffer; count the buffer once
+        if obj.base is not None and isinstance(obj.base, np.ndarray):
+            return estimate_size(obj.base, _seen)
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += sum(sys.getsizeof(v) for v in obj.ravel())
+        return int(size)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for v in obj)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + estimate_size(vars(obj), _seen)
+    if hasattr(obj, "__slots__"):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(getattr(obj, slot, None), _seen) for slot in obj.__slots__
+        )
+    return sys.getsizeof(obj)
+
+
+def column_stats(df: "pd.DataFrame") -> list[dict]:
+    """Per-column dtype, deep memory usage, cardinality and null count."""
+    memory = df.memory_usage(deep=True, index=False)
+    stats = []
+    for column in df.columns:
+        series = df[column]
+        stats.append({
+            "name": str(column),
+            "dtype": str(series.dtype),
+            "memory_bytes": int(memory[column]),
+            "cardinality": int(series.nunique(dropna=True)),
+            "null_count": int(series.isna().sum()),
+        })
+    stats.sort(key=lambda c: c["memory_bytes"], reverse=True)
+    return stats
+
+
+def structure_stats() -> list[dict]:
+    """Memory estimates of all registered derived structures."""
+    with _lock:
+        items = sorted(_structures.items())
+    stats = []
+    for name, (kind, getter) in items:
+        obj = getter()
+        stats.append({
+            "name": name,
+            "kind": kind,
+            "built": obj is not None,
+            "memory_bytes": estimate_size(obj),
+            "entries": len(obj) if hasattr(obj, "__len__") else None,
+        })
+    return stats
@@ -0,0 +1,178 @@
+"""
+Pivot tables (cross-tabs) over categorical report dimensions.
+
+Every pivot dimension is dictionary-encoded in the dataset indexes: single
+valued columns through the bitmap index's per-row value codes, factors
+through the CSR factor index. A pivot of up to three dimensions combines
+the codes of the selected rows into one flat cell index and counts it with
+a bincount (np.unique when the dense cell space would be too large), so no
+strings are grouped per request. When factors are a dimension each factor
+mention is counted, so a report citing two factors counts once for each.
+Rows missing a dimension's value are left out.
+
+Cubes are computed by the configured query engine (services.query_engine)
+and cached per dataset version by filter signature and dimensions.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable
+
+import numpy as np
+
+from config import get_settings
+from services.filters import IncidentFilter
+from services.instrumentation import record_cache
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from services.data_loader import DatasetSnapshot
+    from services.indexes import DatasetIndexes
+
+# Dimensions a pivot can group by (bitmap dimensions plus "factor")
+PIVOT_DIMENSIONS = (
+    "year", "state", "location", "aircraft_type", "factor", "severity", "incident_type",
+    "flight_phase", "light", "flight_conditions", "time_of_day",
+)
+MAX_PIVOT_DIMENSIONS = 3
+
+# Cell spaces up to this size are counted with a dense bincount
+MAX_DENSE_CELLS = 1 << 22
+
+
+@dataclass(frozen=True)
+class PivotCube:
+    """Non-empty cells of a pivot, with each dimension's values in display order."""
+    dimensions: tuple[str, ...]
+    values: tuple[list, ...]  # per dimension: values present, display order
+    cells: np.ndarray         # (n_cells, n_dimensions) positions into values
+    counts: np.ndarray        # (n_cells,) rows, or factor mentions with a factor dimension
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+
+def dimension_values(indexes: "DatasetIndexes", dimension: str) -> list:
+    """Values of a pivot dimension, indexed by code."""
+    if dimension == "factor":
+        return list(indexes.factors.vocabulary)
+    return indexes.bitmaps.values(dimension)
+
+
+def compute_pivot(indexes: "DatasetIndexes", mask: np.ndarray, dimensions: tuple[str, ...]) -> PivotCube:
+    """
+    Count the selected rows per combination of dimension values.
+
+    Args:
+        indexes: Indexes of the snapshot being served
+        mask: Boolean row mask of the selection
+        dimensions: Distinct names from PIVOT_DIMENSIONS
+
+    Returns:
+        The non-empty cells, ordered by the dimensions' display orders
+    """
+    if "factor" in dimensions:
+        # One unit per factor mention
+        selected = mask[indexes.factors.mention_rows]
+        rows = indexes.factors.mention_rows[selected]
+        factor_codes = indexes.factors.codes[selected]
+    else:
+        rows = np.flatnonzero(mask)
+
+    values, codes = [], []
+    for dimension in dimensions:
+        values.append(dimension_values(indexes, dimension))
+        if dimension == "factor":
+            codes.append(factor_codes)
+        else:
+            codes.append(indexes.bitmaps.row_codes[dimension][rows])
+    known = np.logical_and.reduce([c >= 0 for c in codes])
+    shape = tuple(max(len(v), 1) for v in values)
+    keys = np.ravel_multi_index(tuple(c[known] for c in codes), shape)
+
+    n_cells = int(np.prod(shape))
+    if n_cells <= MAX_DENSE_CELLS:
+        dense = np.bincount(keys, minlength=n_cells)
+        cell_keys = np.flatnonzero(dense)
+        counts = dense[cell_keys]
+    else:
+        cell_keys, counts = np.unique(keys, return_counts=True)
+    cells = np.stack(np.unravel_index(cell_keys, shape), axis=1) if len(cell_keys) else np.zeros((0, len(shape)), dtype=np.int64)
+    return ordered_cube(dimensions, values, cells, counts)
+
+
+def ordered_cube(dimensions: tuple[str, ...], values: list[list], cells: np.ndarray, counts: np.ndarray) -> PivotCube:
+    """
+    Pivot cube of non-empty cells given as value codes per dimension,
+    with the values and cells in display order.
+    """
+    # Years in order, other values by how often they occur in the pivot
+    present_values, ranks = [], []
+    for axis, (dimension, dimension_values) in enumerate(zip(dimensions, values)):
+        totals = np.bincount(cells[:, axis], weights=counts, minlength=len(dimension_values))
+        present = np.flatnonzero(totals)
+        if dimension == "year":
+            order = sorted(present, key=lambda code: dimension_values[code])
+        else:
+            order = sorted(present, key=lambda code: (-totals[code], str(dimension_values[code])))
+        rank = np.full(len(dimension_values), -1, dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        present_values.append([dimension_values[code] for code in order])
+        ranks.append(rank[cells[:, axis]])
+
+    # Cells in row-major display order
+    order = np.lexsort(ranks[::-1])
+    return PivotCube(
+        dimensions=tuple(dimensions),
+        values=tuple(present_values),
+        cells=np.stack(ranks, axis=1)[order],
+        counts=counts[order],
+    )
+
+
+@lru_cache()
+def get_pivot_cache() -> ResponseCache:
+    """Get the process-wide pivot cube cache."""
+    return ResponseCache(get_settings().PIVOT_CACHE_SIZE)
+
+
+register_structure("pivot_cache", "cache", lambda: get_pivot_cache()._entries)
+
+
+def get_pivot(snapshot: "DatasetSnapshot", filters: IncidentFilter, dimensions: tuple[str, ...]) -> PivotCube:
+    """Pivot of a snapshot from the configured query engine, served from the pivot cache when possible."""
+    filters = filters.normalized()
+    cache = get_pivot_cache()
+    key = repr((filters, dimensions))
+    cube = cache.get(snapshot.version, key)
+    record_cache("pivot", hit=cube is not None)
+    if cube is None:
+        from services.query_engine import get_query_engine
+        cube = get_query_engine().pivot(snapshot, filters.select(snapshot).mask, dimensions)
+        cache.put(snapshot.version, key, cube)
+    return cube
+
+
+def cell_shares(cube: PivotCube, n_rows: int, measure: str) -> np.ndarray:
+    """
+    Percent of each cell's count in its group: all cells ("total_share"),
+    cells sharing the first ``n_rows`` dimension values ("row_share") or
+    the remaining ones ("column_share").
+    """
+    if measure == "total_share":
+        groups = np.zeros(len(cube.counts), dtype=np.int64)
+    else:
+        axes = cube.cells[:, :n_rows] if measure == "row_share" else cube.cells[:, n_rows:]
+        if axes.shape[1] == 0:
+            groups = np.zeros(len(cube.counts), dtype=np.int64)
+        else:
+            _, groups = np.unique(axes, axis=0, return_inverse=True)
+            groups = groups.reshape(-1)
+    totals = np.bincount(groups, weights=cube.counts)
+    return cube.counts / np.maximum(totals[groups], 1) * 100
+
+
+def cell_labels(cube: PivotCube, cell: int, axes: range) -> list[Hashable]:
+    """Values of one cell along the given dimension axes."""
+    return [cube.values[axis][cube.cells[cell, axis]] for axis in axes]
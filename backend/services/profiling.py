@@ -0,0 +1,256 @@
+"""
+On-demand profiling and slow-request logging.
+
+A request is profiled with cProfile when it carries ``X-Profile: 1`` together
+with a valid ``X-Admin-Token``, or when it is picked by PROFILE_SAMPLE_RATE.
+Captured profiles are kept in a bounded in-memory store and retrieved through
+the /admin/profiles endpoints; the response carries an ``X-Profile-Id`` header.
+Work the request hands to worker threads is profiled in those threads and
+merged into its profile (see profile_thread).
+
+Requests slower than SLOW_REQUEST_THRESHOLD_MS are recorded, with their
+normalized parameters, stage breakdown and dataset version, in a bounded
+slow-request log (/admin/slow-requests) and logged as warnings.
+"""
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import get_settings
+from services.instrumentation import current_timings, route_label
+from services.introspection import register_structure
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+# Paths never profiled or logged as slow (admin and scrape endpoints)
+_EXCLUDED_PREFIXES = ("/admin", "/metrics")
+
+# Only one request per process is profiled at a time
+_profiler_lock = threading.Lock()
+
+# Profilers of worker threads that ran on behalf of the request being profiled
+_thread_profilers: ContextVar[Optional[list]] = ContextVar("thread_profilers", default=None)
+
+
+class ProfileStore:
+    """Bounded store of captured profiles, oldest evicted first."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._profiles: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self._profiles[record["id"]] = record
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            records = list(self._profiles.values())
+        return [
+            {k: v for k, v in r.items() if k != "stats"}
+            for r in reversed(records)
+        ]
+
+
+def render_profile(record: dict, sort: str = "cumulative", limit: int = 50) -> str:
+    """Render a captured profile as pstats text output."""
+    out = io.StringIO()
+    stats = pstats.Stats(*record["stats"], stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+@lru_cache()
+def get_profile_store() -> ProfileStore:
+    """Get the process-wide profile store."""
+    return ProfileStore(get_settings().PROFILE_STORE_SIZE)
+
+
+@lru_cache()
+def get_slow_request_log() -> deque:
+    """Get the process-wide slow-request log (most recent entries last)."""
+    return deque(maxlen=get_settings().SLOW_REQUEST_LOG_SIZE)
+
+
+register_structure("profile_store", "cache", lambda: get_profile_store()._profiles)
+register_structure("slow_request_log", "cache", lambda: get_slow_request_log())
+
+
+def normalize_params(scope: dict) -> dict:
+    """Query and path parameters with sorted keys and multi-values grouped."""
+    params: dict[str, list[str]] = {}
+    for key, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True):
+        params.setdefault(key, []).append(value)
+    normalized = {k: v[0] if len(v) == 1 else sorted(v) for k, v in sorted(params.items())}
+    for key, value in sorted((scope.get("path_params") or {}).items()):
+        normalized[key] = str(value)
+    return normalized
+
+
+def profile_thread(fn):
+    """
+    Wrap a function that runs in a worker thread (asyncio.to_thread or the
+    thread pool serving plain-function handlers) so that, when the request
+    it runs for is being profiled, the thread's work is profiled too and
+    merged into the request's profile. Both copy the request's context
+    into the thread, which is how the wrapper finds the request.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profilers = _thread_profilers.get()
+        if profilers is None:
+            return fn(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles through sys.monitoring: the request's
+            # profiler already observes every thread and is the only one allowed
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profilers.append(profiler)
+    
+    return wrapper
+
+
+def _should_profile(headers: Headers) -> bool:
+    """Explicit admin request via header, otherwise random sampling."""
+    settings = get_settings()
+    if headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        if settings.is_admin(headers.get(ADMIN_TOKEN_HEADER)):
+            return True
+        logger.warning("Ignoring X-Profile header without a valid admin token")
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that captures cProfile profiles on demand and records
+    slow requests. Must run inside InstrumentationMiddleware so the stage
+    breakdown of the request is available.
+
+    The profiler observes the whole event-loop thread while the request is
+    in flight, so concurrent requests on the same worker show up in it too.
+    Work the request hands to worker threads through profile_thread
+    (SingleFlight computations and plain-function handlers) is profiled in
+    those threads and merged into the stored profile. Native threads, such
+    as DuckDB's, are not visible to cProfile; their time shows up in the
+    calling function and in the stage spans.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(_EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = None
+        profile_id = None
+        thread_profilers: list[cProfile.Profile] = []
+        token = None
+        if _should_profile(Headers(scope=scope)) and _profiler_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+            profile_id = uuid.uuid4().hex[:12]
+            token = _thread_profilers.set(thread_profilers)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile_id:
+                    MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    _thread_profilers.reset(token)
+                    _profiler_lock.release()
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if profiler is not None:
+                self._store_profile(profile_id, [profiler, *thread_profilers], scope, status_code, duration_ms)
+            if duration_ms >= get_settings().SLOW_REQUEST_THRESHOLD_MS:
+                self._record_slow(scope, status_code, duration_ms)
+
+    @staticmethod
+    def _store_profile(profile_id, profilers, scope, status_code, duration_ms) -> None:
+        from services.data_loader import get_dataset_version
+        
+        for profiler in profilers:
+            profiler.create_stats()
+        get_profile_store().add({
+            "id": profile_id,
+            "captured_at": datetime.now().isoformat(),
+            "method": scope["method"],
+            "route": route_label(scope),
+            "path": scope["path"],
+            "params": normalize_params(scope),
+            "status": status_code,
+            "duration_ms": round(duration_ms, 1),
+            "dataset_version": get_dataset_version(),
+            "stats": profilers,
+        })
+        logger.info(f"Captured profile {profile_id} for {scope['method']} {scope['path']}")
+
+    @staticmethod
+    def _record_slow(scope, status_code, duration_ms) -> None:
+        from services.data_loader import get_dataset_version
+        
+        timings = current_timings()
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "method": scope["method"],
+            "route": route_label(scope),
+            "params": normalize_params(scope),
+            "status": status_code,
+            "duration_ms": round(duration_ms, 1),
+            "stages_ms": {
+                name: round(seconds * 1000, 1)
+                for name, seconds in (timings.stages.items() if timings else [])
+            },
+            "dataset_version": get_dataset_version(),
+        }
+        get_slow_request_log().append(entry)
+        logger.warning(
+            f"Slow request {entry['method']} {entry['route']} {entry['duration_ms']}ms "
+            f"params={entry['params']} stages={entry['stages_ms']} "
+            f"dataset={entry['dataset_version']}"
+        )
@@ -0,0 +1,276 @@
+"""
+Query engines for the aggregation endpoints.
+
+Timeline, factor, trend and pivot handlers resolve their filters to a row
+mask (IncidentFilter.select, shared through the selection cache) and hand
+the aggregation over that mask to the engine selected by the QUERY_ENGINE
+setting:
+
+- "pandas" counts on the index arrays built from the pandas snapshot
+  (bincounts over per-row codes and the CSR factor index), in the request
+  thread.
+- "duckdb" runs the same group-bys as SQL in an embedded DuckDB. The index
+  arrays are registered as DuckDB views over pandas frames, so nothing is
+  copied into the database, and DuckDB scans them with its own thread
+  pool. duckdb is an optional dependency; without it the pandas engine is
+  used. On the bundled extracts it is 30-40x slower than the pandas engine,
+  because its per-query overhead dominates at this size. Do not switch to
+  it expecting a speed-up.
+
+Both engines return the same structures with the same counts, so the
+setting can be switched without touching the routers. Unfiltered views
+keep reading the precomputed year and month cubes and never reach the
+engine.
+"""
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import get_settings
+from services.indexes import YearFactorCube
+from services.pivot import PivotCube, compute_pivot, dimension_values, ordered_cube
+
+if TYPE_CHECKING:
+    from services.data_loader import DatasetSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEngine(ABC):
+    """
+    Aggregations over the rows of a snapshot selected by a boolean mask.
+    Calls block until the result is ready; call them from worker threads,
+    not from the event loop.
+    """
+    name: str
+
+    @abstractmethod
+    def factor_totals(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        """Factor mention counts (indexed by factor code)."""
+
+    @abstractmethod
+    def year_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct known years with row counts."""
+
+    @abstractmethod
+    def month_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        """Rows per month cube slot (see DatasetIndexes.month_span)."""
+
+    @abstractmethod
+    def year_cube(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> YearFactorCube:
+        """Year cube with the same year slots as the snapshot's ``cube``."""
+
+    @abstractmethod
+    def pivot(self, snapshot: "DatasetSnapshot", mask: np.ndarray, dimensions: tuple[str, ...]) -> PivotCube:
+        """Non-empty cells of a pivot over PIVOT_DIMENSIONS."""
+
+    def release(self, snapshot: "DatasetSnapshot") -> None:
+        """Drop state kept for snapshots other than the newly published one."""
+
+
+class PandasEngine(QueryEngine):
+    """Bincounts over the snapshot's index arrays."""
+    name = "pandas"
+
+    def factor_totals(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        return snapshot.indexes.factor_totals_of(mask)
+
+    def year_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        return snapshot.indexes.year_counts_of(mask)
+
+    def month_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        return snapshot.indexes.month_counts_of(mask)
+
+    def year_cube(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> YearFactorCube:
+        return snapshot.indexes.cube_of(mask)
+
+    def pivot(self, snapshot: "DatasetSnapshot", mask: np.ndarray, dimensions: tuple[str, ...]) -> PivotCube:
+        return compute_pivot(snapshot.indexes, mask, dimensions)
+
+
+class DuckDBEngine(QueryEngine):
+    """
+    SQL group-bys in an embedded DuckDB over two views of the index arrays:
+    ``reports`` (row_id, year_slot, month_slot and the code column of every
+    single-valued dimension) and ``mentions`` (row_id, factor), one row per
+    factor mention. A selection is registered per query as ``selected``
+    (row_id) and applied with a semi join.
+
+    Registered views are private to a connection, and a connection must not
+    be used by two threads at once, so each query borrows a connection from
+    a shared pool and returns it afterwards. Connections keep the registered
+    index arrays alive, so the pool only holds connections over the published
+    snapshot: publishing a new one (release) closes the idle connections, and
+    connections over older snapshots are closed when their query ends.
+    The pool is keyed by the snapshot's index arrays rather than its
+    version, since a reload of unchanged files keeps the version but builds
+    new arrays.
+    """
+    name = "duckdb"
+
+    def __init__(self, duckdb_module):
+        self._duckdb = duckdb_module
+        self._lock = threading.Lock()
+        # Idle connections over the published snapshot's index arrays
+        self._indexes = None
+        self._idle: list = []
+
+    def _connect(self, snapshot: "DatasetSnapshot"):
+        indexes = snapshot.indexes
+        connection = self._duckdb.connect()
+        reports = {
+            "row_id": np.arange(indexes.n_rows),
+            "year_slot": indexes.year_slots,
+            "month_slot": indexes.month_slots,
+            **indexes.bitmaps.row_codes,
+        }
+        connection.register("reports", pd.DataFrame(reports, copy=False))
+        connection.register("mentions", pd.DataFrame(
+            {"row_id": indexes.factors.mention_rows, "factor": indexes.factors.codes}, copy=False,
+        ))
+        return connection
+
+    @contextmanager
+    def _connection(self, snapshot: "DatasetSnapshot"):
+        with self._lock:
+            if self._indexes is None:
+                # Nothing published through release yet (engine used directly)
+                self._indexes = snapshot.indexes
+            published = snapshot.indexes is self._indexes
+            connection = self._idle.pop() if published and self._idle else None
+        if connection is None:
+            connection = self._connect(snapshot)
+        try:
+            yield connection
+        finally:
+            with self._lock:
+                keep = snapshot.indexes is self._indexes
+                if keep:
+                    self._idle.append(connection)
+            if not keep:
+                connection.close()
+
+    def release(self, snapshot: "DatasetSnapshot") -> None:
+        with self._lock:
+            self._indexes = snapshot.indexes
+            stale, self._idle = self._idle, []
+        for connection in stale:
+            connection.close()
+        if stale:
+            logger.info(f"Closed {len(stale)} DuckDB connections of a replaced snapshot")
+
+    def _query(self, snapshot: "DatasetSnapshot", mask: np.ndarray, sql: str) -> dict[str, np.ndarray]:
+        """
+        Run a query whose ``{selected}`` placeholder follows the alias of a
+        table with a row_id column; returns the result columns.
+        """
+        with self._connection(snapshot) as connection:
+            if mask.all():
+                return connection.execute(sql.format(selected="")).fetchnumpy()
+            connection.register("selected", pd.DataFrame({"row_id": np.flatnonzero(mask)}))
+            try:
+                return connection.execute(sql.format(selected="SEMI JOIN selected USING (row_id)")).fetchnumpy()
+            finally:
+                connection.unregister("selected")
+
+    @staticmethod
+    def _dense(keys: np.ndarray, counts: np.ndarray, size: int) -> np.ndarray:
+        dense = np.zeros(size, dtype=np.int64)
+        dense[np.asarray(keys, dtype=np.int64)] = counts
+        return dense
+
+    def factor_totals(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        result = self._query(
+            snapshot, mask,
+            "SELECT factor, count(*) AS n FROM mentions {selected} GROUP BY factor",
+        )
+        return self._dense(result["factor"], result["n"], snapshot.indexes.factors.n_factors)
+
+    def year_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        years = snapshot.indexes.cube.years
+        result = self._query(
+            snapshot, mask,
+            f"SELECT year_slot, count(*) AS n FROM reports {{selected}} "
+            f"WHERE year_slot < {len(years)} GROUP BY year_slot ORDER BY year_slot",
+        )
+        return years[np.asarray(result["year_slot"], dtype=np.int64)], np.asarray(result["n"], dtype=np.int64)
+
+    def month_counts(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> np.ndarray:
+        result = self._query(
+            snapshot, mask,
+            "SELECT month_slot, count(*) AS n FROM reports {selected} WHERE month_slot >= 0 GROUP BY month_slot",
+        )
+        return self._dense(result["month_slot"], result["n"], snapshot.indexes.month_span[1])
+
+    def year_cube(self, snapshot: "DatasetSnapshot", mask: np.ndarray) -> YearFactorCube:
+        indexes = snapshot.indexes
+        n_slots = len(indexes.cube.years) + 1
+        n_factors = indexes.factors.n_factors
+        incidents = self._query(
+            snapshot, mask,
+            "SELECT year_slot, count(*) AS n FROM reports {selected} GROUP BY year_slot",
+        )
+        mentions = self._query(
+            snapshot, mask,
+            "SELECT r.year_slot, m.factor, count(*) AS n FROM mentions m {selected} "
+            "JOIN reports r USING (row_id) GROUP BY r.year_slot, m.factor",
+        )
+        keys = np.asarray(mentions["year_slot"], dtype=np.int64) * n_factors + mentions["factor"]
+        return YearFactorCube(
+            years=indexes.cube.years,
+            incidents=self._dense(incidents["year_slot"], incidents["n"], n_slots),
+            factor_counts=self._dense(keys, mentions["n"], n_slots * n_factors).reshape(n_slots, n_factors),
+        )
+
+    def pivot(self, snapshot: "DatasetSnapshot", mask: np.ndarray, dimensions: tuple[str, ...]) -> PivotCube:
+        columns = [f'r."{d}"' if d != "factor" else "m.factor" for d in dimensions]
+        known = " AND ".join(f"{c} >= 0" for c, d in zip(columns, dimensions) if d != "factor") or "TRUE"
+        if "factor" in dimensions:
+            # One unit per factor mention
+            source = "mentions m {selected} JOIN reports r USING (row_id)"
+        else:
+            source = "reports r {selected}"
+        names = [f"d{axis}" for axis in range(len(dimensions))]
+        selection = ", ".join(f"{c} AS {name}" for c, name in zip(columns, names))
+        result = self._query(
+            snapshot, mask,
+            f"SELECT {selection}, count(*) AS n FROM {source} WHERE {known} GROUP BY ALL",
+        )
+        cells = np.stack([np.asarray(result[name], dtype=np.int64) for name in names], axis=1)
+        values = [dimension_values(snapshot.indexes, d) for d in dimensions]
+        return ordered_cube(dimensions, values, cells, np.asarray(result["n"], dtype=np.int64))
+
+
+def _duckdb_engine() -> Optional[DuckDBEngine]:
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return DuckDBEngine(duckdb)
+
+
+# QUERY_ENGINE value -> factory (None when the engine's package is missing)
+ENGINES = {
+    "pandas": PandasEngine,
+    "duckdb": _duckdb_engine,
+}
+
+
+@lru_cache()
+def get_query_engine() -> QueryEngine:
+    """Get the engine named by QUERY_ENGINE, falling back to pandas when it is unavailable."""
+    name = get_settings().QUERY_ENGINE.lower()
+    factory = ENGINES.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown QUERY_ENGINE {name!r}; choose from {', '.join(ENGINES)}")
+    engine = factory()
+    if engine is None:
+        logger.warning(f"QUERY_ENGINE={name} is not installed; using the pandas engine")
+        engine = PandasEngine()
+    return engine
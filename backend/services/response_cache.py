@@ -0,0 +1,159 @@
+"""
+Cache of rendered responses for the default dashboard views.
+
+GET responses of CACHEABLE_PATHS are stored by path and normalized query
+string for the current dataset version; publishing a new snapshot makes
+earlier entries unreachable. The warm-up pipeline fills the cache with the
+default-filter views so the first users after a deploy are served from
+memory.
+"""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from config import get_settings
+from services.instrumentation import record_cache
+from services.introspection import register_structure
+
+# Landing and trend views whose responses depend only on the dataset and
+# their query parameters (the summaries carry a render timestamp, so they
+# are not cached)
+CACHEABLE_PATHS = frozenset({
+    "/api/filters/options",
+    "/api/incidents/timeline",
+    "/api/incidents/factors",
+    "/api/incidents/map",
+    "/api/incidents/factor-cooccurrence",
+    "/api/trends/kpis",
+    "/api/trends/comparison",
+    "/api/trends/sweep",
+    "/api/trends/cohorts",
+    "/api/airports/hotspots",
+    "/api/pivot",
+})
+
+
+class ResponseCache:
+    """
+    Bounded LRU of entries belonging to one dataset version: rendered
+    responses here, computed payloads for other per-version caches.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.version: Optional[str] = None
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: str, key: str) -> Optional[Any]:
+        with self._lock:
+            if version != self.version:
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, version: str, key: str, entry: Any) -> None:
+        from services.data_loader import get_dataset_version
+        
+        # A snapshot published while the response was rendered wins
+        if version != get_dataset_version():
+            return
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    return ResponseCache(get_settings().RESPONSE_CACHE_SIZE)
+
+
+register_structure("response_cache", "cache", lambda: get_response_cache()._entries)
+
+
+def cache_key(scope: dict) -> str:
+    """
+    Path plus query string with parameters sorted by name. Repeated
+    parameters keep their order, which is significant for some views
+    (pivot rows and columns).
+    """
+    params = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    query = urlencode(sorted(params, key=lambda param: param[0]))
+    return f"{scope['path']}?{query}" if query else scope["path"]
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving CACHEABLE_PATHS from the response cache and
+    storing successful responses on a miss. Runs inside CORS, so stored
+    responses carry no CORS headers and each hit gets those of its own
+    request, and outside admission control, so hits never queue. Cached
+    responses are still timed and counted by the outer middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in CACHEABLE_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        # Imported here so the middleware does not pull in pandas at startup
+        from services.data_loader import get_dataset_version, get_snapshot
+        
+        if get_settings().is_production:
+            version = get_dataset_version()
+        else:
+            # Development reloads when source files change; check before serving
+            version = get_snapshot().version
+        if version is None:
+            # Nothing loaded yet; the first request loads the dataset
+            await self.app(scope, receive, send)
+            return
+
+        cache = get_response_cache()
+        key = cache_key(scope)
+        entry = cache.get(version, key)
+        record_cache("response", hit=entry is not None)
+        if entry is not None:
+            status, headers, body = entry
+            await send({"type": "http.response.start", "status": status, "headers": list(headers)})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        status = None
+        headers = []
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                # Copy before outer middleware appends its own headers
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        if status == 200:
+            cache.put(version, key, (status, headers, b"".join(chunks)))
@@ -0,0 +1,54 @@
+"""
+Request coalescing for expensive computations.
+
+When a popular view expires or a new dataset version is published, many
+browsers ask for the same thing at once. A SingleFlight group runs one
+computation per key in a worker thread; requests arriving while it runs
+await the same result instead of recomputing it, and the event loop stays
+free for cheap requests meanwhile.
+
+Keys must identify the result completely, including the dataset version,
+so a result is never shared across snapshots. Coalescing is per process.
+Dataset loads are coalesced separately by the loader's lock: requests that
+waited for a load reuse the snapshot it published.
+"""
+import asyncio
+from typing import Any, Callable, Hashable
+
+from services.instrumentation import record_flight
+from services.profiling import profile_thread
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with equal keys into one computation."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Return fn(*args), computed in a worker thread unless a call with the
+        same key is already in flight, in which case its result (or
+        exception) is shared.
+        """
+        call = self._calls.get(key)
+        record_flight(self.name, joined=call is not None)
+        if call is not None:
+            return await asyncio.shield(call)
+
+        call = asyncio.ensure_future(asyncio.to_thread(profile_thread(fn), *args))
+        self._calls[key] = call
+        call.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so a disconnecting first caller does not cancel the others
+        return await asyncio.shield(call)
+
+    def _forget(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Mark the exception retrieved when every caller went away
+            call.exception()
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,29 @@
+"""
+Vectorized normal-distribution tails for the significance tests (trend
+shift z-tests, airport hotspot rate-ratio tests), without scipy.
+"""
+import numpy as np
+
+# Chebyshev fit of erfc (Numerical Recipes, erfcc): fractional error below
+# 1.2e-7 for every x, far finer than the 3 significant digits p-values show
+_ERFC_COEFFICIENTS = (
+    -1.26551223, 1.00002368, 0.37409196, 0.09678418, -0.18628806,
+    0.27886807, -1.13520398, 1.48851587, -0.82215223, 0.17087277,
+)
+
+
+def erfc(x: np.ndarray) -> np.ndarray:
+    """Element-wise complementary error function."""
+    x = np.asarray(x, dtype=float)
+    t = 1.0 / (1.0 + 0.5 * np.abs(x))
+    poly = np.zeros_like(t)
+    for coefficient in reversed(_ERFC_COEFFICIENTS):
+        poly = poly * t + coefficient
+    # The fit overshoots erfc(0) = 1 by 4e-8; capping keeps p-values <= 1
+    tail = np.minimum(t * np.exp(-x * x + poly), 1.0)
+    return np.where(x >= 0, tail, 2.0 - tail)
+
+
+def normal_sf(z: np.ndarray) -> np.ndarray:
+    """Upper-tail probability P(Z > z) of the standard normal distribution."""
+    return erfc(np.asarray(z, dtype=float) / np.sqrt(2.0)) / 2
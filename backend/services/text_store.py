@@ -0,0 +1,304 @@
+"""
+Out-of-core storage for the free-text columns (narrative, synopsis).
+
+Report text dominates the dataset's memory but is only read by the detail,
+topic-narrative and similarity paths. It is kept out of the shared frame:
+each column is written once as a concatenated UTF-8 blob plus an offsets
+array and memory-mapped read-only, so pages are loaded on demand and shared
+by all workers on the host through the page cache. A copy of the blob with
+ASCII letters lowercased is written next to it, so keyword scans
+(TextStore.contains) search the mapped bytes and only matching rows are
+ever decoded.
+
+A store is a sequence of segments covering consecutive row ranges. A full
+load writes one segment; ingestion appends a segment holding only the new
+rows. Segment files are named after the dataset version that wrote them and
+their first row, so workers loading the same source files reuse each
+other's files.
+"""
+import logging
+import mmap
+import os
+import tempfile
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns moved out of the dataset frame
+TEXT_COLUMNS = ("narrative", "synopsis")
+
+# Segment files written by this process; only these are ever pruned, since
+# other workers (and their in-flight builds) share the directory
+_written_files: set[Path] = set()
+
+
+@dataclass(frozen=True)
+class _ColumnSegment:
+    """One column of one segment: UTF-8 blob, row offsets and null flags."""
+    blob: np.ndarray      # uint8, memory-mapped
+    lower: bytes          # blob with ASCII letters lowercased, memory-mapped (mmap)
+    offsets: np.ndarray   # int64, n_rows + 1, memory-mapped
+    nulls: np.ndarray     # bool, n_rows, memory-mapped
+
+    def get(self, local_row: int) -> Optional[str]:
+        if self.nulls[local_row]:
+            return None
+        start, end = self.offsets[local_row], self.offsets[local_row + 1]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def contains(self, needle: bytes) -> np.ndarray:
+        """Rows whose lowercased text contains needle."""
+        if not needle:
+            return ~np.asarray(self.nulls)
+        find = self.lower.find
+        hits = []
+        pos = find(needle)
+        while pos != -1:
+            hits.append(pos)
+            pos = find(needle, pos + 1)
+        found = np.zeros(len(self.nulls), dtype=bool)
+        if hits:
+            starts = np.asarray(hits, dtype=np.int64)
+            rows = np.searchsorted(self.offsets, starts, side="right") - 1
+            # Rows are concatenated, so a hit may run into the next row
+            inside = starts + len(needle) <= self.offsets[rows + 1]
+            found[rows[inside]] = True
+        return found
+
+
+@dataclass(frozen=True)
+class _Segment:
+    segment_id: str
+    start: int
+    n_rows: int
+    columns: dict[str, _ColumnSegment]
+
+
+class TextStore:
+    """Read-only, memory-mapped text columns addressed by dataset row position."""
+
+    def __init__(self, directory: Path, columns: tuple[str, ...], segments: tuple[_Segment, ...] = ()):
+        self.directory = directory
+        self.columns = columns
+        self.segments = segments
+        self._starts = [segment.start for segment in segments]
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, directory: Path, segment_id: str) -> "TextStore":
+        """
+        Write the TEXT_COLUMNS present in df as the first segment of a store.
+
+        Args:
+            df: Frame whose positional rows the store will be addressed by
+            directory: Where segment files are written
+            segment_id: Name of the segment files (the dataset version)
+
+        Returns:
+            A store over the memory-mapped files
+        """
+        columns = tuple(c for c in TEXT_COLUMNS if c in df.columns)
+        store = cls(directory, columns)
+        return store.extend(df, segment_id)
+
+    def extend(self, df: pd.DataFrame, segment_id: str) -> "TextStore":
+        """Return a new store with df's rows appended as one more segment."""
+        if len(df) == 0:
+            return self
+        segment = _write_segment(self.directory, segment_id, len(self), df, self.columns)
+        return TextStore(self.directory, self.columns, self.segments + (segment,))
+
+    def __len__(self) -> int:
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        return last.start + last.n_rows
+
+    def get(self, column: str, row: int) -> Optional[str]:
+        """Text of one row (None if missing)."""
+        if column not in self.columns or not 0 <= row < len(self):
+            return None
+        segment = self.segments[bisect_right(self._starts, row) - 1]
+        return segment.columns[column].get(row - segment.start)
+
+    def contains(self, column: str, term: str) -> np.ndarray:
+        """
+        Which rows contain term, ignoring case.
+
+        Scans the lowercased copy of the mapped blob without decoding it.
+        Case folding covers ASCII letters only, which is exact for ASCII
+        terms.
+
+        Args:
+            column: Text column to search
+            term: Text to look for
+
+        Returns:
+            Boolean array over row positions (False for missing text)
+        """
+        if column not in self.columns or not self.segments:
+            return np.zeros(len(self), dtype=bool)
+        needle = term.lower().encode("utf-8")
+        return np.concatenate([segment.columns[column].contains(needle) for segment in self.segments])
+
+    def series(self, column: str) -> pd.Series:
+        """
+        The whole column decoded into a Series indexed by row position.
+        Builds a Python string per row; use contains() to search text.
+        """
+        values: list[Optional[str]] = []
+        for segment in self.segments:
+            part = segment.columns[column]
+            blob = part.blob.tobytes()
+            offsets = part.offsets.tolist()
+            nulls = part.nulls.tolist()
+            values.extend(
+                None if nulls[i] else blob[offsets[i]:offsets[i + 1]].decode("utf-8")
+                for i in range(segment.n_rows)
+            )
+        return pd.Series(values, dtype=object)
+
+    def files(self) -> list[Path]:
+        """Files backing this store."""
+        return [
+            path
+            for segment in self.segments
+            for column in self.columns
+            for path in _segment_paths(self.directory, segment.segment_id, segment.start, column)
+        ]
+
+    def nbytes(self) -> int:
+        """Size of the mapped text on disk."""
+        return sum(
+            part.blob.nbytes + part.offsets.nbytes + part.nulls.nbytes
+            for segment in self.segments
+            for part in segment.columns.values()
+        )
+
+
+def _segment_paths(directory: Path, segment_id: str, start: int, column: str) -> tuple[Path, Path, Path, Path]:
+    stem = directory / f"{segment_id}.{start}.{column}"
+    return (
+        stem.with_name(stem.name + ".blob"),
+        stem.with_name(stem.name + ".lower.blob"),
+        stem.with_name(stem.name + ".offsets.npy"),
+        stem.with_name(stem.name + ".nulls.npy"),
+    )
+
+
+def _encode(values: pd.Series) -> tuple[bytes, np.ndarray, np.ndarray]:
+    """Concatenate values as UTF-8 and return blob, offsets and null flags."""
+    nulls = values.isna().to_numpy(dtype=bool)
+    encoded = [b"" if null else str(v).encode("utf-8") for v, null in zip(values.tolist(), nulls)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets, nulls
+
+
+def _atomic_write(path: Path, write) -> None:
+    """Write to a temporary file next to path, then rename it into place."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _map_blob(path: Path, size: int) -> np.ndarray:
+    # Zero-length files cannot be memory-mapped
+    if size == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+def _map_bytes(path: Path, size: int) -> bytes:
+    """Map a file as a read-only, bytes-like mmap (supports find without copying)."""
+    if size == 0:
+        return b""
+    with open(path, "rb") as f:
+        # The mapping stays valid after the file is closed
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _open_column(
+    directory: Path,
+    segment_id: str,
+    start: int,
+    column: str,
+    n_rows: int,
+) -> Optional[_ColumnSegment]:
+    """Map an existing column segment, or None if its files are missing or incomplete."""
+    blob_path, lower_path, offsets_path, nulls_path = _segment_paths(directory, segment_id, start, column)
+    try:
+        offsets = np.load(offsets_path, mmap_mode="r")
+        nulls = np.load(nulls_path, mmap_mode="r")
+        size = blob_path.stat().st_size
+        lower_size = lower_path.stat().st_size
+    except (OSError, ValueError):
+        return None
+    if len(offsets) != n_rows + 1 or len(nulls) != n_rows or int(offsets[-1]) != size or lower_size != size:
+        return None
+    return _ColumnSegment(
+        blob=_map_blob(blob_path, size),
+        lower=_map_bytes(lower_path, size),
+        offsets=offsets,
+        nulls=nulls,
+    )
+
+
+def _write_segment(
+    directory: Path,
+    segment_id: str,
+    start: int,
+    df: pd.DataFrame,
+    columns: tuple[str, ...],
+) -> _Segment:
+    """Write (or reuse) the files of one segment and map them."""
+    # Owner-only: other users on the host must not plant segment files
+    directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+    parts = {}
+    for column in columns:
+        part = _open_column(directory, segment_id, start, column, len(df))
+        if part is None:
+            blob, offsets, nulls = _encode(df[column] if column in df.columns else pd.Series(None, index=df.index))
+            blob_path, lower_path, offsets_path, nulls_path = _segment_paths(directory, segment_id, start, column)
+            # Blob last: a complete blob marks the segment as complete.
+            # bytes.lower() only changes ASCII letters, so offsets hold for both blobs
+            _atomic_write(offsets_path, lambda f: np.save(f, offsets))
+            _atomic_write(nulls_path, lambda f: np.save(f, nulls))
+            _atomic_write(lower_path, lambda f: f.write(blob.lower()))
+            _atomic_write(blob_path, lambda f: f.write(blob))
+            _written_files.update((offsets_path, nulls_path, lower_path, blob_path))
+            part = _open_column(directory, segment_id, start, column, len(df))
+            if part is None:
+                raise OSError(f"Text segment {segment_id}.{start}.{column} in {directory} is unreadable right after writing it")
+            logger.info(f"Wrote text segment {segment_id}.{column}: {len(df)} rows, {len(blob)} bytes")
+        parts[column] = part
+    return _Segment(segment_id=segment_id, start=start, n_rows=len(df), columns=parts)
+
+
+def prune_segments(directory: Path, keep: TextStore) -> None:
+    """
+    Delete segment files this process wrote in ``directory`` that ``keep``
+    no longer uses. Files written by other workers are left alone, even if
+    this process reused them. Snapshots still holding an older store keep
+    reading their mapping after the file is unlinked; where the platform
+    refuses to delete a mapped file it is left for a later prune.
+    """
+    in_use = set(keep.files())
+    for path in sorted(_written_files):
+        if path.parent != directory or path in in_use:
+            continue
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            continue
+        _written_files.discard(path)
@@ -0,0 +1,118 @@
+"""
+Calendar buckets and smoothing for the incident timeline.
+
+Monthly counts come from the month cubes of the dataset indexes (see
+DatasetIndexes.month_cube); quarters and years are reshaped sums of whole
+months, so every granularity costs one pass over a few hundred buckets.
+Rolling means and the classical additive seasonal decomposition are
+computed on the bucket series with convolutions and bincounts.
+"""
+from typing import Optional
+
+import numpy as np
+
+# Granularity -> months per bucket
+BUCKET_MONTHS = {"year": 12, "quarter": 3, "month": 1}
+
+# Granularity -> buckets per seasonal cycle
+SEASONAL_PERIODS = {"quarter": 4, "month": 12}
+
+
+def bucket_counts(
+    first_month: int,
+    counts: np.ndarray,
+    granularity: str,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum monthly counts into calendar buckets within a year range.
+
+    Args:
+        first_month: Month ordinal (year * 12 + month - 1) of ``counts[0]``
+        counts: Dense counts per month
+        granularity: "year", "quarter" or "month"
+        start_year: First year to include
+        end_year: Last year to include
+
+    Returns:
+        Bucket ordinals (first month ordinal // months per bucket) and
+        counts, dense from the first to the last non-empty bucket
+    """
+    width = BUCKET_MONTHS[granularity]
+    months = first_month + np.arange(len(counts))
+    inside = np.ones(len(counts), dtype=bool)
+    if start_year is not None:
+        inside &= months >= start_year * 12
+    if end_year is not None:
+        inside &= months < (end_year + 1) * 12
+    counts = np.where(inside, counts, 0)
+
+    # Pad to whole buckets on both sides
+    lead = first_month % width
+    trail = -(lead + len(counts)) % width
+    padded = np.concatenate([np.zeros(lead, dtype=np.int64), counts, np.zeros(trail, dtype=np.int64)])
+    buckets = padded.reshape(-1, width).sum(axis=1)
+    ordinals = (first_month - lead) // width + np.arange(len(buckets))
+
+    present = np.flatnonzero(buckets)
+    if len(present) == 0:
+        return ordinals[:0], buckets[:0]
+    window = slice(present[0], present[-1] + 1)
+    return ordinals[window], buckets[window]
+
+
+def bucket_label(ordinal: int, granularity: str) -> str:
+    """Display label of a bucket: '2019', '2019-Q3' or '2019-07'."""
+    month = ordinal * BUCKET_MONTHS[granularity]
+    year, month_of_year = divmod(month, 12)
+    if granularity == "year":
+        return str(year)
+    if granularity == "quarter":
+        return f"{year}-Q{month_of_year // 3 + 1}"
+    return f"{year}-{month_of_year + 1:02d}"
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` buckets (NaN until a full window is available)."""
+    means = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        sums = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+        means[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def seasonal_decompose(values: np.ndarray, period: int, phase: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Classical additive decomposition: values = trend + seasonal + residual.
+
+    Args:
+        values: Evenly spaced series, at least two cycles long
+        period: Buckets per seasonal cycle
+        phase: Position of the first bucket within the cycle
+
+    Returns:
+        Centered moving-average trend and residual (NaN where the average
+        window does not fit), and the seasonal component, whose cycle
+        averages to zero
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if period % 2 == 0:
+        weights = np.concatenate([[0.5], np.ones(period - 1), [0.5]]) / period
+    else:
+        weights = np.ones(period) / period
+    half = len(weights) // 2
+    trend = np.full(n, np.nan)
+    if n >= len(weights):
+        trend[half:n - half] = np.convolve(values, weights, mode="valid")
+
+    # Mean detrended value per position in the cycle
+    detrended = values - trend
+    positions = (np.arange(n) + phase) % period
+    known = ~np.isnan(detrended)
+    sums = np.bincount(positions[known], weights=detrended[known], minlength=period)
+    counts = np.bincount(positions[known], minlength=period)
+    cycle = np.divide(sums, counts, out=np.zeros(period), where=counts > 0)
+    seasonal = (cycle - cycle.mean())[positions]
+    return trend, seasonal, values - trend - seasonal
@@ -0,0 +1,286 @@
+"""
+Vectorized trend computations over per-year incident and factor counts.
+
+Trend views compare periods (year ranges) of one year cube. Counts are
+densified over the analysis years and prefix-summed once, so the totals of
+any number of periods are two fancy-indexing lookups rather than one
+filter-and-explode pass per period.
+
+Shifts between two periods carry a per-factor significance: a two-proportion
+z-test on each factor's share of mentions, evaluated for all factors at
+once, and optionally a bootstrap confidence interval drawn as one batch of
+multinomial resamples per period.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from config import get_settings
+from services.indexes import YearFactorCube
+from services.introspection import register_structure
+from services.response_cache import ResponseCache
+from services.statistics import normal_sf
+
+
+@dataclass(frozen=True)
+class YearlyCounts:
+    """Incidents and factor mentions per year over a contiguous year range."""
+    first_year: int
+    last_year: int
+    incidents: np.ndarray       # (n_years + 1,) prefix sums of rows per year
+    factor_counts: np.ndarray   # (n_years + 1, n_factors) prefix sums of mentions
+
+    @classmethod
+    def from_cube(cls, cube: YearFactorCube, first_year: int, last_year: int) -> "YearlyCounts":
+        """Prefix sums of a cube's known years between first_year and last_year."""
+        n_years = max(0, last_year - first_year + 1)
+        n_factors = cube.factor_counts.shape[1]
+        incidents = np.zeros(n_years, dtype=np.int64)
+        factor_counts = np.zeros((n_years, n_factors), dtype=np.int64)
+        inside = (cube.years >= first_year) & (cube.years <= last_year)
+        slots = cube.years[inside] - first_year
+        incidents[slots] = cube.incidents[:-1][inside]
+        factor_counts[slots] = cube.factor_counts[:-1][inside]
+        return cls(
+            first_year=first_year,
+            last_year=last_year,
+            incidents=np.concatenate([[0], np.cumsum(incidents)]),
+            factor_counts=np.concatenate([np.zeros((1, n_factors), dtype=np.int64), np.cumsum(factor_counts, axis=0)]),
+        )
+
+    def period_totals(self, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Totals of inclusive year ranges, clipped to the covered years.
+
+        Args:
+            starts: First year of each period (any shape)
+            ends: Last year of each period (same shape)
+
+        Returns:
+            Incident counts (shape of starts) and factor mention counts
+            (shape of starts + (n_factors,))
+        """
+        n_years = len(self.incidents) - 1
+        lo = np.clip(np.asarray(starts) - self.first_year, 0, n_years)
+        hi = np.clip(np.asarray(ends) - self.first_year + 1, 0, n_years)
+        hi = np.maximum(hi, lo)
+        return self.incidents[hi] - self.incidents[lo], self.factor_counts[hi] - self.factor_counts[lo]
+
+
+def factor_shares(factor_counts: np.ndarray) -> np.ndarray:
+    """Percentage of mentions per factor along the last axis (0 where a period has none)."""
+    totals = factor_counts.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = np.where(totals > 0, factor_counts / np.maximum(totals, 1) * 100, 0.0)
+    return shares
+
+
+def annual_change(baseline: np.ndarray, baseline_years: np.ndarray, inference: np.ndarray, inference_years: np.ndarray) -> np.ndarray:
+    """Percent change in annual report rate (0 where the baseline has none), like the KPI card."""
+    baseline_annual = baseline / np.maximum(baseline_years, 1)
+    inference_annual = inference / np.maximum(inference_years, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        change = (inference_annual - baseline_annual) / baseline_annual * 100
+    return np.where(baseline_annual > 0, change, 0.0)
+
+
+@dataclass(frozen=True)
+class SplitSweep:
+    """Baseline/inference comparisons for every (window, split year) evaluated."""
+    windows: np.ndarray            # (n_points,) period length in years, 0 = all years
+    split_years: np.ndarray        # (n_points,) first inference year
+    baseline: np.ndarray           # (n_points, 2) first and last baseline year
+    inference: np.ndarray          # (n_points, 2) first and last inference year
+    baseline_counts: np.ndarray    # (n_points,) incidents
+    inference_counts: np.ndarray
+    baseline_factors: np.ndarray   # (n_points, n_factors) mentions
+    inference_factors: np.ndarray
+    volume_change: np.ndarray      # (n_points,) percent change in annual rate
+    shifts: np.ndarray             # (n_points, n_factors) inference - baseline share, points
+
+    def rising_and_declining(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Factor codes with the largest and smallest shift per point among the
+        factors mentioned in either period, by raw shift (-1 for none).
+        """
+        return extreme_shifts(self.shifts, (self.baseline_factors + self.inference_factors) > 0)
+
+
+def extreme_shifts(shifts: np.ndarray, present: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Argmax and argmin of shifts along the last axis over present entries (-1 where none)."""
+    if shifts.shape[-1] == 0:
+        none = np.full(shifts.shape[:-1], -1)
+        return none, none
+    any_present = present.any(axis=-1)
+    rising = np.where(present, shifts, -np.inf).argmax(axis=-1)
+    declining = np.where(present, shifts, np.inf).argmin(axis=-1)
+    return np.where(any_present, rising, -1), np.where(any_present, declining, -1)
+
+
+def sweep_splits(
+    counts: YearlyCounts,
+    windows: list[int],
+    first_split: Optional[int] = None,
+    last_split: Optional[int] = None,
+) -> SplitSweep:
+    """
+    Compare the ``window`` years before and from every candidate split year.
+
+    Args:
+        counts: Yearly counts over the analysis years
+        windows: Period lengths in years; 0 compares all analysis years
+            before the split with all years from it
+        first_split: Earliest split year to evaluate
+        last_split: Latest split year to evaluate
+
+    Returns:
+        One point per (window, split year) whose periods both lie within
+        the analysis years, ordered by window then split year
+    """
+    lowest = counts.first_year + 1
+    highest = counts.last_year
+    splits = np.arange(max(lowest, first_split or lowest), min(highest, last_split or highest) + 1)
+    window_grid, split_grid = np.meshgrid(np.asarray(windows, dtype=np.int64), splits, indexing="ij")
+
+    expanding = window_grid == 0
+    baseline_start = np.where(expanding, counts.first_year, split_grid - window_grid)
+    inference_end = np.where(expanding, counts.last_year, split_grid + window_grid - 1)
+    valid = (baseline_start >= counts.first_year) & (inference_end <= counts.last_year)
+
+    window_grid, split_grid = window_grid[valid], split_grid[valid]
+    baseline_start, inference_end = baseline_start[valid], inference_end[valid]
+    baseline_end = split_grid - 1
+
+    baseline_counts, baseline_factors = counts.period_totals(baseline_start, baseline_end)
+    inference_counts, inference_factors = counts.period_totals(split_grid, inference_end)
+    return SplitSweep(
+        windows=window_grid,
+        split_years=split_grid,
+        baseline=np.stack([baseline_start, baseline_end], axis=-1),
+        inference=np.stack([split_grid, inference_end], axis=-1),
+        baseline_counts=baseline_counts,
+        inference_counts=inference_counts,
+        baseline_factors=baseline_factors,
+        inference_factors=inference_factors,
+        volume_change=annual_change(
+            baseline_counts, baseline_end - baseline_start + 1,
+            inference_counts, inference_end - split_grid + 1,
+        ),
+        shifts=factor_shares(inference_factors) - factor_shares(baseline_factors),
+    )
+
+
+@dataclass(frozen=True)
+class PeriodComparison:
+    """Factor distributions of N periods with all pairwise differences."""
+    starts: np.ndarray          # (n_periods,) first year
+    ends: np.ndarray            # (n_periods,) last year
+    counts: np.ndarray          # (n_periods,) incidents
+    factors: np.ndarray         # (n_periods, n_factors) mentions
+    shares: np.ndarray          # (n_periods, n_factors) percent of mentions
+    deltas: np.ndarray          # (n_periods, n_periods, n_factors) shares[j] - shares[i]
+    volume_change: np.ndarray   # (n_periods, n_periods) annual rate change from i to j, percent
+
+    @property
+    def annual_rates(self) -> np.ndarray:
+        return self.counts / np.maximum(self.ends - self.starts + 1, 1)
+
+
+def compare_periods(counts: YearlyCounts, starts: list[int], ends: list[int]) -> PeriodComparison:
+    """
+    Distributions of any number of periods from one set of prefix sums.
+
+    Args:
+        counts: Yearly counts covering every period
+        starts: First year of each period
+        ends: Last year of each period (inclusive)
+
+    Returns:
+        Per-period totals and shares, and period x period differences
+    """
+    starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    period_counts, period_factors = counts.period_totals(starts, ends)
+    shares = factor_shares(period_factors)
+    years = ends - starts + 1
+    return PeriodComparison(
+        starts=starts,
+        ends=ends,
+        counts=period_counts,
+        factors=period_factors,
+        shares=shares,
+        deltas=shares[None, :, :] - shares[:, None, :],
+        volume_change=annual_change(
+            period_counts[:, None], years[:, None], period_counts[None, :], years[None, :],
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class ShiftSignificance:
+    """Per-factor significance of the share shift from baseline to inference."""
+    z_scores: np.ndarray            # (n_factors,)
+    p_values: np.ndarray            # (n_factors,) two-sided
+    ci_low: Optional[np.ndarray]    # (n_factors,) percentage points, with bootstrap only
+    ci_high: Optional[np.ndarray]
+
+
+def shift_significance(
+    baseline_factors: np.ndarray,
+    inference_factors: np.ndarray,
+    bootstrap: int = 0,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> ShiftSignificance:
+    """
+    Test every factor's share change between two periods at once.
+
+    Args:
+        baseline_factors: Mentions per factor in the baseline period
+        inference_factors: Mentions per factor in the inference period
+        bootstrap: Number of resamples for a confidence interval (0 skips it)
+        confidence: Confidence level of the interval
+        seed: Resampling seed, fixed so cached and fresh results agree
+
+    Returns:
+        z-scores and two-sided p-values of a pooled two-proportion z-test
+        (z = 0, p = 1 where a factor or a period has no mentions), and percentile
+        intervals of the share shift when bootstrapped
+    """
+    x1 = np.asarray(baseline_factors, dtype=float)
+    x2 = np.asarray(inference_factors, dtype=float)
+    n1, n2 = x1.sum(), x2.sum()
+    p1 = x1 / n1 if n1 > 0 else np.zeros_like(x1)
+    p2 = x2 / n2 if n2 > 0 else np.zeros_like(x2)
+
+    pooled = (x1 + x2) / max(n1 + n2, 1)
+    if n1 > 0 and n2 > 0:
+        variance = pooled * (1 - pooled) * (1 / n1 + 1 / n2)
+    else:
+        # Nothing to compare against
+        variance = np.zeros_like(pooled)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(variance > 0, (p2 - p1) / np.sqrt(variance), 0.0)
+    p_values = 2 * normal_sf(np.abs(z))
+
+    ci_low = ci_high = None
+    if bootstrap > 0 and n1 > 0 and n2 > 0:
+        rng = np.random.default_rng(seed)
+        # (bootstrap, n_factors) resampled mention counts per period
+        shifts = (
+            rng.multinomial(int(n2), p2, size=bootstrap) / n2
+            - rng.multinomial(int(n1), p1, size=bootstrap) / n1
+        ) * 100
+        tail = (1 - confidence) / 2 * 100
+        ci_low, ci_high = np.percentile(shifts, [tail, 100 - tail], axis=0)
+    return ShiftSignificance(z_scores=z, p_values=p_values, ci_low=ci_low, ci_high=ci_high)
+
+
+@lru_cache()
+def get_significance_cache() -> ResponseCache:
+    """Get the process-wide cache of significance results per period pair."""
+    return ResponseCache(get_settings().SIGNIFICANCE_CACHE_SIZE)
+
+
+register_structure("significance_cache", "cache", lambda: get_significance_cache()._entries)
@@ -0,0 +1,168 @@
+"""
+Warm-start pipeline run at startup in production.
+
+Loads the dataset snapshot (source files are read and indexes built in
+parallel, see data_loader), then pre-renders the default-filter dashboard
+views concurrently into the response cache through the full middleware
+stack. /ready only reports ready once this has finished, so a load balancer
+does not send traffic to a cold worker.
+
+A failed attempt is retried with exponential backoff (WARMUP_ATTEMPTS,
+WARMUP_RETRY_SECONDS). Once every attempt has failed, /health reports the
+worker unhealthy too, so the orchestrator restarts it instead of keeping a
+live worker that never gets traffic.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Views rendered by the landing page and the default trend split
+DEFAULT_VIEWS = (
+    "/api/summary",
+    "/api/filters/options",
+    "/api/incidents/summary",
+    "/api/incidents/timeline",
+    "/api/incidents/factors",
+    "/api/incidents/map",
+    "/api/trends/kpis",
+    "/api/trends/comparison",
+)
+
+
+@dataclass
+class WarmupState:
+    """Progress of the warm-up pipeline."""
+    # pending, running, retrying, ready, failed (attempts exhausted), or
+    # skipped (development mode)
+    status: str = "pending"
+    attempts: int = 0
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    dataset_version: Optional[str] = None
+    stages_ms: dict[str, float] = field(default_factory=dict)
+    prerendered: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status in ("ready", "skipped")
+
+    @property
+    def has_failed(self) -> bool:
+        return self.status == "failed"
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "attempts": self.attempts,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "dataset_version": self.dataset_version,
+            "stages_ms": self.stages_ms,
+            "prerendered": self.prerendered,
+            "error": self.error,
+        }
+
+
+_state = WarmupState()
+
+
+def get_warmup_state() -> WarmupState:
+    """Get the warm-up state of this worker."""
+    return _state
+
+
+def skip_warmup() -> None:
+    """Mark the worker ready without warming up (data loads on first use)."""
+    _state.status = "skipped"
+
+
+async def run_warmup(app) -> None:
+    """
+    Run the warm-up pipeline until it succeeds or WARMUP_ATTEMPTS attempts
+    have failed, waiting WARMUP_RETRY_SECONDS (doubled after each failure)
+    between attempts.
+    """
+    settings = get_settings()
+    _state.started_at = datetime.now()
+    delay = settings.WARMUP_RETRY_SECONDS
+    for attempt in range(1, settings.WARMUP_ATTEMPTS + 1):
+        _state.status = "running"
+        _state.attempts = attempt
+        try:
+            await _warm(app)
+        except Exception as e:
+            _state.error = str(e)
+            logger.exception(f"Warm-up attempt {attempt}/{settings.WARMUP_ATTEMPTS} failed")
+        else:
+            _state.status = "ready"
+            _state.error = None
+            break
+        if attempt < settings.WARMUP_ATTEMPTS:
+            _state.status = "retrying"
+            await asyncio.sleep(delay)
+            delay *= 2
+    else:
+        _state.status = "failed"
+        logger.error(f"Warm-up failed after {settings.WARMUP_ATTEMPTS} attempts; reporting unhealthy")
+    _state.completed_at = datetime.now()
+
+
+async def _warm(app) -> None:
+    """
+    Load the dataset and pre-render DEFAULT_VIEWS. Loading runs in a worker
+    thread so the event loop keeps answering /health and /ready meanwhile.
+    """
+    from services.data_loader import get_snapshot
+    
+    start = time.perf_counter()
+    snapshot = await asyncio.to_thread(get_snapshot)
+    _state.dataset_version = snapshot.version
+    _state.stages_ms["load"] = round((time.perf_counter() - start) * 1000, 1)
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(_render(app, path) for path in DEFAULT_VIEWS))
+    _state.prerendered = [path for path, status in zip(DEFAULT_VIEWS, statuses) if status == 200]
+    _state.stages_ms["prerender"] = round((time.perf_counter() - start) * 1000, 1)
+    failed = [f"{path} ({status})" for path, status in zip(DEFAULT_VIEWS, statuses) if status != 200]
+    if failed:
+        raise RuntimeError(f"Pre-rendering failed: {', '.join(failed)}")
+    logger.info(f"Warm-up complete for dataset {snapshot.version}: {_state.stages_ms}")
+
+
+async def _render(app, path: str) -> int:
+    """Issue an in-process GET through the ASGI app and return its status."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        "state": {},
+    }
+    status = 500
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status